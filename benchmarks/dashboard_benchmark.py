@@ -0,0 +1,54 @@
+"""
+Measure time-to-interactive of the Streamlit dashboard across reruns
+
+Runs the app headless with streamlit.testing and times a cold start, an
+unchanged rerun, a filter change and a return to an earlier filter state.
+The cold start pays for data loading and every panel. The other reruns show
+what the cache saves.
+
+Usage:
+    python benchmarks/dashboard_benchmark.py
+"""
+import argparse
+import os
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, 'src', 'visualizations', 'streamlit', 'streamlit_app.py')
+
+def timed_run(app: AppTest, timeout: float) -> float:
+    start = time.perf_counter()
+    app.run(timeout=timeout)
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard time-to-interactive")
+    parser.add_argument('--timeout', type=float, default=120)
+    args = parser.parse_args()
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    app = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+
+    results = []
+
+    results.append(('Cold start', timed_run(app, args.timeout)))
+    cities = list(app.multiselect[0].value)
+    results.append(('Unchanged rerun', timed_run(app, args.timeout)))
+
+    app.multiselect[0].set_value(cities[:len(cities) // 2])
+    results.append(('Filter change', timed_run(app, args.timeout)))
+
+    app.multiselect[0].set_value(cities)
+    results.append(('Back to earlier filter', timed_run(app, args.timeout)))
+
+    for name, seconds in results:
+        print(f"{name + ':':24} {seconds * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
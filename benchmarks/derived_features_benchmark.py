@@ -0,0 +1,76 @@
+"""
+Compare pandas column expressions with the fused derived-feature kernels
+
+The pandas path is what _add_derived_features and the Tableau export used to
+do: .dt accessors plus one expression per term, each allocating temporaries.
+Every kernel backend that is installed is timed on the same rows.
+
+Usage:
+    python benchmarks/derived_features_benchmark.py --stations 1000 --hours 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_processing.derived_features import BACKENDS, compute_derived_features, resolve_backend
+from src.data_processing.synthetic import generate_weather_data
+
+def pandas_features(df: pd.DataFrame) -> dict:
+    return {
+        'hour': df['timestamp'].dt.hour,
+        'month': df['timestamp'].dt.month,
+        'weather_score': ((abs(df['temperature'] - 20) / 10) + (df['wind_speed'] / 20) +
+                          (df['precipitation'] * 2) + (abs(df['humidity'] - 60) / 20)),
+        'feels_like': df['temperature'] - 0.5 * (1 - df['humidity'] / 100),
+        'weather_severity': (
+            (df['temperature'] - df['temperature'].mean()) / df['temperature'].std() +
+            (df['wind_speed'] - df['wind_speed'].mean()) / df['wind_speed'].std() +
+            (df['precipitation'] - df['precipitation'].mean()) / df['precipitation'].std()
+        ) / 3
+    }
+
+def kernel_features(df: pd.DataFrame, backend: str) -> dict:
+    return compute_derived_features(df['temperature'], df['humidity'], df['wind_speed'], df['precipitation'],
+                                    timestamps=df['timestamp'], feels_like=True, severity=True,
+                                    backend=backend)
+
+def best_of(fn, repeats: int):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Derived feature throughput")
+    parser.add_argument('--stations', type=int, default=500)
+    parser.add_argument('--hours', type=int, default=2000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    df = generate_weather_data(n_stations=args.stations, hours=args.hours)
+    expected, pandas_s = best_of(lambda: pandas_features(df), args.repeats)
+    print(f"{len(df):,} rows")
+    print(f"pandas:  {pandas_s * 1000:8.1f} ms")
+
+    for backend in BACKENDS:
+        try:
+            resolve_backend(backend)
+        except ImportError:
+            print(f"{backend + ':':8} not installed")
+            continue
+        # The first numba call compiles the kernel, keep it out of the timing
+        kernel_features(df.head(10), backend)
+        actual, kernel_s = best_of(lambda: kernel_features(df, backend), args.repeats)
+        for name, values in expected.items():
+            np.testing.assert_allclose(actual[name], values, rtol=1e-4, atol=1e-4)
+        print(f"{backend + ':':8} {kernel_s * 1000:8.1f} ms  ({pandas_s / kernel_s:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compare the size and build time of the time series HTML with and without downsampling
+
+Builds the weather_map time series page for hourly data across many
+stations. A viewport wide enough to hold every point stands in for the
+raw plot. The downsampled variants use the default viewport width.
+
+Usage:
+    python benchmarks/downsampling_benchmark.py --stations 100 --hours 8760
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_processing.synthetic import generate_weather_data
+from src.data_processing.weather_processor import WeatherDataProcessor
+from src.visualization.downsampling import DEFAULT_VIEWPORT_WIDTH, downsample_indices
+from src.visualization import weather_map
+
+def build(df, width: int):
+    """Write the page into a scratch directory and return (seconds, bytes)"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.makedirs(os.path.join(scratch, 'src', 'static'))
+        os.chdir(scratch)
+        try:
+            start = time.perf_counter()
+            weather_map.create_time_series_plots(df, width=width)
+            seconds = time.perf_counter() - start
+            size = os.path.getsize(os.path.join('src', 'static', 'weather_trends.html'))
+        finally:
+            os.chdir(cwd)
+    return seconds, size
+
+def main():
+    parser = argparse.ArgumentParser(description="Time series downsampling")
+    parser.add_argument('--stations', type=int, default=100)
+    parser.add_argument('--hours', type=int, default=24 * 365)
+    args = parser.parse_args()
+
+    df = WeatherDataProcessor().preprocess_data(generate_weather_data(n_stations=args.stations, hours=args.hours))
+    print(f"{len(df):,} rows, {args.stations} stations x {args.hours} hours")
+
+    results = [('Raw', build(df, width=args.hours)),
+               (f'Min/max @ {DEFAULT_VIEWPORT_WIDTH}px', build(df, width=DEFAULT_VIEWPORT_WIDTH))]
+    for name, (seconds, size) in results:
+        print(f"{name + ':':22} {seconds * 1000:9.1f} ms {size / 2**20:9.2f} MiB")
+
+    city = df[df['city'] == df['city'].iloc[0]]
+    for method in ('minmax', 'lttb'):
+        start = time.perf_counter()
+        keep = downsample_indices(city['timestamp'].to_numpy(), city['temperature'].to_numpy(),
+                                  2 * DEFAULT_VIEWPORT_WIDTH, method)
+        print(f"{method + ' one trace:':22} {(time.perf_counter() - start) * 1000:9.2f} ms {len(keep):>9} points")
+
+if __name__ == "__main__":
+    main()
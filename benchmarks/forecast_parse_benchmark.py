@@ -0,0 +1,91 @@
+"""
+Compare the per-hour dict loop with the columnar forecast parser
+
+Both turn already decoded forecast payloads (current block plus 5 days x 24
+hours per station) into one weather DataFrame, so only the flattening cost is
+measured, not HTTP or JSON decoding.
+
+Usage:
+    python benchmarks/forecast_parse_benchmark.py --stations 2000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.visualization.weather_map import build_weather_frame, parse_current, parse_forecast_hours, to_weather_columns
+from tests.weather_api_stub import forecast_payload
+
+def row_loop(stations, payloads) -> pd.DataFrame:
+    all_data = []
+    for row, forecast in zip(stations, payloads):
+        current = forecast['current']
+        all_data.append({
+            'timestamp': datetime.fromtimestamp(current['last_updated_epoch']),
+            'city': row['city'],
+            'lat': row['lat'],
+            'lon': row['lon'],
+            'temperature': current['temp_c'],
+            'humidity': current['humidity'],
+            'wind_speed': current['wind_kph'] / 3.6,
+            'precipitation': current['precip_mm'],
+            'pressure': current['pressure_mb']
+        })
+        for day in forecast['forecast']['forecastday']:
+            for hour in day['hour']:
+                all_data.append({
+                    'timestamp': datetime.fromtimestamp(hour['time_epoch']),
+                    'city': row['city'],
+                    'lat': row['lat'],
+                    'lon': row['lon'],
+                    'temperature': hour['temp_c'],
+                    'humidity': hour['humidity'],
+                    'wind_speed': hour['wind_kph'] / 3.6,
+                    'precipitation': hour['precip_mm'],
+                    'pressure': hour['pressure_mb']
+                })
+    return pd.DataFrame(all_data)
+
+def columnar(stations, payloads) -> pd.DataFrame:
+    return build_weather_frame([
+        to_weather_columns(row, np.concatenate([parse_current(forecast['current']),
+                                                parse_forecast_hours(forecast)]))
+        for row, forecast in zip(stations, payloads)
+    ])
+
+def best_of(fn, repeats: int):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast flattening throughput")
+    parser.add_argument('--stations', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    stations = [{'city': f'Station {i}', 'lat': lat, 'lon': lon}
+                for i, (lat, lon) in enumerate(zip(rng.uniform(-60, 60, args.stations).round(4),
+                                                   rng.uniform(-180, 180, args.stations).round(4)))]
+    payloads = [forecast_payload(row['lat'], row['lon'], args.days) for row in stations]
+
+    loop_df, loop_s = best_of(lambda: row_loop(stations, payloads), args.repeats)
+    col_df, col_s = best_of(lambda: columnar(stations, payloads), args.repeats)
+    pd.testing.assert_frame_equal(loop_df, col_df, check_dtype=False)
+
+    print(f"{len(col_df):,} rows from {args.stations} stations")
+    print(f"Row loop: {loop_s * 1000:8.1f} ms")
+    print(f"Columnar: {col_s * 1000:8.1f} ms  ({loop_s / col_s:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compare page size and build time of the weather map modes
+
+The baseline is the former create_weather_map loop: iterrows with a
+CircleMarker and a formatted Popup per station. The other rows use
+station_layer with vectorized popups: one marker per station, clustered
+markers from inlined data, and clustered markers from a gzipped file
+loaded on demand, whose size is listed separately.
+
+Usage:
+    python benchmarks/map_benchmark.py --stations 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import folium
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_processing.synthetic import generate_weather_data
+from src.visualization.station_layer import add_station_layer, render_popups
+from src.visualization.weather_visualization import POPUP_TEMPLATE
+
+def baseline(stations):
+    m = folium.Map(location=[0, 0], zoom_start=2)
+    for _, row in stations.iterrows():
+        popup_content = POPUP_TEMPLATE.format(**row.to_dict())
+        folium.CircleMarker(
+            location=[row['latitude'], row['longitude']],
+            radius=10,
+            popup=folium.Popup(popup_content, max_width=200),
+            color='red' if row['temperature'] > 25 else 'blue',
+            fill=True
+        ).add_to(m)
+    return m
+
+def layered(stations, mode, data_path=None):
+    m = folium.Map(location=[0, 0], zoom_start=2)
+    colors = np.where(stations['temperature'].to_numpy() > 25, 'red', 'blue')
+    add_station_layer(m, stations['latitude'], stations['longitude'], colors,
+                      render_popups(stations, POPUP_TEMPLATE), mode=mode, data_path=data_path)
+    return m
+
+def timed_page(build):
+    start = time.perf_counter()
+    page = build().get_root().render()
+    return time.perf_counter() - start, len(page.encode('utf-8'))
+
+def main():
+    parser = argparse.ArgumentParser(description="Weather map modes")
+    parser.add_argument('--stations', type=int, default=5000)
+    args = parser.parse_args()
+
+    stations = generate_weather_data(n_stations=args.stations, hours=1).astype({'city': str})
+    print(f"{len(stations):,} stations")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        data_path = os.path.join(scratch, 'weather_stations.json.gz')
+        results = [
+            ('iterrows baseline', timed_page(lambda: baseline(stations))),
+            ('markers', timed_page(lambda: layered(stations, 'markers'))),
+            ('cluster (inline)', timed_page(lambda: layered(stations, 'cluster'))),
+            ('cluster (lazy file)', timed_page(lambda: layered(stations, 'cluster', data_path))),
+        ]
+        data_bytes = os.path.getsize(data_path)
+
+    for name, (seconds, size) in results:
+        print(f"{name + ':':22} {seconds * 1000:9.1f} ms {size / 2**20:9.2f} MiB page")
+    print(f"{'lazy station file:':22} {'':12} {data_bytes / 2**20:9.2f} MiB gzipped")
+
+if __name__ == "__main__":
+    main()
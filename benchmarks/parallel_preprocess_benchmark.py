@@ -0,0 +1,57 @@
+"""
+Compare per-station preprocessing with pandas groupby and the process pool
+
+The baseline applies preprocess_data to every station group and concatenates
+the results, which is what per-station gap filling costs without
+preprocess_parallel. Each worker count is timed on the same frame.
+
+Usage:
+    python benchmarks/parallel_preprocess_benchmark.py --stations 2000 --hours 2000 --workers 1 2 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_processing.synthetic import generate_weather_data
+from src.data_processing.weather_processor import WeatherDataProcessor
+
+def best_of(fn, repeats: int):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-station preprocessing throughput")
+    parser.add_argument('--stations', type=int, default=500)
+    parser.add_argument('--hours', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    df = generate_weather_data(n_stations=args.stations, hours=args.hours)
+    rng = np.random.default_rng(0)
+    for column in ['temperature', 'humidity', 'wind_speed', 'precipitation', 'pressure']:
+        df.loc[rng.choice(len(df), size=len(df) // 50, replace=False), column] = np.nan
+    processor = WeatherDataProcessor()
+
+    expected, groupby_s = best_of(
+        lambda: pd.concat([processor.preprocess_data(group)
+                           for _, group in df.groupby('city', observed=True)]).sort_index(), args.repeats)
+    print(f"{len(df):,} rows from {args.stations} stations")
+    print(f"groupby:     {groupby_s * 1000:8.1f} ms")
+
+    for workers in args.workers:
+        actual, parallel_s = best_of(lambda: processor.preprocess_parallel(df, max_workers=workers), args.repeats)
+        pd.testing.assert_frame_equal(actual, expected[actual.columns])
+        print(f"{workers:2d} workers: {parallel_s * 1000:8.1f} ms  ({groupby_s / parallel_s:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
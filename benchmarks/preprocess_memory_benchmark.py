@@ -0,0 +1,57 @@
+"""
+Measure peak memory of WeatherDataProcessor.preprocess_data
+
+Reports the peak traced allocation as a multiple of the input frame size for
+the default (single copy) and in-place modes.
+
+Usage:
+    python benchmarks/preprocess_memory_benchmark.py --rows 5000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_processing.weather_processor import WeatherDataProcessor
+
+def make_frame(n_rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({
+        'timestamp': pd.date_range(start='2023-01-01', periods=n_rows, freq='min'),
+        'temperature': rng.normal(20, 5, n_rows),
+        'humidity': rng.normal(60, 10, n_rows),
+        'wind_speed': rng.normal(15, 5, n_rows),
+        'precipitation': rng.exponential(1, n_rows),
+        'pressure': rng.normal(1013, 5, n_rows)
+    })
+    # Sprinkle gaps so the fill step has work to do
+    df.loc[::100, 'humidity'] = np.nan
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of preprocess_data")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Number of rows in the input frame")
+    args = parser.parse_args()
+
+    processor = WeatherDataProcessor()
+    df = make_frame(args.rows)
+    input_size = df.memory_usage(deep=True).sum()
+    print(f"Input: {args.rows:,} rows, {input_size / 1e6:.1f} MB")
+
+    for inplace in (False, True):
+        frame = df.copy()
+        tracemalloc.start()
+        start = time.perf_counter()
+        processor.preprocess_data(frame, inplace=inplace)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"inplace={inplace}: peak {peak / 1e6:.1f} MB ({peak / input_size:.2f}x input), {elapsed:.2f} s")
+
+if __name__ == "__main__":
+    main()
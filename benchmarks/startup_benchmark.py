@@ -0,0 +1,57 @@
+"""
+Measure cold-start cost of the risk service
+
+Each run happens in a fresh interpreter so module caches from earlier runs do
+not hide import time. Reports the time to import src.main, the time for the
+first prediction (model load + first inference) and whether TensorFlow ended
+up being imported.
+
+Usage:
+    python benchmarks/startup_benchmark.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import src.main as main
+imported = time.perf_counter()
+main.load_model()
+main.run_inference(main.np.zeros((1, len(main.INPUT_COLUMNS))))
+predicted = time.perf_counter()
+print(json.dumps({
+    'import_s': imported - start,
+    'first_prediction_s': predicted - imported,
+    'model': main.registry.active.info()['backend'] if main.registry.active else None,
+    'tensorflow_imported': 'tensorflow' in sys.modules,
+}))
+"""
+
+def run_probe() -> dict:
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3, help="Number of cold starts to measure")
+    args = parser.parse_args()
+
+    results = [run_probe() for _ in range(args.runs)]
+
+    print(f"Model: {results[0]['model']}")
+    print(f"TensorFlow imported: {results[0]['tensorflow_imported']}")
+    for key, label in [('import_s', 'Import time'), ('first_prediction_s', 'First prediction')]:
+        values = [r[key] * 1000 for r in results]
+        print(f"{label}: median {statistics.median(values):.1f} ms "
+              f"(min {min(values):.1f} ms, max {max(values):.1f} ms, runs={len(values)})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compare the memory-mapped station store with the CSV path
+
+For one station with a long hourly history, times reading a one-week window
+and running model inference over it, once through pd.read_csv + filtering and
+once through StationStore range reads.
+
+Usage:
+    python benchmarks/station_store_benchmark.py --years 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_processing.station_store import StationStore, MEASUREMENTS
+from models.numpy_model import NumpyRiskModel
+
+def make_history(n_rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start='2000-01-01', periods=n_rows, freq='h'),
+        'temperature': rng.normal(20, 5, n_rows),
+        'humidity': rng.normal(60, 10, n_rows),
+        'wind_speed': rng.normal(15, 5, n_rows),
+        'precipitation': rng.exponential(1, n_rows),
+        'pressure': rng.normal(1013, 5, n_rows)
+    })
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Station store vs CSV read benchmark")
+    parser.add_argument('--years', type=int, default=5, help="Years of hourly history")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    history = make_history(args.years * 365 * 24)
+    start, end = history['timestamp'].iloc[len(history) // 2], history['timestamp'].iloc[len(history) // 2 + 167]
+    rng = np.random.default_rng(0)
+    model = NumpyRiskModel([
+        (rng.normal(size=(5, 64)).astype(np.float32), np.zeros(64, np.float32), 'relu'),
+        (rng.normal(size=(64, 1)).astype(np.float32), np.zeros(1, np.float32), 'sigmoid'),
+    ])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'station.csv')
+        history.to_csv(csv_path, index=False)
+        store = StationStore(os.path.join(tmp, 'stations'))
+        store.append('station', history)
+
+        def csv_window():
+            df = pd.read_csv(csv_path, parse_dates=['timestamp'])
+            window = df[df['timestamp'].between(start, end)]
+            return model.predict(window[MEASUREMENTS].to_numpy())
+
+        def store_window():
+            return model.predict(store.read('station', start, end).values)
+
+        np.testing.assert_allclose(csv_window(), store_window(), rtol=1e-5)
+
+        csv_time = best_of(csv_window, args.repeat)
+        store_time = best_of(store_window, args.repeat)
+
+        print(f"History: {len(history):,} hourly rows, window: 168 rows")
+        print(f"CSV read + filter + predict:  {csv_time * 1000:10.2f} ms")
+        print(f"Store range read + predict:   {store_time * 1000:10.2f} ms")
+        print(f"Speedup: {csv_time / store_time:,.0f}x")
+        print(f"Size on disk: CSV {os.path.getsize(csv_path) / 1e6:.1f} MB, "
+              f"store {os.path.getsize(store._path('station')) / 1e6:.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Throughput of sequential vs pooled WeatherAPI fetching
+
+Runs fetch_weather_data against the local stub server, which adds a fixed
+latency per request to mimic network round trips.
+
+Usage:
+    python benchmarks/weather_fetch_benchmark.py --locations 200 --latency 0.05 --workers 32
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.visualization.weather_client import WeatherAPI, PooledWeatherAPI
+from src.visualization.weather_map import fetch_weather_data
+from tests.weather_api_stub import StubWeatherServer
+
+def make_locations(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'city': [f'Station {i}' for i in range(n)],
+        'lat': rng.uniform(-60, 60, n).round(4),
+        'lon': rng.uniform(-180, 180, n).round(4)
+    })
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="WeatherAPI fetch throughput")
+    parser.add_argument('--locations', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.05, help="Stub response delay in seconds")
+    parser.add_argument('--workers', type=int, nargs='+', default=[8, 32])
+    parser.add_argument('--skip-sequential', action='store_true')
+    args = parser.parse_args()
+
+    locations = make_locations(args.locations)
+
+    with StubWeatherServer(latency=args.latency) as server:
+        print(f"{args.locations} locations, {args.latency * 1000:.0f} ms per request")
+
+        if not args.skip_sequential:
+            df, elapsed = timed(lambda: fetch_weather_data(locations, WeatherAPI('key', base_url=server.base_url)))
+            print(f"sequential:        {elapsed:7.2f} s  {args.locations / elapsed:8.1f} locations/s  rows={len(df)}")
+
+        for workers in args.workers:
+            api = PooledWeatherAPI('key', max_workers=workers, base_url=server.base_url)
+            df, elapsed = timed(lambda: fetch_weather_data(locations, api))
+            api.close()
+            print(f"pooled, {workers:3d} workers: {elapsed:7.2f} s  {args.locations / elapsed:8.1f} locations/s  rows={len(df)}")
+
+if __name__ == "__main__":
+    main()
@@ -31,7 +31,38 @@ def generate_sample_data(n_samples=1000):
     return df
 
 if __name__ == "__main__":
-    # Generate and save sample data
-    df = generate_sample_data()
-    df.to_csv('weather_data.csv', index=False)
-    print("Sample data generated and saved to weather_data.csv")
+    import argparse
+    import os
+    import sys
+    
+    parser = argparse.ArgumentParser(description="Generate sample weather data")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help="csv writes weather_data.csv, parquet writes a partitioned dataset to weather_data/")
+    parser.add_argument('--stations', type=int,
+                        help="Stream --hours of readings for this many stations from the vectorized generator")
+    parser.add_argument('--hours', type=int, default=24 * 365, help="Hours per station with --stations")
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000, help="Rows generated and written at a time")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from src.data_processing.synthetic import iter_weather_chunks
+    if args.format == 'parquet':
+        from src.data_processing.storage import write_parquet_dataset
+    
+    # Generate and save sample data, one chunk at a time for large station counts
+    if args.stations:
+        chunks = iter_weather_chunks(args.stations, args.hours, seed=args.seed, chunk_rows=args.chunk_rows)
+    else:
+        chunks = [generate_sample_data()]
+    
+    rows = 0
+    for i, df in enumerate(chunks):
+        if args.format == 'parquet':
+            write_parquet_dataset(df, 'weather_data', mode='overwrite' if i == 0 else 'append')
+        else:
+            df.to_csv('weather_data.csv', mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        rows += len(df)
+    
+    output = 'weather_data/' if args.format == 'parquet' else 'weather_data.csv'
+    print(f"Sample data generated and saved to {output} ({rows:,} rows)")
@@ -1,7 +1,8 @@
-import tensorflow as tf
-from tensorflow.keras import layers, models
 import numpy as np
 
+# TensorFlow is imported inside each function so that importing this module,
+# e.g. for the NumPy inference path, does not pay its multi-second startup cost
+
 def create_weather_risk_model(input_shape=(5,)):
     """
     Create a deep learning model for weather risk assessment
@@ -12,6 +13,8 @@ def create_weather_risk_model(input_shape=(5,)):
     Returns:
         Compiled tensorflow model
     """
+    from tensorflow.keras import layers, models
+    
     model = models.Sequential([
         layers.Dense(64, activation='relu', input_shape=input_shape),
         layers.Dropout(0.2),
@@ -29,6 +32,38 @@ def create_weather_risk_model(input_shape=(5,)):
     
     return model
 
+def export_weights(model, path):
+    """
+    Export the weights of a trained Dense model to a compact .npz file
+    
+    The file can be loaded by models.numpy_model.NumpyRiskModel, which runs
+    inference without TensorFlow. Dropout layers carry no weights and are
+    skipped since they are inactive at inference time.
+    
+    Args:
+        model: Trained Sequential model made of Dense and Dropout layers
+        path: Output path for the .npz file
+    """
+    import tensorflow as tf
+    from tensorflow.keras import layers
+    
+    arrays = {}
+    activations = []
+    
+    for layer in model.layers:
+        if isinstance(layer, layers.Dropout):
+            continue
+        if not isinstance(layer, layers.Dense):
+            raise ValueError(f"Unsupported layer for export: {layer.name}")
+        
+        kernel, bias = layer.get_weights()
+        index = len(activations)
+        arrays[f'kernel_{index}'] = kernel.astype(np.float32)
+        arrays[f'bias_{index}'] = bias.astype(np.float32)
+        activations.append(tf.keras.activations.serialize(layer.activation))
+    
+    np.savez_compressed(path, activations=np.array(activations), **arrays)
+
 def train_model(X_train, y_train, X_val, y_val, epochs=50, batch_size=32):
     """
     Train the weather risk assessment model
@@ -44,6 +79,8 @@ def train_model(X_train, y_train, X_val, y_val, epochs=50, batch_size=32):
     Returns:
         Trained model and training history
     """
+    import tensorflow as tf
+    
     model = create_weather_risk_model(input_shape=X_train.shape[1:])
     
     history = model.fit(
@@ -95,3 +132,15 @@ def evaluate_model(model, X_test, y_test):
         'recall': recall,
         'f1_score': f1_score
     }
+
+if __name__ == "__main__":
+    import argparse
+    import tensorflow as tf
+    
+    parser = argparse.ArgumentParser(description="Export a trained Keras model for NumPy inference")
+    parser.add_argument('model_path', help="Path to the trained .h5/.keras model")
+    parser.add_argument('output_path', help="Path of the .npz file to write")
+    args = parser.parse_args()
+    
+    export_weights(tf.keras.models.load_model(args.model_path), args.output_path)
+    print(f"Weights exported to {args.output_path}")
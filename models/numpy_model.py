@@ -0,0 +1,77 @@
+import numpy as np
+from typing import List, Tuple
+
+def sigmoid(x: np.ndarray) -> np.ndarray:
+    """Logistic function that does not overflow for large negative inputs"""
+    # exp of a non-positive value is at most 1, so it never overflows
+    z = np.exp(-np.abs(x))
+    return np.where(x >= 0, 1 / (1 + z), z / (1 + z))
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0, out=x),
+    'sigmoid': sigmoid,
+    'tanh': np.tanh,
+}
+
+class NumpyRiskModel:
+    """
+    Pure NumPy forward pass for the Dense weather risk model
+
+    Loads the weights written by models.model.export_weights and evaluates the
+    network as a chain of matrix multiplications. Dropout layers are identity
+    at inference time, so they are not part of the exported file at all.
+    """
+
+    def __init__(self, layers: List[Tuple[np.ndarray, np.ndarray, str]]):
+        for _, _, activation in layers:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {activation}")
+        self.layers = layers
+
+    @classmethod
+    def load(cls, path: str) -> 'NumpyRiskModel':
+        """
+        Load an exported model
+
+        Args:
+            path: Path to the .npz file written by export_weights
+
+        Returns:
+            NumpyRiskModel ready for inference
+        """
+        with np.load(path, allow_pickle=False) as weights:
+            activations = [str(a) for a in weights['activations']]
+            layers = [
+                (weights[f'kernel_{i}'].astype(np.float32),
+                 weights[f'bias_{i}'].astype(np.float32),
+                 activation)
+                for i, activation in enumerate(activations)
+            ]
+        return cls(layers)
+
+    @property
+    def input_dim(self) -> int:
+        return self.layers[0][0].shape[0]
+
+    def predict(self, X: np.ndarray, verbose: int = 0) -> np.ndarray:
+        """
+        Run the forward pass
+
+        Args:
+            X: Feature array of shape (n_samples, n_features)
+            verbose: Ignored, accepted for drop-in compatibility with Keras
+
+        Returns:
+            Array of shape (n_samples, 1) with risk probabilities
+        """
+        x = np.asarray(X, dtype=np.float32)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+
+        for kernel, bias, activation in self.layers:
+            x = x @ kernel
+            x += bias
+            x = ACTIVATIONS[activation](x)
+
+        return x
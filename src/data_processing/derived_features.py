@@ -0,0 +1,234 @@
+from functools import lru_cache
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# Elements per block of the NumPy kernel, small enough for the block's
+# inputs and scratch buffer to stay in cache while every feature is computed
+BLOCK_SIZE = 16_384
+
+NS_PER_HOUR = 3_600_000_000_000
+
+BACKENDS = ('numpy', 'numexpr', 'numba')
+
+# weather_score in numexpr syntax, see weather_processor.weather_score
+SCORE_EXPRESSION = 'abs(t - 20) / 10 + w / 20 + p * 2 + abs(h - 60) / 20'
+FEELS_LIKE_EXPRESSION = 't - 0.5 * (1 - h / 100)'
+SEVERITY_EXPRESSION = '((t - t_mean) * t_inv + (w - w_mean) * w_inv + (p - p_mean) * p_inv) / 3'
+
+
+def _has_module(name: str) -> bool:
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def resolve_backend(backend: str = 'numpy') -> str:
+    """
+    Check that a kernel implementation can be used
+
+    NumPy is always available. numexpr and numba are optional; numba is the
+    fastest on large frames but its first call in a process pays a JIT
+    compile. Asking for a missing optional backend raises ImportError.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if backend != 'numpy' and not _has_module(backend):
+        raise ImportError(f"The {backend} backend requires the {backend} package")
+    return backend
+
+
+def as_column(values) -> np.ndarray:
+    """
+    Contiguous float array of a column, without copying float32 or float64 data
+
+    The kernels read either precision and always write float32, so float64
+    columns are narrowed block by block instead of being copied up front.
+    """
+    if isinstance(values, pd.Series):
+        values = values.to_numpy()
+    values = np.ascontiguousarray(values)
+    if values.dtype not in (np.float32, np.float64):
+        values = values.astype(np.float32)
+    return values
+
+
+def time_features(timestamps) -> Dict[str, np.ndarray]:
+    """
+    Hour of day and month of year as int32 arrays
+
+    Naive timestamps are handled with integer arithmetic on the epoch
+    nanoseconds. The month comes from a small per-day calendar table instead
+    of a datetime64[M] conversion of every row. Timezone-aware timestamps
+    keep their local wall-clock time via the pandas .dt accessors.
+    """
+    timestamps = pd.Series(timestamps) if not isinstance(timestamps, pd.Series) else timestamps
+    values = None
+    if getattr(timestamps.dtype, 'tz', None) is None:
+        values = timestamps.to_numpy(dtype='datetime64[ns]')
+    if values is None or len(values) == 0 or np.isnat(values).any():
+        return {'hour': timestamps.dt.hour.to_numpy(dtype=np.float64 if timestamps.hasnans else np.int32),
+                'month': timestamps.dt.month.to_numpy(dtype=np.float64 if timestamps.hasnans else np.int32)}
+
+    # Whole hours since the epoch, turned into days in place to save memory
+    hours = values.view(np.int64) // NS_PER_HOUR
+    hour = np.empty(len(hours), dtype=np.int32)
+    np.remainder(hours, 24, out=hour, casting='unsafe')
+    hours //= 24
+    first = hours.min()
+    hours -= first
+
+    calendar = np.arange(first, first + hours.max() + 1).astype('datetime64[D]').astype('datetime64[M]')
+    months = (calendar.astype(np.int64) % 12 + 1).astype(np.int32)
+    return {'hour': hour, 'month': months.take(hours)}
+
+
+def severity_stats(temperature: np.ndarray, wind_speed: np.ndarray,
+                   precipitation: np.ndarray) -> np.ndarray:
+    """
+    Means and inverse sample standard deviations for weather_severity
+
+    Returns [t_mean, t_inv, w_mean, w_inv, p_mean, p_inv], accumulated in
+    float64 so that long float32 columns do not lose precision.
+    """
+    if len(temperature) == 0:
+        return np.full(6, np.nan)
+
+    stats = []
+    for values in (temperature, wind_speed, precipitation):
+        mean = values.mean(dtype=np.float64)
+        std = values.std(dtype=np.float64, ddof=1) if len(values) > 1 else np.nan
+        stats += [mean, 1.0 / std if std else np.nan]
+    return np.array(stats)
+
+
+def _numpy_kernel(t, h, w, p, score, feels_like, severity, stats):
+    """Compute every requested feature block by block with in-place ufuncs"""
+    scratch = np.empty(min(len(t), BLOCK_SIZE), dtype=np.float32)
+    for start in range(0, len(t), BLOCK_SIZE):
+        block = slice(start, start + BLOCK_SIZE)
+        tb, hb, wb, pb = t[block], h[block], w[block], p[block]
+        out, tmp = score[block], scratch[:len(tb)]
+
+        np.subtract(tb, 20, out=out)
+        np.abs(out, out=out)
+        out *= 0.1
+        np.subtract(hb, 60, out=tmp)
+        np.abs(tmp, out=tmp)
+        tmp *= 0.05
+        out += tmp
+        np.multiply(wb, 0.05, out=tmp)
+        out += tmp
+        np.multiply(pb, 2, out=tmp)
+        out += tmp
+
+        if feels_like is not None:
+            out = feels_like[block]
+            np.multiply(hb, 0.005, out=out)
+            out += tb
+            out -= 0.5
+
+        if severity is not None:
+            t_mean, t_inv, w_mean, w_inv, p_mean, p_inv = stats
+            out = severity[block]
+            np.subtract(tb, t_mean, out=out)
+            out *= t_inv
+            np.subtract(wb, w_mean, out=tmp)
+            tmp *= w_inv
+            out += tmp
+            np.subtract(pb, p_mean, out=tmp)
+            tmp *= p_inv
+            out += tmp
+            out /= 3
+
+
+def _numexpr_kernel(t, h, w, p, score, feels_like, severity, stats):
+    import numexpr
+
+    columns = {'t': t, 'h': h, 'w': w, 'p': p}
+    numexpr.evaluate(SCORE_EXPRESSION, local_dict=columns, out=score, casting='same_kind')
+    if feels_like is not None:
+        numexpr.evaluate(FEELS_LIKE_EXPRESSION, local_dict=columns, out=feels_like, casting='same_kind')
+    if severity is not None:
+        names = ['t_mean', 't_inv', 'w_mean', 'w_inv', 'p_mean', 'p_inv']
+        constants = {name: np.float32(value) for name, value in zip(names, stats)}
+        numexpr.evaluate(SEVERITY_EXPRESSION, local_dict={**columns, **constants}, out=severity,
+                         casting='same_kind')
+
+
+@lru_cache(maxsize=None)
+def _compiled_numba_kernel():
+    """Compile the numba loop on first use, so importing this module stays cheap"""
+    import numba
+
+    @numba.njit(cache=True, nogil=True)
+    def kernel(t, h, w, p, score, feels_like, severity, stats, with_feels_like, with_severity):
+        for i in range(t.shape[0]):
+            score[i] = abs(t[i] - 20) / 10 + w[i] / 20 + p[i] * 2 + abs(h[i] - 60) / 20
+            if with_feels_like:
+                feels_like[i] = t[i] - 0.5 * (1 - h[i] / 100)
+            if with_severity:
+                severity[i] = ((t[i] - stats[0]) * stats[1] + (w[i] - stats[2]) * stats[3]
+                               + (p[i] - stats[4]) * stats[5]) / 3
+
+    return kernel
+
+
+def _numba_kernel(t, h, w, p, score, feels_like, severity, stats):
+    unused = np.empty(0, dtype=np.float32)
+    _compiled_numba_kernel()(t, h, w, p, score,
+                             unused if feels_like is None else feels_like,
+                             unused if severity is None else severity,
+                             np.zeros(6) if stats is None else stats,
+                             feels_like is not None, severity is not None)
+
+
+KERNELS = {'numpy': _numpy_kernel, 'numexpr': _numexpr_kernel, 'numba': _numba_kernel}
+
+
+def compute_derived_features(temperature, humidity, wind_speed, precipitation,
+                             timestamps=None, feels_like: bool = False, severity: bool = False,
+                             backend: str = 'numpy') -> Dict[str, np.ndarray]:
+    """
+    Compute the derived weather features in one fused pass
+
+    Every requested feature is written by a single kernel into float32
+    arrays, without the full-length temporaries of chained pandas column
+    expressions. float32 and float64 measurements are read without copies.
+
+    Args:
+        temperature, humidity, wind_speed, precipitation: Columns as Series or arrays
+        timestamps: Also return hour and month when given
+        feels_like: Also return feels_like, temperature - 0.5 * (1 - humidity / 100)
+        severity: Also return weather_severity, the mean z-score of
+            temperature, wind_speed and precipitation over these rows
+        backend: 'numpy', 'numexpr' or 'numba'
+
+    Returns:
+        Dict of float32 arrays keyed by feature name, plus int32 hour and month
+    """
+    t, h, w, p = (as_column(values) for values in (temperature, humidity, wind_speed, precipitation))
+    n = len(t)
+
+    features = {}
+    if timestamps is not None:
+        features.update(time_features(timestamps))
+
+    score = np.empty(n, dtype=np.float32)
+    feels = np.empty(n, dtype=np.float32) if feels_like else None
+    weather_severity = np.empty(n, dtype=np.float32) if severity else None
+    stats = severity_stats(t, w, p) if severity else None
+
+    if n:
+        KERNELS[resolve_backend(backend)](t, h, w, p, score, feels, weather_severity, stats)
+
+    features['weather_score'] = score
+    if feels_like:
+        features['feels_like'] = feels
+    if severity:
+        features['weather_severity'] = weather_severity
+    return features
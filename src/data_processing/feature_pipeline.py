@@ -0,0 +1,88 @@
+from typing import TYPE_CHECKING, List, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    # Only for annotations: serving imports this module and never needs pandas
+    import pandas as pd
+
+# File name of the pipeline artifact next to a model artifact
+PIPELINE_FILENAME = 'features.npz'
+
+
+class FeaturePipeline:
+    """
+    Fitted scaler statistics together with the feature column order
+
+    Saved next to a model artifact so that serving scales its inputs exactly
+    like training did. Standardization (x - mean) / scale is folded into a
+    single affine transform x * multiplier + offset on float32 arrays.
+    """
+
+    def __init__(self, columns: Sequence[str], mean: np.ndarray, scale: np.ndarray):
+        mean = np.asarray(mean, dtype=np.float64).reshape(-1)
+        scale = np.asarray(scale, dtype=np.float64).reshape(-1)
+        if not len(columns) == len(mean) == len(scale):
+            raise ValueError(f"Expected statistics for {len(columns)} columns, "
+                             f"got {len(mean)} means and {len(scale)} scales")
+
+        self.columns: List[str] = list(columns)
+        self.mean = mean
+        self.scale = scale
+        self.multiplier = (1.0 / scale).astype(np.float32)
+        self.offset = (-mean / scale).astype(np.float32)
+
+    @classmethod
+    def from_scaler(cls, scaler, columns: Sequence[str]) -> 'FeaturePipeline':
+        """
+        Build a pipeline from a fitted StandardScaler
+
+        Args:
+            scaler: Fitted StandardScaler; with_mean=False or with_std=False are honoured
+            columns: Feature columns in the order the scaler was fitted on
+
+        Returns:
+            FeaturePipeline with the scaler statistics
+        """
+        mean = getattr(scaler, 'mean_', None)
+        scale = getattr(scaler, 'scale_', None)
+        if mean is None and scale is None and not hasattr(scaler, 'n_samples_seen_'):
+            raise ValueError("Scaler has not been fitted")
+
+        mean = np.zeros(len(columns)) if mean is None else mean
+        scale = np.ones(len(columns)) if scale is None else scale
+        return cls(columns, mean, scale)
+
+    def save(self, path: str):
+        """Write the columns and statistics to a .npz file"""
+        np.savez(path, columns=np.array(self.columns), mean=self.mean, scale=self.scale)
+
+    @classmethod
+    def load(cls, path: str) -> 'FeaturePipeline':
+        """Load a pipeline written by save"""
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls([str(column) for column in arrays['columns']], arrays['mean'], arrays['scale'])
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """
+        Scale a feature array whose columns follow self.columns
+
+        Args:
+            X: Array of shape (n_samples, n_features) or a single row
+
+        Returns:
+            New float32 array of shape (n_samples, n_features)
+        """
+        x = np.asarray(X)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        if x.shape[1] != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} features, got {x.shape[1]}")
+
+        out = np.multiply(x, self.multiplier, dtype=np.float32)
+        out += self.offset
+        return out
+
+    def transform_frame(self, df: 'pd.DataFrame') -> np.ndarray:
+        """Select self.columns from a DataFrame and scale them"""
+        return self.transform(df[self.columns].to_numpy(dtype=np.float32))
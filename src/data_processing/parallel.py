@@ -0,0 +1,178 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data_processing.derived_features import compute_derived_features, time_features
+from src.data_processing.weather_processor import MEASUREMENT_LIMITS, WeatherDataProcessor
+
+# Partitions handed out per worker, so one large station does not leave the
+# other workers idle at the end
+TASKS_PER_WORKER = 4
+
+# Row order of the measurements in the shared blocks
+MEASUREMENTS = list(MEASUREMENT_LIMITS)
+
+
+def _fill_gaps(values: np.ndarray, bounds: np.ndarray):
+    """
+    Forward then backward fill every column within each station, in place
+
+    Works on all stations at once. A running maximum over row numbers finds
+    the last valid row, and missing rows start from their station's first
+    row so that the maximum never reaches back into the previous station.
+    Backward filling is the mirror image with a running minimum.
+    """
+    rows = np.arange(values.shape[1])
+    lengths = np.diff(bounds)
+    starts = np.repeat(bounds[:-1], lengths)
+    ends = np.repeat(bounds[1:] - 1, lengths)
+
+    for column in values:
+        missing = np.isnan(column)
+        if not missing.any():
+            continue
+
+        last = np.where(missing, starts, rows)
+        np.maximum.accumulate(last, out=last)
+        column[:] = column[last]
+
+        missing = np.isnan(column)
+        if missing.any():
+            following = np.where(missing, ends, rows)[::-1]
+            following = np.minimum.accumulate(following)[::-1]
+            column[:] = column[following]
+
+
+def _preprocess_rows(values: np.ndarray, score: np.ndarray, bounds: np.ndarray, backend: str):
+    """
+    Gap-fill, clip and score the stations in one row range, in place
+
+    Args:
+        values: (5, n) float64 measurements of the range, one contiguous row
+            per measurement and columns sorted by station
+        score: float32 output for weather_score of the same rows
+        bounds: Row offsets where each station starts, plus the end offset
+        backend: Derived feature kernel backend
+    """
+    _fill_gaps(values, bounds)
+
+    for column, (lower, upper) in zip(values, MEASUREMENT_LIMITS.values()):
+        np.clip(column, lower, upper, out=column)
+
+    columns = dict(zip(MEASUREMENTS, values))
+    score[:] = compute_derived_features(columns['temperature'], columns['humidity'], columns['wind_speed'],
+                                        columns['precipitation'], backend=backend)['weather_score']
+
+
+def _preprocess_shared(names: Tuple[str, str], n_rows: int, bounds: np.ndarray, backend: str):
+    """Worker entry point: attach the shared blocks and process one partition"""
+    values_shm = shared_memory.SharedMemory(name=names[0])
+    score_shm = shared_memory.SharedMemory(name=names[1])
+    try:
+        values = np.ndarray((len(MEASUREMENTS), n_rows), dtype=np.float64, buffer=values_shm.buf)
+        score = np.ndarray((n_rows,), dtype=np.float32, buffer=score_shm.buf)
+        start, stop = bounds[0], bounds[-1]
+        _preprocess_rows(values[:, start:stop], score[start:stop], bounds - start, backend)
+        del values, score
+    finally:
+        values_shm.close()
+        score_shm.close()
+
+
+def _partitions(offsets: np.ndarray, n_tasks: int) -> List[np.ndarray]:
+    """Split station offsets into about n_tasks runs of whole stations with similar row counts"""
+    targets = np.linspace(0, offsets[-1], n_tasks + 1)[1:-1]
+    cuts = np.unique(np.concatenate([[0], np.searchsorted(offsets, targets), [len(offsets) - 1]]))
+    return [offsets[start:stop + 1] for start, stop in zip(cuts[:-1], cuts[1:])]
+
+
+def preprocess_by_station(processor: WeatherDataProcessor, df: pd.DataFrame, by: str = 'city',
+                          max_workers: Optional[int] = None, inplace: bool = False) -> pd.DataFrame:
+    """
+    Preprocess each station separately, spread over a process pool
+
+    Gaps are filled within each station only, so one station's readings
+    never leak into another's. Rows should be in timestamp order within each
+    station. The measurements are sorted by station into one shared memory
+    block that the workers fill, clip and score in place. Nothing but row
+    offsets is pickled. Results come back in the original row order.
+
+    Args:
+        processor: Supplies the derived feature backend
+        df: Input DataFrame with a station column
+        by: Station column to partition on; missing values form their own station
+        max_workers: Worker processes, defaults to the CPU count. With 1 or a
+            single station everything runs in the calling process.
+        inplace: Modify df directly instead of working on a copy
+
+    Returns:
+        Preprocessed DataFrame, like preprocess_data applied to every station
+    """
+    if not inplace:
+        df = df.copy()
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+
+    n_rows = len(df)
+    codes, _ = pd.factorize(df[by], use_na_sentinel=True)
+    order = np.argsort(codes, kind='stable')
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(codes[order] + 1))])
+    offsets = np.unique(offsets)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    partitions = _partitions(offsets, max_workers * TASKS_PER_WORKER) if n_rows else []
+    backend = processor.derived_backend
+
+    if max_workers == 1 or len(partitions) <= 1:
+        values = np.empty((len(MEASUREMENTS), n_rows))
+        _gather(df, order, values)
+        score = np.empty(n_rows, dtype=np.float32)
+        if n_rows:
+            _preprocess_rows(values, score, offsets, backend)
+        return _assemble(df, values, score, order)
+
+    values_shm = shared_memory.SharedMemory(create=True, size=max(len(MEASUREMENTS) * n_rows * 8, 1))
+    score_shm = shared_memory.SharedMemory(create=True, size=max(n_rows * 4, 1))
+    try:
+        values = np.ndarray((len(MEASUREMENTS), n_rows), dtype=np.float64, buffer=values_shm.buf)
+        score = np.ndarray((n_rows,), dtype=np.float32, buffer=score_shm.buf)
+        _gather(df, order, values)
+
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(partitions))) as pool:
+            futures = [pool.submit(_preprocess_shared, (values_shm.name, score_shm.name), n_rows, bounds, backend)
+                       for bounds in partitions]
+            for future in futures:
+                future.result()
+
+        result = _assemble(df, values, score, order)
+        del values, score
+        return result
+    finally:
+        values_shm.close()
+        values_shm.unlink()
+        score_shm.close()
+        score_shm.unlink()
+
+
+def _gather(df: pd.DataFrame, order: np.ndarray, values: np.ndarray):
+    """Copy the measurements into values, one row per measurement, sorted by station"""
+    for row, column in zip(values, MEASUREMENTS):
+        np.take(df[column].to_numpy(dtype=np.float64), order, out=row)
+
+
+def _assemble(df: pd.DataFrame, values: np.ndarray, score: np.ndarray, order: np.ndarray) -> pd.DataFrame:
+    """Scatter station-sorted results back to the original row order"""
+    for row, column in zip(values, MEASUREMENTS):
+        restored = np.empty(len(row), dtype=df[column].dtype if df[column].dtype.kind == 'f' else np.float64)
+        restored[order] = row
+        df[column] = restored
+
+    for name, column in time_features(df['timestamp']).items():
+        df[name] = column
+    weather_score = np.empty_like(score)
+    weather_score[order] = score
+    df['weather_score'] = weather_score
+    return df
@@ -0,0 +1,191 @@
+import bisect
+import os
+from typing import List, Optional, Union
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+MEASUREMENTS = ['temperature', 'humidity', 'wind_speed', 'precipitation', 'pressure']
+
+# One fixed-width record per reading: timestamp followed by the five measurements
+RECORD_DTYPE = np.dtype([('timestamp', '<M8[ns]')] + [(name, '<f4') for name in MEASUREMENTS])
+
+MAGIC = b'WXSTORE1'
+HEADER_SIZE = 64
+HEADER = MAGIC.ljust(HEADER_SIZE, b'\0')
+FILE_SUFFIX = '.wxs'
+
+TimeBound = Optional[Union[str, np.datetime64, pd.Timestamp]]
+
+
+class StationRange:
+    """
+    Zero-copy view over a contiguous run of records of one station
+
+    timestamps and values are NumPy views into the memory-mapped file, so
+    nothing is read from disk until they are actually used.
+    """
+
+    def __init__(self, station: str, records: np.ndarray):
+        self.station = station
+        self.records = records
+        self.timestamps = records['timestamp']
+        # (n, 5) float32 view over the measurement fields, one row per record
+        if len(records) == 0:
+            self.values = np.empty((0, len(MEASUREMENTS)), dtype=np.float32)
+            return
+        self.values = np.ndarray(shape=(len(records), len(MEASUREMENTS)), dtype=np.float32,
+                                 buffer=records, offset=RECORD_DTYPE.fields['temperature'][1],
+                                 strides=(RECORD_DTYPE.itemsize, np.dtype(np.float32).itemsize))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def column(self, name: str) -> np.ndarray:
+        """View of a single measurement or the timestamps"""
+        return self.records[name]
+
+    def feature_array(self, columns: List[str]) -> np.ndarray:
+        """
+        Feature matrix with the given column order
+
+        Returns the zero-copy measurement view when columns is exactly
+        MEASUREMENTS. Otherwise, e.g. when time features such as hour are
+        requested, a new array is built.
+        """
+        if list(columns) == MEASUREMENTS:
+            return self.values
+
+        derived = {
+            'hour': lambda: (self.timestamps.astype('datetime64[h]').astype(np.int64) % 24),
+            'month': lambda: self.timestamps.astype('datetime64[M]').astype(np.int64) % 12 + 1,
+        }
+        arrays = []
+        for column in columns:
+            if column in MEASUREMENTS:
+                arrays.append(self.records[column])
+            elif column in derived:
+                arrays.append(derived[column]())
+            else:
+                raise ValueError(f"Unknown feature column: {column}")
+        return np.column_stack(arrays).astype(np.float32, copy=False)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Materialize the range as a DataFrame (copies the data)"""
+        df = pd.DataFrame(self.values.copy(), columns=MEASUREMENTS)
+        df.insert(0, 'timestamp', np.array(self.timestamps))
+        return df
+
+
+class StationStore:
+    """
+    Append-only binary store with one memory-mapped file per station
+
+    Each file holds a small header followed by fixed-width records sorted by
+    timestamp, so time windows are located by binary search and returned as
+    NumPy views without parsing or pandas materialization.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, station: str) -> str:
+        return os.path.join(self.root, quote(station, safe='') + FILE_SUFFIX)
+
+    def stations(self) -> List[str]:
+        return sorted(
+            unquote(name[:-len(FILE_SUFFIX)])
+            for name in os.listdir(self.root) if name.endswith(FILE_SUFFIX)
+        )
+
+    def count(self, station: str) -> int:
+        """Number of complete records stored for a station"""
+        path = self._path(station)
+        if not os.path.exists(path):
+            return 0
+        # A header cut short by a crash holds no records
+        return max(0, (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize)
+
+    def _open(self, station: str) -> np.ndarray:
+        path = self._path(station)
+        if not os.path.exists(path):
+            raise KeyError(f"Unknown station: {station}")
+
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        # A short header is what a crash while creating the file leaves behind
+        if not (header.startswith(MAGIC) or (len(header) < HEADER_SIZE and HEADER.startswith(header))):
+            raise ValueError(f"Not a station store file: {path}")
+
+        count = self.count(station)
+        if count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        # A partially written trailing record is ignored by mapping whole records only
+        return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+
+    def append(self, station: str, df: pd.DataFrame) -> int:
+        """
+        Append readings for a station
+
+        Args:
+            station: Station or city name
+            df: DataFrame with a timestamp column and the five measurements;
+                timestamps must be sorted and not older than the stored ones
+
+        Returns:
+            Number of records written
+        """
+        if df.empty:
+            return 0
+
+        records = np.empty(len(df), dtype=RECORD_DTYPE)
+        records['timestamp'] = pd.to_datetime(df['timestamp']).to_numpy(dtype='datetime64[ns]')
+        for name in MEASUREMENTS:
+            records[name] = df[name].to_numpy(dtype=np.float32)
+
+        timestamps = records['timestamp']
+        if (timestamps[1:] < timestamps[:-1]).any():
+            raise ValueError("Timestamps must be sorted")
+
+        path = self._path(station)
+        existing = self.count(station)
+        if existing:
+            last = self._open(station)['timestamp'][-1]
+            if timestamps[0] < last:
+                raise ValueError(f"Cannot append readings older than {last} to {station}")
+
+        with open(path, 'ab') as f:
+            if f.tell() < HEADER_SIZE:
+                # New file, or one whose header was cut short: write the header again
+                f.truncate(0)
+                f.write(HEADER)
+            else:
+                # Drop a partially written record left by an interrupted append
+                f.truncate(HEADER_SIZE + existing * RECORD_DTYPE.itemsize)
+            f.write(records.tobytes())
+
+        return len(records)
+
+    def read(self, station: str, start: TimeBound = None, end: TimeBound = None) -> StationRange:
+        """
+        Read the records of a station within [start, end]
+
+        Args:
+            station: Station or city name
+            start: First timestamp to include; from the beginning if None
+            end: Last timestamp to include; to the end if None
+
+        Returns:
+            StationRange of views into the station file
+        """
+        records = self._open(station)
+        timestamps = records['timestamp']
+
+        # bisect touches O(log n) records; np.searchsorted would first copy the
+        # whole strided timestamp column into a contiguous buffer
+        lo = 0 if start is None else bisect.bisect_left(timestamps, np.datetime64(pd.Timestamp(start), 'ns'))
+        hi = len(records) if end is None else bisect.bisect_right(timestamps, np.datetime64(pd.Timestamp(end), 'ns'))
+
+        return StationRange(station, records[lo:hi])
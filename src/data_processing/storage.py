@@ -0,0 +1,132 @@
+import os
+import shutil
+import uuid
+from datetime import datetime
+from typing import List, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+# Hive-style partition column holding the calendar month as YYYY-MM. It is not
+# called 'month' because preprocess_data already uses that for month-of-year.
+PARTITION_MONTH = 'year_month'
+
+TimeBound = Optional[Union[str, datetime, pd.Timestamp]]
+
+WRITE_MODES = ('append', 'overwrite')
+
+
+def write_parquet_dataset(df: pd.DataFrame, root: str, mode: str = 'append') -> List[str]:
+    """
+    Write weather data to a Parquet dataset partitioned by city and month
+
+    Files land in root/city=<city>/year_month=<YYYY-MM>/. In append mode each
+    call writes new files next to the existing ones, for incremental
+    ingestion. Exports that replace the data use overwrite mode, which
+    removes the existing dataset first so reruns do not duplicate rows.
+
+    Args:
+        df: DataFrame with at least a timestamp column; city is optional
+        root: Dataset directory
+        mode: 'append' or 'overwrite'
+
+    Returns:
+        Partition columns used for the write
+    """
+    if mode not in WRITE_MODES:
+        raise ValueError(f"Unknown write mode {mode!r}, expected one of {WRITE_MODES}")
+    if mode == 'overwrite' and os.path.isdir(root):
+        shutil.rmtree(root)
+
+    timestamps = pd.to_datetime(df['timestamp'])
+    table = pa.Table.from_pandas(
+        df.assign(timestamp=timestamps, **{PARTITION_MONTH: timestamps.dt.strftime('%Y-%m')}),
+        preserve_index=False)
+
+    partition_cols = [column for column in ('city', PARTITION_MONTH) if column in table.column_names]
+    if 'city' in partition_cols:
+        # Categorical columns become dictionaries in Arrow; partition on plain strings
+        table = table.set_column(table.schema.get_field_index('city'), 'city',
+                                 table.column('city').cast(pa.string()))
+
+    ds.write_dataset(
+        table, root,
+        format='parquet',
+        partitioning=ds.partitioning(table.select(partition_cols).schema, flavor='hive'),
+        basename_template=f'part-{uuid.uuid4().hex}-{{i}}.parquet',
+        existing_data_behavior='overwrite_or_ignore'
+    )
+    return partition_cols
+
+
+def _partitioning(root: str) -> ds.Partitioning:
+    """
+    Hive partitioning of a dataset with every partition value read as a string
+
+    Left to inference, a city such as '1000' would come back as an integer
+    and string city filters would fail.
+    """
+    fields = []
+    # city is optional, and when present it is the top level
+    if any(entry.name.startswith('city=') for entry in os.scandir(root)):
+        fields.append(('city', pa.string()))
+    fields.append((PARTITION_MONTH, pa.string()))
+    return ds.partitioning(pa.schema(fields), flavor='hive')
+
+
+def read_parquet_dataset(root: str, columns: Optional[List[str]] = None,
+                         start: TimeBound = None, end: TimeBound = None,
+                         cities: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read weather data from a partitioned Parquet dataset
+
+    Only the requested columns are read. City and time filters prune whole
+    partition directories first and are then pushed down to the row groups
+    of the remaining files.
+
+    Args:
+        root: Dataset directory written by write_parquet_dataset
+        columns: Columns to read; all data columns by default
+        start: Keep rows with timestamp >= start
+        end: Keep rows with timestamp <= end
+        cities: Keep rows for these cities
+
+    Returns:
+        DataFrame with the selected rows and columns
+    """
+    dataset = ds.dataset(root, format='parquet', partitioning=_partitioning(root))
+    names = dataset.schema.names
+
+    conditions = []
+    if start is not None:
+        start = pd.Timestamp(start)
+        conditions.append(ds.field(PARTITION_MONTH) >= start.strftime('%Y-%m'))
+        conditions.append(ds.field('timestamp') >= pa.scalar(start.to_pydatetime(),
+                                                            type=dataset.schema.field('timestamp').type))
+    if end is not None:
+        end = pd.Timestamp(end)
+        conditions.append(ds.field(PARTITION_MONTH) <= end.strftime('%Y-%m'))
+        conditions.append(ds.field('timestamp') <= pa.scalar(end.to_pydatetime(),
+                                                            type=dataset.schema.field('timestamp').type))
+    if cities is not None:
+        if 'city' not in names:
+            raise ValueError("Dataset has no city column to filter on")
+        conditions.append(ds.field('city').isin(list(cities)))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    if columns is None:
+        columns = [name for name in names if name != PARTITION_MONTH]
+    else:
+        missing = set(columns) - set(names)
+        if missing:
+            raise ValueError(f"Columns not in dataset: {missing}")
+
+    table = dataset.to_table(columns=list(columns), filter=expression)
+    df = table.to_pandas()
+    if 'timestamp' in df.columns:
+        df = df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+    return df
@@ -0,0 +1,183 @@
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from src.data_processing.weather_processor import MEASUREMENT_LIMITS, WeatherDataProcessor, weather_score
+
+# Station key for readings without a station column
+DEFAULT_STATION = ''
+
+
+class StreamingWeatherProcessor:
+    """
+    Stateful preprocessing for live feeds, one record or micro-batch at a time
+
+    Gaps are filled from the last known value of the same station. A value
+    a station has never reported falls back to the running mean of that
+    measurement. Outliers are clipped and derived features computed per
+    record, and the scaler is updated incrementally with partial_fit instead
+    of being refit on the full history.
+
+    Single records are buffered and passed to partial_fit scaler_batch_size
+    at a time, since each partial_fit call costs far more than processing a
+    record. The buffer is flushed before the scaler statistics are used.
+    """
+
+    def __init__(self, processor: Optional[WeatherDataProcessor] = None, station_column: str = 'city',
+                 scaler_batch_size: int = 64):
+        if scaler_batch_size < 1:
+            raise ValueError("scaler_batch_size must be at least 1")
+
+        self.processor = processor if processor is not None else WeatherDataProcessor()
+        self.station_column = station_column
+        self.measurement_columns = self.processor.measurement_columns
+        self.feature_columns = self.processor.feature_columns
+        self.scaler = StandardScaler()
+        self.scaler_batch_size = scaler_batch_size
+        self.records_seen = 0
+
+        self._last_known: Dict[Any, np.ndarray] = {}
+        self._unfitted: List[List[float]] = []
+        self._lower = np.array([MEASUREMENT_LIMITS[column][0] for column in self.measurement_columns], dtype=float)
+        self._upper = np.array([MEASUREMENT_LIMITS[column][1] for column in self.measurement_columns], dtype=float)
+
+    def _last(self, station) -> np.ndarray:
+        last = self._last_known.get(station)
+        if last is None:
+            last = self._last_known[station] = np.full(len(self.measurement_columns), np.nan)
+        return last
+
+    def flush(self):
+        """Fit the scaler on records still waiting in the buffer"""
+        if self._unfitted:
+            self.scaler.partial_fit(np.array(self._unfitted, dtype=float))
+            self._unfitted = []
+
+    def _running_means(self) -> np.ndarray:
+        """Running mean of each measurement, NaN before anything was fitted"""
+        self.flush()
+        if not hasattr(self.scaler, 'mean_'):
+            return np.full(len(self.measurement_columns), np.nan)
+        return np.array([self.scaler.mean_[self.feature_columns.index(column)]
+                         for column in self.measurement_columns])
+
+    def last_known(self, station) -> Dict[str, float]:
+        """Last known raw value of each measurement for a station"""
+        return dict(zip(self.measurement_columns, self._last(station).tolist()))
+
+    def process_record(self, record: Dict, update_scaler: bool = True) -> Dict:
+        """
+        Preprocess a single reading
+
+        Args:
+            record: Mapping with a timestamp, the station column and any of
+                the measurements; missing or NaN measurements are filled
+            update_scaler: Update the running scaler statistics with this record
+
+        Returns:
+            New dict with filled and clipped measurements plus hour, month and
+            weather_score
+        """
+        station = record.get(self.station_column)
+        if station is None:
+            station = DEFAULT_STATION
+        last = self._last(station)
+
+        values = np.empty(len(self.measurement_columns))
+        for i, column in enumerate(self.measurement_columns):
+            value = record.get(column)
+            if value is None or value != value:
+                values[i] = last[i]
+            else:
+                values[i] = last[i] = value
+
+        if np.isnan(values).any():
+            values = np.where(np.isnan(values), self._running_means(), values)
+        values = np.clip(values, self._lower, self._upper)
+
+        timestamp = pd.Timestamp(record['timestamp'])
+        result = dict(record)
+        result['timestamp'] = timestamp
+        result.update(zip(self.measurement_columns, values.tolist()))
+        result['hour'] = timestamp.hour
+        result['month'] = timestamp.month
+        result['weather_score'] = weather_score(result['temperature'], result['wind_speed'],
+                                                result['precipitation'], result['humidity'])
+
+        self.records_seen += 1
+        if update_scaler:
+            self._unfitted.append([result[column] for column in self.feature_columns])
+            if len(self._unfitted) >= self.scaler_batch_size:
+                self.flush()
+        return result
+
+    def process_batch(self, df: pd.DataFrame, update_scaler: bool = True) -> pd.DataFrame:
+        """
+        Preprocess a micro-batch of readings in arrival order
+
+        Gives the same rows as calling process_record on every row in turn,
+        except that values a station has never reported fall back to the
+        running means from before the batch.
+
+        Args:
+            df: DataFrame with a timestamp column, the station column and the measurements
+            update_scaler: Update the running scaler statistics with this batch
+
+        Returns:
+            Preprocessed copy of the batch
+        """
+        df = df.copy()
+        if df.empty:
+            return df
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+
+        columns = self.measurement_columns
+        if self.station_column in df.columns:
+            stations = df[self.station_column].astype(object).fillna(DEFAULT_STATION)
+        else:
+            stations = pd.Series(DEFAULT_STATION, index=df.index, dtype=object)
+        groups = lambda frame: frame.groupby(stations, sort=False)
+
+        # Forward fill within each station, then continue from its last known values
+        filled = groups(df[columns]).ffill()
+        if filled.isna().to_numpy().any():
+            prior = pd.DataFrame.from_dict({station: self._last(station) for station in stations.unique()},
+                                           orient='index', columns=columns)
+            filled = filled.fillna(prior.reindex(stations).set_axis(df.index))
+
+        for station, last in groups(filled).last().iterrows():
+            known = last.to_numpy(dtype=float)
+            self._last_known[station] = np.where(np.isnan(known), self._last(station), known)
+
+        if filled.isna().to_numpy().any():
+            filled = filled.fillna(pd.Series(self._running_means(), index=columns))
+        df[columns] = filled
+
+        self.processor._remove_outliers(df, inplace=True)
+        self.processor._add_derived_features(df, inplace=True)
+
+        self.records_seen += len(df)
+        if update_scaler:
+            self.flush()
+            self.scaler.partial_fit(df[self.feature_columns].to_numpy(dtype=float))
+        return df
+
+    def _feature_matrix(self, data: Union[Dict, pd.DataFrame]) -> np.ndarray:
+        if isinstance(data, pd.DataFrame):
+            return data[self.feature_columns].to_numpy(dtype=float)
+        return np.array([[data[column] for column in self.feature_columns]], dtype=float)
+
+    def transform(self, data: Union[Dict, pd.DataFrame]) -> np.ndarray:
+        """
+        Scale processed records with the running statistics
+
+        Args:
+            data: A dict from process_record or a DataFrame from process_batch
+
+        Returns:
+            Scaled feature array with feature_columns order, one row per record
+        """
+        self.flush()
+        return self.scaler.transform(self._feature_matrix(data))
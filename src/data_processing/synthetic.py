@@ -0,0 +1,136 @@
+from datetime import datetime
+from typing import Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Named cities come first; larger station counts are filled with generated stations
+CITIES = {
+    'New York': (40.7128, -74.0060),
+    'London': (51.5074, -0.1278),
+    'Tokyo': (35.6762, 139.6503),
+    'Sydney': (-33.8688, 151.2093),
+    'Mumbai': (19.0760, 72.8777),
+    'Cairo': (30.0444, 31.2357),
+    'Rio de Janeiro': (-22.9068, -43.1729),
+    'Moscow': (55.7558, 37.6173),
+    'Beijing': (39.9042, 116.4074),
+    'Cape Town': (-33.9249, 18.4241)
+}
+
+# Regional base temperatures in °C
+HOT_CITIES = ['Cairo', 'Mumbai']
+COLD_CITIES = ['Moscow', 'London']
+HOT_BASE, MILD_BASE, COLD_BASE = 30.0, 20.0, 5.0
+
+# Fixed first timestamp of sample data, so reruns generate identical readings
+SAMPLE_START = '2023-01-01'
+
+COLUMNS = ['city', 'latitude', 'longitude', 'timestamp', 'temperature',
+           'humidity', 'wind_speed', 'precipitation', 'pressure']
+
+def station_table(n_stations: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Names, coordinates and base temperatures of the generated stations
+
+    The first stations are the named cities with their regional base
+    temperature. Generated stations get random coordinates and a base
+    temperature by latitude band: hot within 30° of the equator, cold beyond
+    50°, mild in between.
+    """
+    if n_stations < 1:
+        raise ValueError("n_stations must be at least 1")
+
+    named = list(CITIES)[:n_stations]
+    extra = n_stations - len(named)
+    rng = np.random.default_rng(seed)
+
+    lat = np.concatenate([[CITIES[city][0] for city in named], rng.uniform(-60, 70, extra).round(4)])
+    lon = np.concatenate([[CITIES[city][1] for city in named], rng.uniform(-180, 180, extra).round(4)])
+
+    temp_base = np.where(np.abs(lat) <= 30, HOT_BASE, np.where(np.abs(lat) >= 50, COLD_BASE, MILD_BASE))
+    for i, city in enumerate(named):
+        temp_base[i] = HOT_BASE if city in HOT_CITIES else COLD_BASE if city in COLD_CITIES else MILD_BASE
+
+    width = len(str(n_stations - 1))
+    names = named + [f'Station {i:0{width}d}' for i in range(len(named), n_stations)]
+    return pd.DataFrame({'city': names, 'latitude': lat, 'longitude': lon, 'temp_base': temp_base})
+
+def iter_weather_chunks(n_stations: int = 10, hours: int = 24,
+                        start: Union[str, datetime, pd.Timestamp] = SAMPLE_START,
+                        seed: int = 42, extreme_fraction: float = 0.05,
+                        chunk_rows: int = 1_000_000) -> Iterator[pd.DataFrame]:
+    """
+    Stream hourly synthetic readings for n_stations x hours in bounded memory
+
+    Rows are ordered by station, then time. Every value of a chunk is drawn
+    with vectorized NumPy calls: a daily temperature cycle around the
+    regional base plus noise, and extreme events that add heat and wind to
+    extreme_fraction of the rows. Output is reproducible for the same seed
+    and chunk_rows.
+
+    Args:
+        n_stations: Number of stations
+        hours: Hours of readings per station
+        start: Timestamp of the first reading
+        seed: Random seed
+        extreme_fraction: Share of rows turned into extreme weather events
+        chunk_rows: Maximum rows per chunk
+
+    Yields:
+        DataFrames with COLUMNS; city is categorical over all station names
+    """
+    if hours < 1:
+        raise ValueError("hours must be at least 1")
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be at least 1")
+
+    stations = station_table(n_stations, seed)
+    cities = pd.CategoricalDtype(stations['city'])
+    lat = stations['latitude'].to_numpy()
+    lon = stations['longitude'].to_numpy()
+    temp_base = stations['temp_base'].to_numpy()
+    start = np.datetime64(pd.Timestamp(start), 'ns')
+    total = n_stations * hours
+
+    for chunk_index, lo in enumerate(range(0, total, chunk_rows)):
+        rng = np.random.default_rng([seed, chunk_index])
+        row = np.arange(lo, min(lo + chunk_rows, total))
+        station, hour = np.divmod(row, hours)
+        n = len(row)
+
+        temperature = temp_base[station] + np.sin(hour / 12 * np.pi) * 5 + rng.normal(0, 1, n)
+        humidity = 60 + rng.normal(0, 10, n)
+        wind_speed = 5 + rng.normal(0, 2, n)
+        precipitation = np.maximum(0, rng.normal(2, 3, n))
+        pressure = rng.normal(1013, 5, n)
+
+        # Add some extreme weather events
+        extreme = rng.choice(n, size=int(n * extreme_fraction), replace=False)
+        temperature[extreme] += rng.uniform(10, 15, len(extreme))
+        wind_speed[extreme] += rng.uniform(20, 30, len(extreme))
+
+        yield pd.DataFrame({
+            'city': pd.Categorical.from_codes(station, dtype=cities),
+            'latitude': lat[station],
+            'longitude': lon[station],
+            'timestamp': start + hour.astype('timedelta64[h]'),
+            'temperature': temperature,
+            'humidity': humidity,
+            'wind_speed': wind_speed,
+            'precipitation': precipitation,
+            'pressure': pressure
+        })
+
+def generate_weather_data(n_stations: int = 10, hours: int = 24,
+                          start: Union[str, datetime, pd.Timestamp] = SAMPLE_START,
+                          seed: int = 42, extreme_fraction: float = 0.05,
+                          chunk_rows: Optional[int] = None) -> pd.DataFrame:
+    """
+    Generate hourly synthetic readings for n_stations x hours as one DataFrame
+
+    Same arguments as iter_weather_chunks; chunk_rows defaults to a single chunk.
+    """
+    chunks = iter_weather_chunks(n_stations, hours, start, seed, extreme_fraction,
+                                 chunk_rows or n_stations * hours)
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,123 @@
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+TimeBound = Optional[Union[str, datetime, pd.Timestamp]]
+
+
+class IndexedWeatherData:
+    """
+    Weather readings sorted by (station, timestamp) with a station offset table
+
+    The rows of station i are data.iloc[offsets[i]:offsets[i + 1]], in
+    timestamp order, so a station lookup is a dict access and a time window
+    within it two binary searches. Stations keep the order in which they
+    first appear in the input. Rows without a station are kept in data but
+    never returned by a query.
+    """
+
+    def __init__(self, df: pd.DataFrame, station_column: str = 'city', time_column: str = 'timestamp'):
+        self.station_column = station_column
+        self.time_column = time_column
+
+        times = pd.to_datetime(df[time_column])
+        codes, stations = pd.factorize(df[station_column], sort=False, use_na_sentinel=True)
+        order = np.lexsort((times.to_numpy(), codes))
+
+        self.data = df.take(order)
+        if self.data[time_column].dtype != times.dtype:
+            self.data[time_column] = times.take(order).to_numpy()
+        self.stations: List = list(stations)
+        self.offsets = np.searchsorted(codes[order], np.arange(len(self.stations) + 1))
+
+        self._times = pd.DatetimeIndex(self.data[time_column])
+        self._positions = {station: i for i, station in enumerate(self.stations)}
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, station) -> bool:
+        return station in self._positions
+
+    def _bound(self, value: TimeBound) -> Optional[pd.Timestamp]:
+        if value is None:
+            return None
+        value = pd.Timestamp(value)
+        tz = self._times.tz
+        if tz is not None and value.tzinfo is None:
+            value = value.tz_localize(tz)
+        return value
+
+    def rows(self, station, start: TimeBound = None, end: TimeBound = None) -> slice:
+        """
+        Row positions of a station's readings within [start, end]
+
+        Args:
+            station: Station name; unknown stations give an empty slice
+            start: Earliest timestamp to include
+            end: Latest timestamp to include
+
+        Returns:
+            Slice into data
+        """
+        i = self._positions.get(station)
+        if i is None:
+            return slice(0, 0)
+
+        lo, hi = int(self.offsets[i]), int(self.offsets[i + 1])
+        start, end = self._bound(start), self._bound(end)
+        times = self._times[lo:hi]
+        first = lo + (times.searchsorted(start, side='left') if start is not None else 0)
+        last = lo + (times.searchsorted(end, side='right') if end is not None else hi - lo)
+        return slice(first, last)
+
+    def station(self, station, start: TimeBound = None, end: TimeBound = None) -> pd.DataFrame:
+        """Readings of one station within [start, end], in timestamp order"""
+        return self.data.iloc[self.rows(station, start, end)]
+
+    def _selected(self, stations: Optional[Iterable]) -> List:
+        if stations is None:
+            return self.stations
+        return [station for station in stations if station in self._positions]
+
+    def positions(self, stations: Optional[Iterable] = None, start: TimeBound = None,
+                  end: TimeBound = None) -> np.ndarray:
+        """Row positions into data of the selected stations within [start, end]"""
+        slices = [self.rows(station, start, end) for station in self._selected(stations)]
+        if not slices:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate([np.arange(s.start, s.stop) for s in slices])
+
+    def query(self, stations: Optional[Iterable] = None, start: TimeBound = None,
+              end: TimeBound = None) -> pd.DataFrame:
+        """
+        Readings of the selected stations within [start, end]
+
+        Args:
+            stations: Stations to include, all by default
+            start: Earliest timestamp to include
+            end: Latest timestamp to include
+
+        Returns:
+            DataFrame sorted by station and timestamp, with the original index
+        """
+        if stations is None and start is None and end is None:
+            return self.data.iloc[self.offsets[0]:]
+        return self.data.iloc[self.positions(stations, start, end)]
+
+    def groups(self, stations: Optional[Iterable] = None, start: TimeBound = None,
+               end: TimeBound = None) -> Iterator[Tuple[object, pd.DataFrame]]:
+        """Yield (station, readings) for the selected stations, skipping empty ones"""
+        for station in self._selected(stations):
+            rows = self.rows(station, start, end)
+            if rows.stop > rows.start:
+                yield station, self.data.iloc[rows]
+
+    def latest(self, stations: Optional[Iterable] = None, start: TimeBound = None,
+               end: TimeBound = None) -> pd.DataFrame:
+        """Last reading of each selected station within [start, end]"""
+        last = [rows.stop - 1 for rows in (self.rows(station, start, end) for station in self._selected(stations))
+                if rows.stop > rows.start]
+        return self.data.iloc[last]
@@ -1,122 +1,318 @@
+import os
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Iterable, Iterator, List, Optional, Union
+
+from src.data_processing.derived_features import compute_derived_features
+from src.data_processing.feature_pipeline import FeaturePipeline
+
+# Reasonable limits for each measurement; values outside are clipped
+MEASUREMENT_LIMITS = {
+    'temperature': (-30, 50),  # °C
+    'humidity': (0, 100),      # %
+    'wind_speed': (0, 200),    # km/h
+    'precipitation': (0, 500),  # mm
+    'pressure': (900, 1100)    # hPa
+}
+
+def weather_score(temperature, wind_speed, precipitation, humidity):
+    """
+    Weather severity score, higher means more severe weather
+
+    Works element-wise on Series and arrays as well as on single values.
+    """
+    return (
+        (abs(temperature - 20) / 10) +  # Temperature deviation from 20°C
+        (wind_speed / 20) +             # Wind contribution
+        (precipitation * 2) +           # Precipitation contribution
+        (abs(humidity - 60) / 20)       # Humidity deviation from 60%
+    )
 
 class WeatherDataProcessor:
-    def __init__(self):
+    def __init__(self, derived_backend: str = 'numpy'):
         self.scaler = StandardScaler()
+        # Kernel used for derived features: 'numpy', 'numexpr' or 'numba'
+        self.derived_backend = derived_backend
+        # Scaler statistics and column order from the last fit, saved next to the model
+        self.pipeline: Optional[FeaturePipeline] = None
         self.feature_columns = ['temperature', 'humidity', 'wind_speed', 'precipitation', 'pressure', 'hour']
+        self.required_columns = ['timestamp', 'temperature', 'humidity',
+                                 'wind_speed', 'precipitation', 'pressure']
+        self.measurement_columns = ['temperature', 'humidity', 'wind_speed', 'precipitation', 'pressure']
         
     def load_data(self, file_path: str) -> pd.DataFrame:
         """
         Load weather data from file
         
         Args:
-            file_path: Path to the data file
+            file_path: Path to a CSV file, or to a Parquet file or dataset directory
             
         Returns:
             Pandas DataFrame containing weather data
         """
+        if os.path.isdir(file_path) or str(file_path).endswith('.parquet'):
+            return self.load_parquet(file_path)
+        
         try:
             df = pd.read_csv(file_path)
-            required_columns = ['timestamp', 'temperature', 'humidity', 
-                             'wind_speed', 'precipitation', 'pressure']
             
             # Verify all required columns are present
-            missing_cols = set(required_columns) - set(df.columns)
-            if missing_cols:
-                raise ValueError(f"Missing required columns: {missing_cols}")
+            self._validate_columns(df.columns)
                 
             return df
         except Exception as e:
             raise Exception(f"Error loading data: {str(e)}")
     
-    def preprocess_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def load_parquet(self, path: str, columns: Optional[List[str]] = None,
+                     start=None, end=None, cities: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load weather data from a Parquet dataset written by storage.write_parquet_dataset
+        
+        Args:
+            path: Dataset directory or single Parquet file
+            columns: Columns to read; the required columns are always included
+            start: Keep rows with timestamp >= start
+            end: Keep rows with timestamp <= end
+            cities: Keep rows for these cities
+            
+        Returns:
+            Pandas DataFrame containing weather data
+        """
+        # pyarrow is only needed when Parquet data is actually used
+        from src.data_processing.storage import read_parquet_dataset
+        
+        if columns is not None:
+            columns = list(dict.fromkeys(self.required_columns + list(columns)))
+        
+        try:
+            df = read_parquet_dataset(path, columns=columns, start=start, end=end, cities=cities)
+            self._validate_columns(df.columns)
+            return df
+        except Exception as e:
+            raise Exception(f"Error loading data: {str(e)}")
+    
+    def load_data_chunks(self, file_path: str, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        """
+        Stream weather data from a CSV file in fixed-size chunks
+        
+        Measurements are read as float32, timestamps as datetime64 and city as
+        a categorical, which keeps each chunk several times smaller than the
+        default dtypes. The header is validated once before any rows are read.
+        
+        Args:
+            file_path: Path to the data file
+            chunksize: Number of rows per chunk
+            
+        Returns:
+            Iterator of DataFrames with at most chunksize rows each
+        """
+        try:
+            header = pd.read_csv(file_path, nrows=0).columns
+            self._validate_columns(header)
+        except Exception as e:
+            raise Exception(f"Error loading data: {str(e)}")
+        
+        dtypes = {column: np.float32 for column in self.measurement_columns}
+        if 'city' in header:
+            dtypes['city'] = 'category'
+        
+        return pd.read_csv(file_path, chunksize=chunksize, dtype=dtypes, parse_dates=['timestamp'])
+    
+    def _validate_columns(self, columns):
+        """Raise ValueError if any required column is missing"""
+        missing_cols = set(self.required_columns) - set(columns)
+        if missing_cols:
+            raise ValueError(f"Missing required columns: {missing_cols}")
+    
+    def preprocess_data(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """
         Preprocess weather data
         
+        By default the input is copied exactly once and left untouched. With
+        inplace=True no copy is made at all: the input frame is modified and
+        returned, which keeps peak memory close to the size of the data.
+        
         Args:
             df: Input DataFrame
+            inplace: Modify df directly instead of working on a copy
             
         Returns:
-            Preprocessed DataFrame
+            Preprocessed DataFrame (df itself when inplace=True)
         """
+        if not inplace:
+            df = df.copy()
+        
         # Convert timestamp to datetime
         df['timestamp'] = pd.to_datetime(df['timestamp'])
         
-        df = df.copy()
-        df = self._handle_missing_values(df)
-        df = self._remove_outliers(df)
-        df = self._add_derived_features(df)
+        self._handle_missing_values(df, inplace=True)
+        self._remove_outliers(df, inplace=True)
+        self._add_derived_features(df, inplace=True)
         
         return df
     
-    def _handle_missing_values(self, df: pd.DataFrame) -> pd.DataFrame:
+    def preprocess_parallel(self, df: pd.DataFrame, by: str = 'city', max_workers: Optional[int] = None,
+                            inplace: bool = False) -> pd.DataFrame:
+        """
+        Preprocess each station separately in a process pool
+        
+        Unlike preprocess_data, gaps are only filled from the same station,
+        which is what allows the stations to be processed independently.
+        See parallel.preprocess_by_station.
+        
+        Args:
+            df: Input DataFrame with a station column
+            by: Station column to partition on
+            max_workers: Worker processes, defaults to the CPU count
+            inplace: Modify df directly instead of working on a copy
+            
+        Returns:
+            Preprocessed DataFrame in the original row order
+        """
+        from src.data_processing.parallel import preprocess_by_station
+        
+        return preprocess_by_station(self, df, by=by, max_workers=max_workers, inplace=inplace)
+    
+    def preprocess_chunks(self, chunks: Iterable[pd.DataFrame],
+                          max_pending_rows: Optional[int] = 500_000) -> Iterator[pd.DataFrame]:
+        """
+        Preprocess a stream of chunks, e.g. from load_data_chunks
+        
+        Gives the same result as preprocess_data on the concatenated frame.
+        The last known value of each measurement is carried into the next
+        chunk for forward filling. Chunks are held back only while some
+        measurement has not had a single value yet, so its leading gap can be
+        back filled from the first value that eventually arrives.
+        
+        Held-back chunks are emitted anyway once they reach max_pending_rows,
+        so a measurement that is missing for a long stretch (or entirely)
+        cannot pull the whole file into memory. The part of its leading gap
+        emitted that way stays NaN; only the rows still held back when the
+        first value arrives are back filled.
+        
+        Args:
+            chunks: Iterable of DataFrames in timestamp order
+            max_pending_rows: Most rows held back for back filling; None for no limit
+            
+        Returns:
+            Iterator of preprocessed DataFrames
+        """
+        columns = self.measurement_columns
+        carry = pd.Series(np.nan, index=columns)
+        pending = []
+        pending_rows = 0
+        
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            chunk = chunk.copy()
+            chunk['timestamp'] = pd.to_datetime(chunk['timestamp'])
+            
+            # Forward fill within the chunk, then continue from the previous chunk
+            chunk[columns] = chunk[columns].ffill().fillna(carry)
+            carry = chunk[columns].iloc[-1]
+            pending.append(chunk)
+            pending_rows += len(chunk)
+            
+            if carry.notna().all() or (max_pending_rows is not None and pending_rows >= max_pending_rows):
+                yield self._finish_chunk(pending)
+                pending = []
+                pending_rows = 0
+        
+        if pending:
+            yield self._finish_chunk(pending)
+    
+    def _finish_chunk(self, pending: list) -> pd.DataFrame:
+        """Back fill leading gaps across held-back chunks and apply the remaining steps"""
+        df = pending[0] if len(pending) == 1 else pd.concat(pending)
+        df[self.measurement_columns] = df[self.measurement_columns].bfill()
+        self._remove_outliers(df, inplace=True)
+        self._add_derived_features(df, inplace=True)
+        return df
+    
+    def _handle_missing_values(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """Handle missing values in the dataset"""
-        df = df.copy()
-        numeric_columns = ['temperature', 'humidity', 'wind_speed', 'precipitation', 'pressure']
+        if not inplace:
+            df = df.copy()
         
-        # Forward fill then backward fill for missing values
-        df[numeric_columns] = df[numeric_columns].ffill().bfill()
+        # Forward fill then backward fill for missing values, one column at a
+        # time so only columns with gaps allocate a replacement
+        for column in self.measurement_columns:
+            if df[column].hasnans:
+                df[column] = df[column].ffill().bfill()
         
         return df
     
-    def _remove_outliers(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _remove_outliers(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """Remove or adjust extreme outliers"""
-        df = df.copy()
-        
-        # Define reasonable limits for each feature
-        limits = {
-            'temperature': (-30, 50),  # °C
-            'humidity': (0, 100),      # %
-            'wind_speed': (0, 200),    # km/h
-            'precipitation': (0, 500),  # mm
-            'pressure': (900, 1100)    # hPa
-        }
-        
-        # Clip values to their reasonable ranges
-        for column, (min_val, max_val) in limits.items():
-            if column in df.columns:
+        if not inplace:
+            df = df.copy()
+        
+        # Clip values to their reasonable ranges, skipping columns already inside them
+        for column, (min_val, max_val) in MEASUREMENT_LIMITS.items():
+            if column in df.columns and (df[column].min() < min_val or df[column].max() > max_val):
                 df[column] = df[column].clip(min_val, max_val)
         
         return df
     
-    def _add_derived_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _add_derived_features(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """Add derived features like hour, month, and weather score"""
-        df = df.copy()
-        
-        # Extract time-based features
-        df['hour'] = df['timestamp'].dt.hour
-        df['month'] = df['timestamp'].dt.month
+        if not inplace:
+            df = df.copy()
         
-        # Calculate weather score (example: higher score means more severe weather)
-        df['weather_score'] = (
-            ((df['temperature'] - 20).abs() / 10) +  # Temperature deviation from 20°C
-            (df['wind_speed'] / 20) +                # Wind contribution
-            (df['precipitation'] * 2) +              # Precipitation contribution
-            ((df['humidity'] - 60).abs() / 20)       # Humidity deviation from 60%
-        )
+        # hour, month and weather_score come from one fused float32 kernel
+        features = compute_derived_features(df['temperature'], df['humidity'], df['wind_speed'],
+                                            df['precipitation'], timestamps=df['timestamp'],
+                                            backend=self.derived_backend)
+        for name, values in features.items():
+            df[name] = values
         
         return df
     
-    def prepare_features(self, df: pd.DataFrame) -> Tuple[np.ndarray, list]:
+    def prepare_features(self, df: Union[pd.DataFrame, np.ndarray], fit: bool = True) -> Tuple[np.ndarray, list]:
         """
         Prepare features for model training
         
         Args:
-            df: Preprocessed DataFrame
+            df: Preprocessed DataFrame, or an array whose columns follow
+                feature_columns, e.g. from StationRange.feature_array
+            fit: Fit the scaler on this data. With False the pipeline from an
+                earlier fit or load_feature_pipeline is applied instead, so
+                nothing is refit.
             
         Returns:
             Tuple containing feature array and feature names
         """
-        df = df.copy()
+        # Arrays are used as-is so that memory-mapped station data is never
+        # materialized as a DataFrame
+        features = df if isinstance(df, np.ndarray) else df[self.feature_columns]
+        
+        if not fit:
+            if self.pipeline is None:
+                raise ValueError("No fitted feature pipeline; call prepare_features with fit=True first")
+            return self.pipeline.transform(np.asarray(features)), self.feature_columns
         
         # Scale the features
-        X = self.scaler.fit_transform(df[self.feature_columns])
+        X = self.scaler.fit_transform(features)
+        self.pipeline = FeaturePipeline.from_scaler(self.scaler, self.feature_columns)
         
         return X, self.feature_columns
     
+    def load_feature_pipeline(self, path: str) -> FeaturePipeline:
+        """
+        Load a pipeline saved next to a model, for prepare_features(df, fit=False)
+        
+        Args:
+            path: Path to the .npz file written by FeaturePipeline.save
+            
+        Returns:
+            The loaded FeaturePipeline
+        """
+        self.pipeline = FeaturePipeline.load(path)
+        self.feature_columns = list(self.pipeline.columns)
+        return self.pipeline
+    
     def get_feature_importance(self, model, feature_names: list) -> Dict[str, float]:
         """
         Get feature importance scores
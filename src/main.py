@@ -1,15 +1,55 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List, Optional, Tuple
 import numpy as np
-import tensorflow as tf
 import uvicorn
+import asyncio
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.serving.batching import BatchQueueFull, MicroBatcher
+from src.serving.executor import InferenceExecutor, InferenceQueueFull
+from src.serving.registry import ModelRegistry, ModelLoadError, ModelVersion
+from src.serving.cache import PredictionCache, SQLiteCacheBackend
+
+# Versioned models live in subdirectories of the registry directory
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "models/registry")
+
+# Single-file models used when the registry is empty; NumPy weights are preferred
+NUMPY_MODEL_PATH = 'models/weather_risk_model.npz'
+KERAS_MODEL_PATH = 'models/weather_risk_model.h5'
+
+# Raw input columns built from each reading. Models saved with a feature
+# pipeline pick their columns from these by name; older models take the five
+# measurements unscaled.
+INPUT_COLUMNS = ['temperature', 'humidity', 'wind_speed', 'precipitation', 'pressure', 'hour', 'month']
+MEASUREMENT_COUNT = 5
+
+# Micro-batching configuration for single /predict calls
+MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", "32"))
+MAX_BATCH_WAIT_MS = float(os.getenv("PREDICT_MAX_BATCH_WAIT_MS", "5"))
+
+# Inference thread pool configuration
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+INFERENCE_QUEUE_DEPTH = int(os.getenv("INFERENCE_QUEUE_DEPTH", "64"))
+
+# Prediction cache configuration; a size of 0 disables caching
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL_S = float(os.getenv("PREDICTION_CACHE_TTL_S", "60"))
+PREDICTION_CACHE_PRECISION = int(os.getenv("PREDICTION_CACHE_PRECISION", "1"))
+PREDICTION_CACHE_SHARED_PATH = os.getenv("PREDICTION_CACHE_SHARED_PATH", "")
 
 app = FastAPI(title="Extreme Weather Management System",
              description="API for weather risk assessment and prediction")
 
-# Load the trained model (placeholder)
-model = None
+# Holds the model version currently serving requests
+registry = ModelRegistry(MODEL_REGISTRY_DIR, warmup_batch_sizes=(1, MAX_BATCH_SIZE))
+
+# Set once the background warmup has loaded the model and run a first prediction
+model_ready = False
+warmup_task: Optional[asyncio.Task] = None
 
 class WeatherData(BaseModel):
     timestamp: datetime
@@ -25,25 +65,105 @@ class RiskAssessment(BaseModel):
     confidence: float
     recommendations: list
     timestamp: datetime
+    model_version: Optional[str] = None
 
 def load_model():
-    """Load the trained model"""
-    global model
+    """Load the newest registry version, falling back to the single-file model"""
     try:
-        model = tf.keras.models.load_model('models/weather_risk_model.h5')
-    except:
-        print("Warning: Model not found. Using dummy predictions.")
+        if registry.versions():
+            registry.reload()
+        elif os.path.exists(NUMPY_MODEL_PATH):
+            registry.load_path(NUMPY_MODEL_PATH, version='default')
+        elif os.path.exists(KERAS_MODEL_PATH):
+            registry.load_path(KERAS_MODEL_PATH, version='default')
+        else:
+            print("Warning: Model not found. Using dummy predictions.")
+    except ModelLoadError as e:
+        print(f"Warning: {e}. Using dummy predictions.")
 
 def preprocess_data(data: WeatherData):
-    """Preprocess weather data for model input"""
+    """Preprocess weather data for model input, one row in INPUT_COLUMNS order"""
     return np.array([[
         data.temperature,
         data.humidity,
         data.wind_speed,
         data.precipitation,
-        data.pressure
+        data.pressure,
+        data.timestamp.hour,
+        data.timestamp.month
     ]])
 
+def preprocess_batch(batch: List[WeatherData]) -> np.ndarray:
+    """Stack a list of weather readings into a single model input array"""
+    return np.vstack([preprocess_data(data) for data in batch])
+
+def model_inputs(features: np.ndarray, active: ModelVersion) -> np.ndarray:
+    """Raw columns of the feature array that the given model version was trained on"""
+    if active.pipeline is None:
+        return features[:, :MEASUREMENT_COUNT]
+    return features[:, [INPUT_COLUMNS.index(column) for column in active.pipeline.columns]]
+
+def run_inference(features: np.ndarray, active: Optional[ModelVersion] = None) -> Tuple[np.ndarray, Optional[str]]:
+    """
+    Run the model over a 2D feature array and return one prediction per row plus the model version
+
+    Args:
+        features: Rows in INPUT_COLUMNS order
+        active: Version to run, by default the active one at call time
+    """
+    # Take one reference so a hot reload mid-call cannot mix versions
+    if active is None:
+        active = registry.active
+
+    # Dummy predictions if model not loaded
+    if active is None:
+        return np.random.random(len(features)), None
+
+    inputs = model_inputs(features, active)
+    # Scaling with the training statistics is one affine transform per batch
+    if active.pipeline is not None:
+        inputs = active.pipeline.transform(inputs)
+    return active.model.predict(inputs, verbose=0).reshape(-1), active.version
+
+# Model inference is blocking, so it runs on a bounded pool off the event loop
+executor = InferenceExecutor(max_workers=INFERENCE_WORKERS,
+                             max_queue=INFERENCE_QUEUE_DEPTH)
+
+async def predict_batch_async(features: np.ndarray) -> List[Tuple[float, Optional[str]]]:
+    """Batch prediction hook used by the micro-batcher"""
+    predictions, version = await executor.run(run_inference, features)
+    return [(prediction, version) for prediction in predictions]
+
+# One batch per inference worker runs at once; past that, INFERENCE_QUEUE_DEPTH
+# batches' worth of rows may wait before /predict answers 503
+batcher = MicroBatcher(predict_batch_async,
+                       max_batch_size=MAX_BATCH_SIZE,
+                       max_wait_ms=MAX_BATCH_WAIT_MS,
+                       max_in_flight=INFERENCE_WORKERS,
+                       max_queue=INFERENCE_QUEUE_DEPTH * MAX_BATCH_SIZE)
+
+def create_cache() -> Optional[PredictionCache]:
+    """Build the prediction cache from the environment configuration"""
+    if PREDICTION_CACHE_SIZE <= 0:
+        return None
+    # A negative precision would make every cache key, and so every prediction, fail
+    if PREDICTION_CACHE_PRECISION < 0:
+        raise ValueError(f"PREDICTION_CACHE_PRECISION must be non-negative, got {PREDICTION_CACHE_PRECISION}")
+    backend = SQLiteCacheBackend(PREDICTION_CACHE_SHARED_PATH) if PREDICTION_CACHE_SHARED_PATH else None
+    return PredictionCache(max_entries=PREDICTION_CACHE_SIZE,
+                           ttl=PREDICTION_CACHE_TTL_S,
+                           precision=PREDICTION_CACHE_PRECISION,
+                           backend=backend)
+
+cache = create_cache()
+
+def cache_keys(features: np.ndarray, active: Optional[ModelVersion]) -> Optional[List[str]]:
+    """Cache keys for each feature row under the given version, or None when results must not be cached"""
+    # Dummy predictions are random, so they are never cached
+    if cache is None or active is None:
+        return None
+    return [cache.make_key(row, active.version) for row in model_inputs(features, active)]
+
 def get_risk_level(prediction: float) -> str:
     """Convert model prediction to risk level"""
     if prediction < 0.3:
@@ -62,32 +182,106 @@ def get_recommendations(risk_level: str) -> list:
     }
     return recommendations.get(risk_level, [])
 
+def build_assessment(prediction: float, model_version: Optional[str] = None) -> RiskAssessment:
+    """Turn a single model output into a RiskAssessment"""
+    risk_level = get_risk_level(prediction)
+    recommendations = get_recommendations(risk_level)
+
+    return RiskAssessment(
+        risk_level=risk_level,
+        confidence=float(prediction),
+        recommendations=recommendations,
+        timestamp=datetime.now(),
+        model_version=model_version
+    )
+
+@app.on_event("startup")
+async def start_batcher():
+    batcher.start()
+
+async def warmup_model():
+    """Load the model and run one synthetic prediction so the first request is fast"""
+    global model_ready
+    await asyncio.get_running_loop().run_in_executor(None, load_model)
+    await executor.run(run_inference, np.zeros((1, len(INPUT_COLUMNS))))
+    model_ready = True
+
+@app.on_event("startup")
+async def start_warmup():
+    global warmup_task
+    # The server accepts connections while the model loads; /ready reports when it is done
+    if not model_ready and (warmup_task is None or warmup_task.done()):
+        warmup_task = asyncio.get_running_loop().create_task(warmup_model())
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    await batcher.stop()
+    executor.shutdown(wait=False)
+
+def overloaded() -> HTTPException:
+    return HTTPException(status_code=503, detail="Inference queue is full, retry later")
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Extreme Weather Management System API"}
 
 @app.post("/predict", response_model=RiskAssessment)
 async def predict_risk(data: WeatherData):
+    # Preprocess input data
+    processed_data = preprocess_data(data)
+
+    # One reference per request, so a hot reload cannot relabel a cached score
+    active = registry.active
+    keys = cache_keys(processed_data, active)
+    if keys is not None:
+        cached, = await cache.get_many_async(keys)
+        if cached is not None:
+            return build_assessment(cached, active.version)
+
     try:
-        # Preprocess input data
-        processed_data = preprocess_data(data)
-        
-        # Make prediction (dummy prediction if model not loaded)
-        if model is None:
-            prediction = np.random.random()
-        else:
-            prediction = model.predict(processed_data)[0][0]
+        # Concurrent single requests are coalesced into one model call, which
+        # runs the version active at that time and reports it
+        prediction, version = await batcher.submit(processed_data)
         
-        # Get risk level and recommendations
-        risk_level = get_risk_level(prediction)
-        recommendations = get_recommendations(risk_level)
-        
-        return RiskAssessment(
-            risk_level=risk_level,
-            confidence=float(prediction),
-            recommendations=recommendations,
-            timestamp=datetime.now()
-        )
+        # Skip caching if a hot reload swapped the model while we were waiting
+        if keys is not None and keys[0].startswith(f"{version}|"):
+            cache.set_background({keys[0]: prediction})
+        return build_assessment(prediction, version)
+    except (BatchQueueFull, InferenceQueueFull):
+        raise overloaded()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/batch", response_model=List[RiskAssessment])
+async def predict_risk_batch(batch: List[WeatherData]):
+    if not batch:
+        return []
+    features = preprocess_batch(batch)
+    results = [None] * len(batch)
+
+    # Cache keys, inference and the reported version all use this one version
+    active = registry.active
+    keys = cache_keys(features, active)
+    if keys is not None:
+        for i, cached in enumerate(await cache.get_many_async(keys)):
+            if cached is not None:
+                results[i] = (cached, active.version)
+
+    # Only rows that missed the cache go to the model, still as one call
+    missing = [i for i, result in enumerate(results) if result is None]
+    try:
+        if missing:
+            predictions, version = await executor.run(run_inference, features[missing], active)
+            fresh = {}
+            for i, prediction in zip(missing, predictions):
+                results[i] = (prediction, version)
+                if keys is not None:
+                    fresh[keys[i]] = prediction
+            if fresh:
+                cache.set_background(fresh)
+        return [build_assessment(prediction, version) for prediction, version in results]
+    except InferenceQueueFull:
+        raise overloaded()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -95,6 +289,42 @@ async def predict_risk(data: WeatherData):
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now()}
 
+@app.get("/ready")
+async def readiness_check():
+    if not model_ready:
+        raise HTTPException(status_code=503, detail="Model is warming up")
+    active = registry.active
+    return {
+        "status": "ready",
+        "model_loaded": active is not None,
+        "model_version": active.version if active else None,
+        "timestamp": datetime.now()
+    }
+
+@app.get("/cache/stats")
+async def cache_stats():
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@app.get("/models")
+async def list_models():
+    active = registry.active
+    return {
+        "active": active.info() if active else None,
+        "available": registry.versions()
+    }
+
+@app.post("/models/reload")
+async def reload_model(version: Optional[str] = None):
+    """Load, warm up and swap in a model version; the newest one by default"""
+    try:
+        # Loading runs on a separate thread so in-flight inference keeps being served
+        loaded = await asyncio.get_running_loop().run_in_executor(None, registry.reload, version)
+    except ModelLoadError as e:
+        status_code = 404 if version is not None and version not in registry.versions() else 500
+        raise HTTPException(status_code=status_code, detail=str(e))
+    return {"active": loaded.info()}
+
 if __name__ == "__main__":
-    load_model()
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,186 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+BatchPredictFn = Callable[[np.ndarray], Awaitable[Sequence[Any]]]
+
+
+class BatchQueueFull(Exception):
+    """Raised when a row is submitted while the batcher has no room for it"""
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-row predictions into one vectorized model call
+
+    Callers submit one feature row each and await their own prediction. A
+    background task collects rows until either max_batch_size rows are queued
+    or max_wait_ms has passed since the first row arrived, stacks them and
+    runs predict_fn once over the whole batch. predict_fn must return one
+    result per row, and each caller receives the result for its own row.
+
+    Up to max_in_flight batches run at once. While they all run, at most
+    max_queue rows may wait for the next batch; submitting beyond that
+    raises BatchQueueFull instead of letting latency grow without bound.
+    While a batch slot is free, a full batch may additionally be gathered.
+    """
+
+    def __init__(self, predict_fn: BatchPredictFn, max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, max_in_flight: int = 1,
+                 max_queue: Optional[int] = None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be non-negative")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if max_queue is not None and max_queue < 0:
+            raise ValueError("max_queue must be non-negative")
+
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batches: Set[asyncio.Task] = set()
+        # Rows submitted but not yet handed to predict_fn
+        self._waiting = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of batches currently running"""
+        return len(self._batches)
+
+    def has_room(self) -> bool:
+        if self.max_queue is None:
+            return True
+        free_slots = self.max_in_flight - len(self._batches)
+        return self._waiting < self.max_queue + free_slots * self.max_batch_size
+
+    def start(self):
+        """Start the batching task on the running event loop"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._waiting = 0
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Cancel the batching task and fail any rows still waiting"""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        batches = list(self._batches)
+        for task in batches:
+            task.cancel()
+        await asyncio.gather(*batches, return_exceptions=True)
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+        self._waiting = 0
+
+    async def submit(self, features: np.ndarray) -> Any:
+        """
+        Queue one feature row and wait for its prediction
+
+        Args:
+            features: Array of shape (n_features,) or (1, n_features)
+
+        Returns:
+            The entry of predict_fn's output that belongs to this row
+
+        Raises:
+            BatchQueueFull: If every batch slot is busy and max_queue rows already wait
+        """
+        self.start()
+        if not self.has_room():
+            raise BatchQueueFull(f"Batch queue is full ({self._waiting} rows waiting)")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((np.asarray(features).reshape(-1), future))
+        self._waiting += 1
+        return await future
+
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        """Wait for the first row, then gather more until the batch is full or the window closes"""
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Drain whatever is already queued before waiting on the clock
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if len(batch) >= self.max_batch_size:
+                break
+
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        while True:
+            # Rows keep queueing while every slot is busy, so the next batch is fuller
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            self._waiting -= len(batch)
+
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        self._batches.discard(task)
+        self._slots.release()
+
+    async def _dispatch(self, batch: List[Tuple[np.ndarray, asyncio.Future]]):
+        """Run predict_fn over one batch and hand each caller its result"""
+        rows = [row for row, future in batch if not future.cancelled()]
+        futures = [future for _, future in batch if not future.cancelled()]
+        if not rows:
+            return
+
+        try:
+            results = await self.predict_fn(np.vstack(rows))
+        except asyncio.CancelledError:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(RuntimeError("Batcher stopped"))
+            raise
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if len(results) != len(futures):
+            error = RuntimeError(f"Expected {len(futures)} predictions, got {len(results)}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
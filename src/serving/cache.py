@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteCacheBackend:
+    """
+    Shared prediction cache stored in a local SQLite file
+
+    Every worker process that points at the same file sees the entries written
+    by the others, which stands in for a networked cache such as Redis when
+    the service runs as several uvicorn workers on one host.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=1.0)
+        # WAL lets readers in other processes proceed while one process writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions "
+            "(key TEXT PRIMARY KEY, value REAL NOT NULL, expires_at REAL NOT NULL)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[float]:
+        found = self.get_many([key]).get(key)
+        return found[0] if found else None
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Tuple[float, float]]:
+        """(value, seconds until it expires) for the keys that have an unexpired value"""
+        now = time.time()
+        found = {}
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM predictions WHERE key = ? AND expires_at > ?",
+                    (key, now)).fetchone()
+                if row:
+                    found[key] = (row[0], row[1] - now)
+        return found
+
+    def set(self, key: str, value: float, ttl: float):
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: Dict[str, float], ttl: float):
+        """Store several values in one transaction"""
+        expires_at = time.time() + ttl
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO predictions (key, value, expires_at) VALUES (?, ?, ?)",
+                    [(key, value, expires_at) for key, value in items.items()])
+                self._conn.commit()
+            except sqlite3.Error:
+                self._conn.rollback()
+                raise
+
+    def purge_expired(self) -> int:
+        """Delete expired rows and return how many were removed"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM predictions WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PredictionCache:
+    """
+    In-process LRU cache with TTL for model predictions
+
+    Keys are the model input features rounded to `precision` decimals plus the
+    model version, so near-identical readings share an entry and a model
+    reload never serves predictions from the previous version. An optional
+    shared backend is consulted on local misses and written on every store.
+    A backend that fails, e.g. with a locked database, counts as a miss and
+    failed writes are logged, so the cache never fails a prediction.
+
+    Backend calls block, so code on an event loop uses get_many_async and
+    set_background, which run them on a thread.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60.0, precision: int = 1,
+                 backend: Optional[SQLiteCacheBackend] = None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if precision < 0:
+            raise ValueError("precision must be non-negative")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.precision = precision
+        self.backend = backend
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.shared_hits = 0
+        self.shared_errors = 0
+
+    def make_key(self, features: np.ndarray, model_version: str) -> str:
+        """Build a cache key from one row of model features"""
+        rounded = np.round(np.asarray(features, dtype=np.float64).reshape(-1), self.precision)
+        # Adding 0.0 turns -0.0 into 0.0 so both round to the same key
+        return model_version + '|' + ','.join(f'{value + 0.0:.{self.precision}f}' for value in rounded)
+
+    def _get_local(self, key: str, now: float) -> Optional[float]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+            self.expirations += 1
+            return None
+
+    def _get_shared(self, keys: Sequence[str]) -> Dict[str, Tuple[float, float]]:
+        try:
+            return self.backend.get_many(keys)
+        except sqlite3.Error as e:
+            logger.warning("Shared prediction cache lookup failed: %s", e)
+            with self._lock:
+                self.shared_errors += 1
+            return {}
+
+    def _set_shared(self, items: Dict[str, float]):
+        try:
+            self.backend.set_many(items, self.ttl)
+        except sqlite3.Error as e:
+            logger.warning("Shared prediction cache write of %d entries failed: %s", len(items), e)
+            with self._lock:
+                self.shared_errors += 1
+
+    def _lookup(self, keys: Sequence[str], now: float) -> List[Optional[float]]:
+        """Local lookups, counting hits; misses are counted in _resolve"""
+        values = [self._get_local(key, now) for key in keys]
+        with self._lock:
+            self.hits += sum(value is not None for value in values)
+        return values
+
+    def _resolve(self, keys: Sequence[str], values: List[Optional[float]],
+                 shared: Dict[str, float], now: float) -> List[Optional[float]]:
+        """Fill local misses from shared results and update the counters"""
+        # Shared entries keep their remaining TTL rather than starting a new one
+        for key, (value, remaining) in shared.items():
+            self._store_local(key, value, now + remaining)
+        filled = 0
+        for i, key in enumerate(keys):
+            if values[i] is None and key in shared:
+                values[i] = shared[key][0]
+                filled += 1
+        with self._lock:
+            self.hits += filled
+            self.shared_hits += filled
+            self.misses += sum(value is None for value in values)
+        return values
+
+    def get(self, key: str) -> Optional[float]:
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[float]]:
+        """Cached values for keys, None where missing"""
+        now = time.monotonic()
+        values = self._lookup(keys, now)
+        missing = list(dict.fromkeys(key for key, value in zip(keys, values) if value is None))
+        shared = self._get_shared(missing) if missing and self.backend is not None else {}
+        return self._resolve(keys, values, shared, now)
+
+    async def get_many_async(self, keys: Sequence[str]) -> List[Optional[float]]:
+        """get_many with the shared lookups run on a thread"""
+        now = time.monotonic()
+        values = self._lookup(keys, now)
+        missing = list(dict.fromkeys(key for key, value in zip(keys, values) if value is None))
+        shared = {}
+        if missing and self.backend is not None:
+            shared = await asyncio.to_thread(self._get_shared, missing)
+        return self._resolve(keys, values, shared, now)
+
+    def set(self, key: str, value: float):
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, float]):
+        items = {key: float(value) for key, value in items.items()}
+        now = time.monotonic()
+        for key, value in items.items():
+            self._store_local(key, value, now + self.ttl)
+        if self.backend is not None and items:
+            self._set_shared(items)
+
+    def set_background(self, items: Dict[str, float]):
+        """
+        set_many without waiting for the shared backend
+
+        Local entries are stored right away and the backend write runs on the
+        event loop's default executor, so responses do not wait for it.
+        """
+        items = {key: float(value) for key, value in items.items()}
+        now = time.monotonic()
+        for key, value in items.items():
+            self._store_local(key, value, now + self.ttl)
+        if self.backend is not None and items:
+            asyncio.get_running_loop().run_in_executor(None, self._set_shared, items)
+
+    def _store_local(self, key: str, value: float, expires_at: float):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'shared_hits': self.shared_hits,
+            'shared_errors': self.shared_errors,
+            'shared_backend': self.backend is not None
+        }
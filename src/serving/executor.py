@@ -0,0 +1,79 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the inference executor has no room for another job"""
+
+
+class InferenceExecutor:
+    """
+    Run blocking model inference on a bounded thread pool
+
+    At most max_workers jobs run at once and at most max_queue more wait for
+    a free worker. Submitting beyond that raises InferenceQueueFull instead of
+    letting latency grow without bound.
+    """
+
+    def __init__(self, max_workers: int = 1, max_queue: int = 64):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must be non-negative")
+
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of running plus queued jobs"""
+        return self.max_workers + self.max_queue
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs currently running or waiting for a worker"""
+        return self._pending
+
+    def is_full(self) -> bool:
+        return self._pending >= self.capacity
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run fn(*args) on the pool and await its result
+
+        Raises:
+            InferenceQueueFull: If all workers are busy and the queue is full
+        """
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise InferenceQueueFull(
+                    f"Inference queue is full ({self._pending} jobs pending)")
+            self._pending += 1
+
+        try:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="inference")
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+
+        # Release the slot when the job finishes, even if the caller gave up waiting
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads; the pool is recreated on the next run"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
@@ -0,0 +1,192 @@
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from models.numpy_model import NumpyRiskModel
+from src.data_processing.feature_pipeline import FeaturePipeline, PIPELINE_FILENAME
+
+# Artifact names looked up inside a version directory, in order of preference
+ARTIFACT_NAMES = ['model.npz', 'model.keras', 'model.h5']
+
+# Typical readings (temperature, humidity, wind_speed, precipitation, pressure)
+# used to build the synthetic warmup batch
+WARMUP_FEATURES = np.array([20.0, 60.0, 15.0, 1.0, 1013.0], dtype=np.float32)
+
+# Typical raw value of every column a feature pipeline may ask for
+WARMUP_READING = {
+    'temperature': 20.0, 'humidity': 60.0, 'wind_speed': 15.0, 'precipitation': 1.0,
+    'pressure': 1013.0, 'hour': 12.0, 'month': 6.0
+}
+
+
+class ModelLoadError(Exception):
+    """Raised when a model artifact cannot be found, loaded or warmed up"""
+
+
+class ModelVersion:
+    """A loaded, warmed-up model together with where it came from"""
+
+    def __init__(self, version: str, model, path: str, pipeline: Optional[FeaturePipeline] = None):
+        self.version = version
+        self.model = model
+        self.path = path
+        # Scaling applied to raw inputs before predict; None for models trained on raw values
+        self.pipeline = pipeline
+        self.loaded_at = datetime.now()
+
+    def info(self) -> Dict:
+        return {
+            'version': self.version,
+            'path': self.path,
+            'backend': type(self.model).__name__,
+            'feature_columns': self.pipeline.columns if self.pipeline else None,
+            'loaded_at': self.loaded_at
+        }
+
+
+def _version_key(version: str):
+    """Sort key so that v2 < v10"""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', version)]
+
+
+def _is_plain_name(version: str) -> bool:
+    """Whether version names a directory directly inside model_dir"""
+    return (bool(version) and version not in (os.curdir, os.pardir)
+            and os.path.basename(version) == version
+            and not (os.altsep and os.altsep in version))
+
+
+def load_artifact(path: str):
+    """
+    Load a model artifact from disk
+
+    .npz files are loaded with the NumPy engine; anything else is treated as
+    a Keras model, in which case TensorFlow is imported on first use.
+    """
+    if path.endswith('.npz'):
+        return NumpyRiskModel.load(path)
+
+    import tensorflow as tf
+    return tf.keras.models.load_model(path)
+
+
+def load_pipeline(path: str) -> Optional[FeaturePipeline]:
+    """Load the feature pipeline saved next to a model artifact, if there is one"""
+    pipeline_path = os.path.join(os.path.dirname(path), PIPELINE_FILENAME)
+    if not os.path.isfile(pipeline_path):
+        return None
+    return FeaturePipeline.load(pipeline_path)
+
+
+class ModelRegistry:
+    """
+    Versioned model artifacts loaded from a local directory
+
+    Each subdirectory of model_dir is a version and holds one artifact named
+    as in ARTIFACT_NAMES, optionally with the feature pipeline the model was
+    trained with. Loading a version warms it with a synthetic batch
+    before it is swapped in. The swap is a single reference assignment, so
+    requests that already picked up the previous version finish on it.
+    """
+
+    def __init__(self, model_dir: str, warmup_batch_sizes=(1, 32)):
+        self.model_dir = model_dir
+        self.warmup_batch_sizes = warmup_batch_sizes
+        self._active: Optional[ModelVersion] = None
+        # Serializes loads so two concurrent reloads cannot race each other
+        self._load_lock = threading.Lock()
+
+    @property
+    def active(self) -> Optional[ModelVersion]:
+        """The version currently serving requests, or None if nothing is loaded"""
+        return self._active
+
+    def versions(self) -> List[str]:
+        """List versions that have a loadable artifact, oldest first"""
+        if not os.path.isdir(self.model_dir):
+            return []
+
+        versions = [
+            name for name in os.listdir(self.model_dir)
+            if self._artifact_path(name) is not None
+        ]
+        return sorted(versions, key=_version_key)
+
+    def _artifact_path(self, version: str) -> Optional[str]:
+        if not _is_plain_name(version):
+            return None
+        version_dir = os.path.join(self.model_dir, version)
+        for name in ARTIFACT_NAMES:
+            path = os.path.join(version_dir, name)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def reload(self, version: Optional[str] = None) -> ModelVersion:
+        """
+        Load, warm up and activate a version
+
+        Args:
+            version: Version to activate; defaults to the newest one
+
+        Returns:
+            The newly active ModelVersion
+
+        Raises:
+            ModelLoadError: If the version does not exist or fails to load.
+                The previously active version stays in place.
+        """
+        if version is None:
+            versions = self.versions()
+            if not versions:
+                raise ModelLoadError(f"No model versions found in {self.model_dir}")
+            version = versions[-1]
+        elif version not in self.versions():
+            # Only listed versions, never a path a caller made up, e.g. '../secrets'
+            raise ModelLoadError(f"Model version not found: {version}")
+
+        path = self._artifact_path(version)
+        if path is None:
+            raise ModelLoadError(f"Model version not found: {version}")
+
+        return self.load_path(path, version)
+
+    def load_path(self, path: str, version: str) -> ModelVersion:
+        """Load, warm up and activate an artifact outside of model_dir"""
+        with self._load_lock:
+            try:
+                model = load_artifact(path)
+                pipeline = load_pipeline(path)
+            except Exception as e:
+                raise ModelLoadError(f"Failed to load model {version} from {path}: {e}") from e
+
+            self._warmup(model, version, pipeline)
+            loaded = ModelVersion(version, model, path, pipeline)
+            self._active = loaded
+            return loaded
+
+    def _warmup(self, model, version: str, pipeline: Optional[FeaturePipeline] = None):
+        """Run synthetic batches so the first real request does not pay tracing cost"""
+        features = WARMUP_FEATURES
+        if pipeline is not None:
+            unknown = [column for column in pipeline.columns if column not in WARMUP_READING]
+            if unknown:
+                raise ModelLoadError(f"Model {version} uses unsupported feature columns: {unknown}")
+            features = pipeline.transform(np.array([WARMUP_READING[column] for column in pipeline.columns]))[0]
+
+        for batch_size in self.warmup_batch_sizes:
+            batch = np.tile(features, (batch_size, 1))
+            try:
+                predictions = np.asarray(model.predict(batch, verbose=0))
+            except Exception as e:
+                raise ModelLoadError(f"Warmup failed for model {version}: {e}") from e
+
+            if predictions.reshape(-1).shape != (batch_size,):
+                raise ModelLoadError(
+                    f"Model {version} returned shape {predictions.shape} for a batch of {batch_size}")
@@ -0,0 +1,190 @@
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Plot width assumed when the caller does not know the viewport, in pixels
+DEFAULT_VIEWPORT_WIDTH = 1200
+
+# Points kept per horizontal pixel; min/max buckets need two to draw a pixel column
+POINTS_PER_PIXEL = 2
+
+METHODS = ('minmax', 'lttb')
+
+
+def target_points(width: int = DEFAULT_VIEWPORT_WIDTH) -> int:
+    """Number of points a trace needs to look identical at the given plot width"""
+    return max(int(width), 1) * POINTS_PER_PIXEL
+
+
+def _numeric(x) -> np.ndarray:
+    """x as float64, with datetimes as nanoseconds since the epoch"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').view(np.int64)
+    return x.astype(np.float64, copy=False)
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the minimum and maximum of each of n_out // 2 equal-size buckets
+
+    Every bucket keeps its extremes, so peaks survive at any zoom level the
+    target width was chosen for. The first and last points are kept so the
+    line spans the full range; missing values are not returned here, see
+    keep_gaps.
+    """
+    n = len(y)
+    n_buckets = max(n_out // 2, 1)
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.intp)
+    edges = np.unique(edges)
+    buckets = np.repeat(np.arange(len(edges) - 1), np.diff(edges))
+
+    picked = [np.array([0, n - 1])]
+    for reduce, fill in ((np.maximum, -np.inf), (np.minimum, np.inf)):
+        values = np.where(np.isnan(y), fill, y)
+        extremes = reduce.reduceat(values, edges[:-1])
+        hits = np.flatnonzero(values == extremes[buckets])
+        # First hit of each bucket
+        _, first = np.unique(buckets[hits], return_index=True)
+        picked.append(hits[first])
+
+    indices = np.unique(np.concatenate(picked))
+    return indices[~np.isnan(y[indices])]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets selection of n_out points
+
+    Keeps the visual shape of the line with fewer points than min/max
+    buckets. LTTB can skip an isolated spike, so the global minimum and
+    maximum are added back on top of the selection.
+    """
+    finite = np.flatnonzero(~np.isnan(y))
+    if len(finite) <= max(n_out, 2):
+        return finite
+
+    xs, ys = x[finite], y[finite]
+    n = len(xs)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Average of the next bucket, or the last point for the final bucket
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = xs[stop:next_stop].mean() if next_stop > stop else xs[-1]
+        next_y = ys[stop:next_stop].mean() if next_stop > stop else ys[-1]
+
+        area = np.abs((xs[previous] - next_x) * (ys[start:stop] - ys[previous])
+                      - (xs[previous] - xs[start:stop]) * (next_y - ys[previous]))
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+
+    extremes = [int(np.argmax(ys)), int(np.argmin(ys))]
+    return finite[np.unique(np.concatenate([selected, extremes]))]
+
+
+def keep_gaps(y: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    indices plus the first missing value between any two consecutive ones
+
+    The selections above only return real values, which would draw a line
+    straight across a gap in the data. One NaN per interval is enough for
+    the plot to break the line there, and keeps the output at most twice
+    the size of the selection.
+    """
+    missing = np.flatnonzero(np.isnan(y))
+    if len(missing) == 0 or len(indices) < 2:
+        return indices
+
+    start, stop = indices[:-1], indices[1:]
+    following = np.searchsorted(missing, start + 1)
+    candidates = missing[np.minimum(following, len(missing) - 1)]
+    inside = (following < len(missing)) & (candidates < stop)
+    return np.union1d(indices, candidates[inside])
+
+
+def downsample_indices(x, y, n_out: int, method: str = 'minmax') -> np.ndarray:
+    """
+    Positions of the points to plot for one trace
+
+    Args:
+        x: Sorted x values, numbers or datetimes
+        y: y values of the same length
+        n_out: Target number of points, e.g. from target_points
+        method: 'minmax' keeps every bucket's extremes, 'lttb' keeps the
+            line shape plus the global extremes
+
+    Returns:
+        Sorted integer positions into x and y; all positions when the trace
+        is already short enough. Gaps in y keep one missing value so the
+        line still breaks there.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method {method!r}, expected one of {METHODS}")
+
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) <= n_out:
+        return np.arange(len(y))
+    if method == 'lttb':
+        return keep_gaps(y, lttb_indices(_numeric(x), y, n_out))
+    return keep_gaps(y, minmax_indices(y, n_out))
+
+
+def downsample_series(x, y, width: int = DEFAULT_VIEWPORT_WIDTH, method: str = 'minmax'):
+    """
+    x and y values of one trace reduced to what the plot width can show
+
+    Args:
+        x: Sorted x values as a Series or array
+        y: y values of the same length
+        width: Plot width in pixels
+        method: 'minmax' or 'lttb', see downsample_indices
+
+    Returns:
+        (x, y) as NumPy arrays
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    keep = downsample_indices(x, y, target_points(width), method)
+    return x[keep], y[keep]
+
+
+def downsample_frame(df: pd.DataFrame, x: str, y: Sequence[str], by: Optional[str] = None,
+                     width: int = DEFAULT_VIEWPORT_WIDTH, method: str = 'minmax') -> pd.DataFrame:
+    """
+    Rows of df needed to draw y against x at the given plot width
+
+    Each y column and each group in by is one trace. A row is kept if any
+    of its traces needs it, so several y columns can share the result.
+
+    Args:
+        df: Data sorted by x within each group
+        x: Column on the x axis
+        y: Column or columns on the y axis
+        by: Column splitting the data into traces, e.g. city
+        width: Plot width in pixels
+        method: 'minmax' or 'lttb', see downsample_indices
+
+    Returns:
+        Subset of df in its original order
+    """
+    y = [y] if isinstance(y, str) else list(y)
+    n_out = target_points(width)
+    groups = [np.arange(len(df))] if by is None else list(df.groupby(by, sort=False, observed=True).indices.values())
+
+    if all(len(positions) <= n_out for positions in groups):
+        return df
+
+    keep = []
+    for positions in groups:
+        if len(positions) <= n_out:
+            keep.append(positions)
+            continue
+        xs = df[x].to_numpy()[positions]
+        for column in y:
+            keep.append(positions[downsample_indices(xs, df[column].to_numpy()[positions], n_out, method)])
+    return df.iloc[np.unique(np.concatenate(keep))]
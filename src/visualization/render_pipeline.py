@@ -0,0 +1,224 @@
+"""
+Render static matplotlib figures concurrently, skipping unchanged ones
+
+Each figure is described by a FigureSpec: a builder returning the
+matplotlib Figure, the input columns it reads and the files to write. The
+figures are built in a process pool whose workers use the Agg backend, so
+the slow ones (the KDE pair plot above all) no longer hold up the rest.
+A manifest in the output directory records a hash of every figure's input
+columns and outputs; a figure whose hash is unchanged and whose files still
+exist is not rendered again. The manifest also keeps each figure's last
+render time, and the slowest figures are submitted first so that they do
+not start last and stretch the total.
+"""
+import hashlib
+import importlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import pandas as pd
+
+DEFAULT_DPI = 300
+PREVIEW_DPI = 72
+
+MANIFEST_NAME = '.render_manifest.json'
+
+
+class Output(NamedTuple):
+    """One file written for a figure"""
+    format: str = 'png'
+    dpi: int = DEFAULT_DPI
+    suffix: str = ''
+
+    def filename(self, name: str) -> str:
+        return f"{name}{self.suffix}.{self.format}"
+
+
+# Low-resolution copy written next to the full figure
+PREVIEW = Output('png', PREVIEW_DPI, '_preview')
+
+
+class FigureSpec(NamedTuple):
+    """
+    A static figure to render
+
+    name: File name stem, e.g. 'pair_plot'
+    builder: Dotted path of a function taking (data, return_fig=True) and
+        returning a matplotlib Figure. A path rather than the function keeps
+        specs picklable and identical however the caller was started.
+    columns: Input columns the figure depends on; only these are hashed
+    outputs: Files to write
+    """
+    name: str
+    builder: str
+    columns: Tuple[str, ...]
+    outputs: Tuple[Output, ...] = (Output(),)
+
+
+class RenderResult(NamedTuple):
+    name: str
+    skipped: bool
+    seconds: float
+    paths: Tuple[str, ...]
+
+
+def parse_output(text: str) -> Tuple[Optional[str], Output]:
+    """
+    Parse an output choice written as [figure=]format[@dpi]
+
+    'webp' applies to every figure, 'pair_plot=png@72' to one figure only and
+    'preview' adds the low-DPI preview. An explicit DPI other than the default
+    gets an '_<dpi>dpi' suffix so it does not overwrite the full-size file.
+
+    Returns:
+        (figure name or None for all figures, Output)
+    """
+    name, _, choice = text.rpartition('=')
+    if choice == 'preview':
+        return name or None, PREVIEW
+
+    fmt, _, dpi = choice.partition('@')
+    if not fmt:
+        raise ValueError(f"Missing format in output choice {text!r}")
+    dpi = int(dpi) if dpi else DEFAULT_DPI
+    suffix = '' if dpi == DEFAULT_DPI else f'_{dpi}dpi'
+    return name or None, Output(fmt.lower(), dpi, suffix)
+
+
+def with_outputs(figures: Sequence[FigureSpec], choices: Iterable[Tuple[Optional[str], Output]]) -> List[FigureSpec]:
+    """
+    Replace the outputs of figures with parsed output choices
+
+    Choices for all figures apply first, then choices naming a figure.
+    Figures without any choice keep their own outputs.
+    """
+    choices = list(choices)
+    unknown = {name for name, _ in choices if name is not None} - {spec.name for spec in figures}
+    if unknown:
+        raise ValueError(f"Unknown figures: {', '.join(sorted(unknown))}")
+
+    common = tuple(output for name, output in choices if name is None)
+    updated = []
+    for spec in figures:
+        own = tuple(output for name, output in choices if name == spec.name)
+        outputs = common + own
+        updated.append(spec._replace(outputs=outputs) if outputs else spec)
+    return updated
+
+
+def input_hash(data: pd.DataFrame, spec: FigureSpec) -> str:
+    """Hash of a figure's input columns, builder and outputs"""
+    digest = hashlib.sha256()
+    digest.update(repr((spec.builder, spec.columns, spec.outputs)).encode())
+    digest.update(pd.util.hash_pandas_object(data[list(spec.columns)], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _init_worker(style: str):
+    """Agg backend and seaborn theme, set up the same way in workers and inline"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import seaborn as sns
+    sns.set_theme(style=style)
+
+
+def _render(spec: FigureSpec, data: pd.DataFrame, output_dir: str) -> Tuple[float, Tuple[str, ...]]:
+    """Build one figure and write its outputs, returning (seconds, paths)"""
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    module, _, function = spec.builder.rpartition('.')
+    fig = getattr(importlib.import_module(module), function)(data, return_fig=True)
+    paths = []
+    for output in spec.outputs:
+        path = os.path.join(output_dir, output.filename(spec.name))
+        fig.savefig(path, format=output.format, dpi=output.dpi, bbox_inches='tight')
+        paths.append(path)
+    plt.close(fig)
+    return time.perf_counter() - start, tuple(paths)
+
+
+def _load_manifest(output_dir: str) -> Dict[str, Dict]:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def render_figures(data: pd.DataFrame, figures: Sequence[FigureSpec], output_dir: str,
+                   max_workers: Optional[int] = None, force: bool = False,
+                   style: str = 'whitegrid') -> List[RenderResult]:
+    """
+    Render the figures whose inputs changed since the last run
+
+    Args:
+        data: Input data shared by all figures
+        figures: Figures to render
+        output_dir: Directory for the files and the manifest
+        max_workers: Worker processes, defaults to the CPU count. With 1 or
+            a single figure to render everything runs in the calling process,
+            which is switched to the Agg backend like the workers.
+        force: Render every figure even if its hash is unchanged
+        style: Seaborn theme applied while rendering
+
+    Returns:
+        One RenderResult per figure, in the order given
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = _load_manifest(output_dir)
+
+    hashes = {spec.name: input_hash(data, spec) for spec in figures}
+    pending = [spec for spec in figures
+               if force or manifest.get(spec.name, {}).get('hash') != hashes[spec.name]
+               or not all(os.path.exists(os.path.join(output_dir, output.filename(spec.name)))
+                          for output in spec.outputs)]
+    # Slowest first; figures never rendered before count as slowest
+    pending.sort(key=lambda spec: -manifest.get(spec.name, {}).get('seconds', float('inf')))
+
+    max_workers = max_workers or os.cpu_count() or 1
+    rendered = {}
+    if max_workers == 1 or len(pending) <= 1:
+        import matplotlib
+        # The theme only applies while rendering, not to the caller's later figures
+        with matplotlib.rc_context():
+            if pending:
+                _init_worker(style)
+            for spec in pending:
+                rendered[spec.name] = _render(spec, data[list(spec.columns)].copy(), output_dir)
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(pending)),
+                                 initializer=_init_worker, initargs=(style,)) as pool:
+            futures = {spec.name: pool.submit(_render, spec, data[list(spec.columns)], output_dir)
+                       for spec in pending}
+            rendered = {name: future.result() for name, future in futures.items()}
+
+    results = []
+    for spec in figures:
+        if spec.name in rendered:
+            seconds, paths = rendered[spec.name]
+            manifest[spec.name] = {'hash': hashes[spec.name], 'seconds': round(seconds, 3)}
+            results.append(RenderResult(spec.name, False, seconds, paths))
+        else:
+            paths = tuple(os.path.join(output_dir, output.filename(spec.name)) for output in spec.outputs)
+            results.append(RenderResult(spec.name, True, 0.0, paths))
+
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return results
+
+
+def format_report(results: Sequence[RenderResult], wall_seconds: Optional[float] = None) -> str:
+    """Wall time per figure, plus the total when given"""
+    width = max(len(result.name) for result in results) + 1 if results else 0
+    lines = []
+    for result in results:
+        status = 'unchanged, skipped' if result.skipped else f"{result.seconds:7.2f} s"
+        files = ', '.join(os.path.basename(path) for path in result.paths)
+        lines.append(f"{result.name + ':':{width}} {status:>18}  {files}")
+    if wall_seconds is not None:
+        lines.append(f"{'Total:':{width}} {f'{wall_seconds:7.2f} s':>18}  wall time")
+    return '\n'.join(lines)
@@ -0,0 +1,170 @@
+import time
+from typing import Dict, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Points in a figure above which scatter traces are drawn with WebGL. SVG
+# rendering gets sluggish in the tens of thousands of points and unusable in
+# the hundreds of thousands; WebGL stays interactive well beyond that.
+WEBGL_THRESHOLD = 50_000
+
+RENDER_MODES = ('auto', 'svg', 'webgl')
+
+# Budgets a figure is reported against: serialized size sent to the browser
+# and build plus serialization time on the server
+FIGURE_BYTES_BUDGET = 5 * 2**20
+FIGURE_LATENCY_BUDGET_MS = 500.0
+
+# Scatter properties WebGL traces do not support; traces using them stay SVG
+_SVG_ONLY = ('stackgroup', 'fillpattern')
+
+
+def figure_points(fig: go.Figure) -> int:
+    """Number of data points drawn by a figure's traces"""
+    total = 0
+    for trace in fig.data:
+        if trace.type == 'splom':
+            total += sum(len(dimension.values) for dimension in trace.dimensions if dimension.values is not None)
+            continue
+        for axis in ('y', 'x', 'z', 'values'):
+            values = getattr(trace, axis, None)
+            if values is not None:
+                total += len(values)
+                break
+    return total
+
+
+def _webgl_compatible(spec: Dict) -> bool:
+    if spec.get('type') != 'scatter' or any(name in spec for name in _SVG_ONLY):
+        return False
+    return spec.get('line', {}).get('shape') != 'spline'
+
+
+def apply_render_mode(fig: go.Figure, mode: str = 'auto', threshold: int = WEBGL_THRESHOLD) -> go.Figure:
+    """
+    Switch scatter traces to Scattergl when the figure is large
+
+    Traces are replaced in place and keep their order, styling and subplot
+    axes, so this can run after the layout is final.
+
+    Args:
+        fig: Figure to convert
+        mode: 'auto' switches above threshold points, 'webgl' always and 'svg' never
+        threshold: Point count used by 'auto'
+
+    Returns:
+        The same figure
+    """
+    if mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode {mode!r}, expected one of {RENDER_MODES}")
+    if mode == 'svg' or (mode == 'auto' and figure_points(fig) <= threshold):
+        return fig
+
+    converted = []
+    for trace in fig.data:
+        spec = trace.to_plotly_json()
+        if not _webgl_compatible(spec):
+            converted.append(trace)
+            continue
+        spec.pop('type')
+        spec.pop('uid', None)
+        converted.append(go.Scattergl(spec, skip_invalid=True))
+
+    count = len(fig.data)
+    fig.add_traces(converted)
+    fig.data = fig.data[count:]
+    return fig
+
+
+def date_axis_values(x) -> np.ndarray:
+    """
+    Naive datetimes as float milliseconds since the epoch, other values unchanged
+
+    Plotly reads numbers on a date axis as epoch milliseconds and sends
+    float arrays in binary, instead of a 20-odd character ISO string per
+    point. The axis must be set to type='date'.
+    """
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ms]').astype(np.int64).astype(np.float64)
+    return x
+
+
+def grouped_series(parts: Sequence[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Join several (x, y) series into one line trace broken between them
+
+    A NaN point after every part stops the line from connecting one part's
+    last point to the next part's first. y is float32, which halves its size
+    in the figure JSON.
+    """
+    xs, ys = [], []
+    for x, y in parts:
+        if len(x) == 0:
+            continue
+        xs += [np.asarray(x), np.asarray(x)[-1:]]
+        ys += [np.asarray(y, dtype=np.float32), np.full(1, np.nan, dtype=np.float32)]
+    if not xs:
+        return np.empty(0), np.empty(0, dtype=np.float32)
+    return np.concatenate(xs), np.concatenate(ys)
+
+
+class FigureBudget(NamedTuple):
+    """Size and latency of one figure against the budgets"""
+    name: str
+    traces: int
+    points: int
+    webgl: bool
+    bytes: int
+    build_ms: float
+    serialize_ms: float
+
+    @property
+    def latency_ms(self) -> float:
+        return self.build_ms + self.serialize_ms
+
+    @property
+    def within_budget(self) -> bool:
+        return self.bytes <= FIGURE_BYTES_BUDGET and self.latency_ms <= FIGURE_LATENCY_BUDGET_MS
+
+    def as_dict(self) -> Dict:
+        return {**self._asdict(), 'latency_ms': self.latency_ms, 'within_budget': self.within_budget}
+
+    def __str__(self) -> str:
+        status = 'ok' if self.within_budget else 'OVER BUDGET'
+        renderer = 'webgl' if self.webgl else 'svg'
+        return (f"{self.name}: {self.traces} traces, {self.points:,} points ({renderer}), "
+                f"{self.bytes / 2**20:.2f} MiB, {self.build_ms:.0f} ms build + "
+                f"{self.serialize_ms:.0f} ms serialize [{status}]")
+
+
+def budget_report(fig: go.Figure, name: str, build_seconds: float = 0.0) -> FigureBudget:
+    """
+    Measure a figure against the size and latency budgets
+
+    The size is that of the figure JSON, which is what the browser has to
+    parse whether the figure ends up in a standalone page or a dashboard;
+    plotly.js itself is not counted.
+
+    Args:
+        fig: Finished figure
+        name: Label for the report
+        build_seconds: Time spent building the figure
+
+    Returns:
+        FigureBudget, printable as a one-line report
+    """
+    start = time.perf_counter()
+    serialized = fig.to_json()
+    serialize_seconds = time.perf_counter() - start
+
+    return FigureBudget(
+        name=name,
+        traces=len(fig.data),
+        points=figure_points(fig),
+        webgl=any(trace.type in ('scattergl', 'splom') for trace in fig.data),
+        bytes=len(serialized.encode('utf-8')),
+        build_ms=build_seconds * 1000,
+        serialize_ms=serialize_seconds * 1000
+    )
@@ -0,0 +1,231 @@
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+# Seconds a response stays fresh. WeatherAPI.com refreshes current conditions
+# every 15 minutes and forecasts hourly.
+DEFAULT_TTLS = {
+    'current.json': 15 * 60,
+    'forecast.json': 60 * 60
+}
+
+FRESH = 'fresh'
+STALE = 'stale'
+EXPIRED = 'expired'
+MISSING = 'missing'
+
+
+class OfflineCacheMiss(LookupError):
+    """Raised in offline mode when a request has no cached response"""
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: Optional[str]
+    fetched_at: float
+
+
+class ResponseCache:
+    """
+    Persistent cache of WeatherAPI responses stored in a local SQLite file
+
+    Responses are keyed by endpoint, coordinates rounded to `precision`
+    decimals and the remaining query parameters; the API key is never part of
+    the key. A response is fresh for the TTL of its endpoint. After that it is
+    still served for `stale_while_revalidate` seconds while the client
+    refreshes it, and once expired it is revalidated with its ETag so an
+    unchanged response costs no body transfer.
+
+    In offline mode every cached response counts as fresh and the network is
+    never used.
+
+    The file also keeps the number of API requests sent per UTC day and the
+    state of the request rate token bucket, so a RateLimiter given the cache
+    as its store enforces the daily quota and the request rate across runs
+    and across processes sharing the file.
+    """
+
+    def __init__(self, path: str, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 15 * 60,
+                 stale_while_revalidate: float = 60 * 60, precision: int = 2, offline: bool = False,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.precision = precision
+        self.offline = offline
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=1.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, fetched_at REAL NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS quota_usage (day TEXT PRIMARY KEY, used INTEGER NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.bytes_saved = 0
+
+    def make_key(self, endpoint: str, params: Dict) -> str:
+        """Build a cache key from the endpoint and query parameters"""
+        lat, lon = (float(value) for value in str(params['q']).split(','))
+        # Adding 0.0 turns -0.0 into 0.0 so both round to the same key
+        location = f"{round(lat, self.precision) + 0.0:.{self.precision}f},{round(lon, self.precision) + 0.0:.{self.precision}f}"
+        extra = '&'.join(f"{name}={value}" for name, value in sorted(params.items()) if name not in ('key', 'q'))
+        return f"{endpoint}|{location}|{extra}"
+
+    def ttl(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def peek(self, endpoint: str, params: Dict) -> Tuple[str, Optional[CachedResponse]]:
+        """Like get, but without counting the lookup or raising in offline mode"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, fetched_at FROM responses WHERE key = ?",
+                (self.make_key(endpoint, params),)).fetchone()
+        if row is None:
+            return MISSING, None
+
+        entry = CachedResponse(bytes(row[0]), row[1], row[2])
+        age = self._clock() - entry.fetched_at
+        ttl = self.ttl(endpoint)
+        if self.offline or age < ttl:
+            return FRESH, entry
+        if age < ttl + self.stale_while_revalidate:
+            return STALE, entry
+        return EXPIRED, entry
+
+    def get(self, endpoint: str, params: Dict) -> Tuple[str, Optional[CachedResponse]]:
+        """
+        Look up a cached response
+
+        Returns:
+            Tuple of the freshness state (FRESH, STALE, EXPIRED or MISSING) and
+            the cached response, which is None only when MISSING
+
+        Raises:
+            OfflineCacheMiss: If the cache is offline and has no response
+        """
+        state, entry = self.peek(endpoint, params)
+        if state == MISSING:
+            if self.offline:
+                raise OfflineCacheMiss(f"No cached response for {endpoint} {params['q']}")
+            with self._lock:
+                self.misses += 1
+            return MISSING, None
+
+        with self._lock:
+            if state == FRESH:
+                self.hits += 1
+            elif state == STALE:
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+            if state != EXPIRED:
+                self.bytes_saved += len(entry.body)
+        return state, entry
+
+    def store(self, endpoint: str, params: Dict, body: bytes, etag: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, etag, fetched_at) VALUES (?, ?, ?, ?)",
+                (self.make_key(endpoint, params), body, etag, self._clock()))
+            self._conn.commit()
+
+    def touch(self, endpoint: str, params: Dict, entry: CachedResponse):
+        """Mark a cached response as fresh again after a 304 Not Modified"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ? WHERE key = ?",
+                (self._clock(), self.make_key(endpoint, params)))
+            self._conn.commit()
+            self.revalidations += 1
+            self.bytes_saved += len(entry.body)
+
+    def quota_used(self, day: str) -> int:
+        """Requests recorded for a UTC day, given as an ISO date"""
+        with self._lock:
+            row = self._conn.execute("SELECT used FROM quota_usage WHERE day = ?", (day,)).fetchone()
+        return row[0] if row else 0
+
+    def consume_quota(self, day: str, limit: int) -> bool:
+        """
+        Record one request for a UTC day unless limit requests already were
+
+        Check and increment run in one transaction, so processes sharing the
+        file cannot both take the last request of the day.
+
+        Returns:
+            Whether the request was recorded
+        """
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO quota_usage (day, used) VALUES (?, 0)", (day,))
+            cursor = self._conn.execute(
+                "UPDATE quota_usage SET used = used + 1 WHERE day = ? AND used < ?", (day, limit))
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def take_token(self, rate: float, burst: int, now: float, name: str = 'requests') -> float:
+        """
+        Take one token from a token bucket kept in the file
+
+        The bucket is refilled and debited in one write transaction, so every
+        process sharing the file draws from the same bucket. Tokens may go
+        negative, which queues the callers that have to wait.
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity
+            now: Current wall-clock time in seconds, comparable across processes
+            name: Bucket name
+
+        Returns:
+            Seconds the caller has to wait before sending its request
+        """
+        with self._lock:
+            # IMMEDIATE takes the write lock before reading, so no two processes refill from the same state
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated FROM rate_buckets WHERE name = ?", (name,)).fetchone()
+                tokens, updated = row if row else (float(burst), now)
+                tokens = min(burst, tokens + max(0.0, now - updated) * rate) - 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                    (name, tokens, max(now, updated)))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return -tokens / rate if tokens < 0 else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'size': size,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            'revalidations': self.revalidations,
+            'bytes_saved': self.bytes_saved
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
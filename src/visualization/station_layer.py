@@ -0,0 +1,204 @@
+"""
+Station markers for folium maps that scale to thousands of stations
+
+A CircleMarker with its own Popup per station makes folium emit several
+JavaScript statements and an HTML element per station, which is what makes
+large maps slow to load. Here popups are rendered for all stations in one
+template pass over columns, and stations are passed to the page as one
+data array. Markers are created in the browser and clustered, either from
+data inlined into the page or from a gzipped JSON file fetched once the map
+has loaded.
+"""
+import gzip
+import html
+import json
+import os
+import re
+from string import Formatter, Template as StringTemplate
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from branca.element import MacroElement
+import folium
+from folium.plugins import FastMarkerCluster, MarkerCluster
+from folium.template import Template
+
+# Stations above which 'auto' clusters instead of drawing one marker each
+CLUSTER_THRESHOLD = 500
+
+MAP_MODES = ('auto', 'markers', 'cluster')
+
+# Default maximum popup width, in pixels
+POPUP_WIDTH = 300
+
+# Format specs printf can produce directly, e.g. '.1f' or 'd'
+_PRINTF_SPEC = re.compile(r'^\.?\d*[dfeg]$')
+
+# Builds a circle marker from a [lat, lon, color, popup] row, styled like
+# folium.CircleMarker(radius=10, fill=True); $popup_width is filled in by marker_callback
+MARKER_CALLBACK = StringTemplate("""
+var callback = function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 10, color: row[2], fillColor: row[2], fill: true, fillOpacity: 0.2
+    });
+    marker.bindPopup(row[3], {maxWidth: $popup_width});
+    return marker;
+};
+""")
+
+
+def marker_callback(popup_width: int = POPUP_WIDTH) -> str:
+    """MARKER_CALLBACK with popups at most popup_width pixels wide"""
+    return MARKER_CALLBACK.substitute(popup_width=int(popup_width))
+
+
+def relative_url(path: str, html_path: str) -> str:
+    """URL of path for a page saved at html_path, relative to the page"""
+    page_dir = os.path.dirname(os.path.abspath(html_path))
+    return os.path.relpath(os.path.abspath(path), page_dir).replace(os.sep, '/')
+
+
+def _format_column(values: pd.Series, spec: str) -> np.ndarray:
+    """A column as an object array of strings, formatted with spec"""
+    if values.dtype.kind in 'OSU' or isinstance(values.dtype, pd.StringDtype) or values.dtype == 'category':
+        return np.array([html.escape(str(value)) for value in values], dtype=object)
+    if _PRINTF_SPEC.match(spec):
+        return np.char.mod(f'%{spec}', values.to_numpy()).astype(object)
+    return np.array([format(value, spec) for value in values], dtype=object)
+
+
+def render_popups(df: pd.DataFrame, template: str) -> np.ndarray:
+    """
+    Fill a str.format template for every row in one pass over columns
+
+    Each field is formatted for the whole column at once and the literal
+    pieces are joined column-wise, instead of formatting one row at a time.
+    Text columns are HTML-escaped.
+
+    Args:
+        df: One row per popup
+        template: Template with fields named after columns, e.g. '{city}: {temperature:.1f}°C'
+
+    Returns:
+        Object array of popup strings
+    """
+    result = np.full(len(df), '', dtype=object)
+    for literal, field, spec, _ in Formatter().parse(template):
+        if literal:
+            result += literal
+        if field is not None:
+            result += _format_column(df[field], spec or '')
+    return result
+
+
+def marker_rows(lat: Sequence[float], lon: Sequence[float], colors: Sequence[str],
+                popups: Sequence[str]) -> list:
+    """Stations as [lat, lon, color, popup] rows for MARKER_CALLBACK"""
+    return [list(row) for row in zip(np.asarray(lat, dtype=float).tolist(), np.asarray(lon, dtype=float).tolist(),
+                                     list(colors), list(popups))]
+
+
+def write_station_data(rows: list, path: str):
+    """Write marker rows as gzipped JSON"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with gzip.open(path, 'wt', encoding='utf-8', compresslevel=9) as f:
+        json.dump(rows, f, separators=(',', ':'), ensure_ascii=False)
+
+
+class LazyStationLayer(MacroElement):
+    """
+    Fetch gzipped marker rows after the map has loaded and add them to a cluster
+
+    Servers that already send the file with Content-Encoding: gzip have it
+    decompressed by the browser; otherwise it is decompressed with
+    DecompressionStream. The page has to be served over HTTP, since browsers
+    do not fetch local files.
+    """
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            (function () {
+                {{ this.callback }}
+                fetch({{ this.url|tojson }})
+                    .then(function (response) {
+                        if (!response.ok) {
+                            throw new Error(response.status + ' ' + response.statusText);
+                        }
+                        var encoding = response.headers.get('Content-Encoding') || '';
+                        if (encoding.indexOf('gzip') !== -1) {
+                            return response.json();
+                        }
+                        var body = response.body.pipeThrough(new DecompressionStream('gzip'));
+                        return new Response(body).json();
+                    })
+                    .then(function (rows) {
+                        {{ this.cluster.get_name() }}.addLayers(rows.map(callback));
+                    })
+                    .catch(function (error) {
+                        console.error('Could not load station data', error);
+                    });
+            })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, cluster: MarkerCluster, url: str, callback: Optional[str] = None):
+        super().__init__()
+        self._name = 'LazyStationLayer'
+        self.cluster = cluster
+        self.url = url
+        self.callback = callback or marker_callback()
+
+
+def add_station_layer(m: folium.Map, lat, lon, colors, popups, mode: str = 'auto',
+                      data_path: Optional[str] = None, data_url: Optional[str] = None,
+                      html_path: Optional[str] = None, popup_width: int = POPUP_WIDTH) -> str:
+    """
+    Add one circle marker per station to a map
+
+    Args:
+        m: Map to add to
+        lat, lon: Station coordinates
+        colors: Marker color per station
+        popups: Popup HTML per station, e.g. from render_popups
+        mode: 'markers' adds a folium.CircleMarker per station, 'cluster'
+            clusters markers created in the browser, and 'auto' clusters
+            above CLUSTER_THRESHOLD stations
+        data_path: Write the stations to this gzipped JSON file and load it
+            on demand instead of inlining it; implies clustering
+        data_url: URL the page fetches data_path from, by default its path
+            relative to html_path
+        html_path: Where the map page will be saved; required with
+            data_path unless data_url is given
+        popup_width: Maximum popup width in pixels
+
+    Returns:
+        The mode used, 'markers', 'cluster' or 'lazy'
+    """
+    if mode not in MAP_MODES:
+        raise ValueError(f"Unknown map mode {mode!r}, expected one of {MAP_MODES}")
+
+    if data_path is not None and data_url is None and html_path is None:
+        raise ValueError("data_path needs html_path or data_url to know where the page loads it from")
+
+    rows = marker_rows(lat, lon, colors, popups)
+    callback = marker_callback(popup_width)
+    if data_path is not None:
+        write_station_data(rows, data_path)
+        cluster = MarkerCluster(options={'chunkedLoading': True}).add_to(m)
+        LazyStationLayer(cluster, data_url or relative_url(data_path, html_path), callback).add_to(m)
+        return 'lazy'
+
+    if mode == 'cluster' or (mode == 'auto' and len(rows) > CLUSTER_THRESHOLD):
+        FastMarkerCluster(rows, callback=callback, options={'chunkedLoading': True}).add_to(m)
+        return 'cluster'
+
+    for row_lat, row_lon, color, popup in rows:
+        folium.CircleMarker(
+            location=[row_lat, row_lon],
+            radius=10,
+            popup=folium.Popup(popup, max_width=popup_width),
+            color=color,
+            fill=True,
+            fill_color=color
+        ).add_to(m)
+    return 'markers'
@@ -0,0 +1,353 @@
+import json
+import threading
+import time
+import requests
+import pandas as pd
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+from src.visualization.response_cache import FRESH, STALE, CachedResponse, ResponseCache
+
+# WeatherAPI.com configuration
+BASE_URL = "http://api.weatherapi.com/v1"
+
+# Seconds to wait for the connection and for the response body
+DEFAULT_TIMEOUT = (3.05, 10.0)
+
+# Responses retried by WeatherAPI._request, each attempt going through the rate limiter
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class QuotaExceeded(Exception):
+    """Raised when the daily request quota has been used up"""
+
+class RateLimiter:
+    """
+    Token bucket limiting request rate, plus a daily request quota
+
+    One instance is shared by every worker thread of a client, so the limits
+    hold for the client as a whole. Callers that have to wait reserve their
+    slot first and sleep outside the lock, which keeps the order fair.
+
+    The quota is counted per UTC day. Without a store the token bucket and
+    the quota count live in memory, hold for this process only and start
+    afresh every run. With one, e.g. the ResponseCache, both are kept in the
+    store's file, so the rate and the quota hold for every run and process
+    sharing it; the clock then defaults to wall-clock time, which those
+    processes agree on.
+    """
+
+    def __init__(self, requests_per_second: float, burst: Optional[int] = None,
+                 daily_quota: Optional[int] = None, clock: Optional[Callable[[], float]] = None,
+                 sleep: Callable[[float], None] = time.sleep,
+                 store: Optional[ResponseCache] = None):
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+
+        self.rate = requests_per_second
+        self.burst = burst if burst is not None else max(1, int(requests_per_second))
+        self.daily_quota = daily_quota
+        self.store = store
+        if clock is None:
+            clock = time.time if store is not None else time.monotonic
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._day = None
+        self._used_today = 0
+        self._lock = threading.Lock()
+
+    def _roll_day(self):
+        today = datetime.now(timezone.utc).date()
+        if today != self._day:
+            self._day = today
+            self._used_today = 0
+
+    def remaining_today(self) -> Optional[int]:
+        """Requests left in today's quota, or None without a quota"""
+        if self.daily_quota is None:
+            return None
+        with self._lock:
+            self._roll_day()
+            if self.store is not None:
+                return max(0, self.daily_quota - self.store.quota_used(self._day.isoformat()))
+            return self.daily_quota - self._used_today
+
+    def _consume_quota(self) -> bool:
+        if self.daily_quota is None:
+            return True
+        if self.store is not None:
+            return self.store.consume_quota(self._day.isoformat(), self.daily_quota)
+        if self._used_today >= self.daily_quota:
+            return False
+        self._used_today += 1
+        return True
+
+    def acquire(self):
+        """
+        Block until a request may be sent
+
+        Raises:
+            QuotaExceeded: If the daily quota is used up
+        """
+        with self._lock:
+            self._roll_day()
+            if not self._consume_quota():
+                raise QuotaExceeded(f"Daily quota of {self.daily_quota} requests used up")
+
+            wait = self._take_token()
+
+        if wait > 0:
+            self._sleep(wait)
+
+    def _take_token(self) -> float:
+        """Take a token and return how long to wait for it"""
+        now = self._clock()
+        if self.store is not None:
+            return self.store.take_token(self.rate, self.burst, now)
+
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        # Tokens may go negative: that is the queue of callers already waiting
+        self._tokens -= 1
+        return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+def retry_delay(response: requests.Response, attempt: int, backoff_factor: float) -> float:
+    """Seconds to wait before retrying: the response's Retry-After, else exponential backoff"""
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+    return backoff_factor * (2 ** attempt)
+
+class WeatherAPI:
+    """
+    WeatherAPI.com client
+
+    Responses with a status in RETRY_STATUSES are retried up to retries
+    times. Every attempt goes through the rate limiter, so it counts against
+    the request rate and the daily quota like any other request, and the wait
+    asked for by a Retry-After header is honoured.
+    """
+
+    def __init__(self, api_key: str, base_url: str = BASE_URL,
+                 timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 session: Optional[requests.Session] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = None,
+                 retries: int = 0, backoff_factor: float = 0.5,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._sleep = sleep
+        # Without a session every call opens a new connection
+        self.session = session if session is not None else requests
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self._refresh_pool = None
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+
+    def _request(self, endpoint: str, params: Dict, headers: Optional[Dict] = None) -> requests.Response:
+        for attempt in range(self.retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            response = self.session.get(f"{self.base_url}/{endpoint}", params=params,
+                                        headers=headers, timeout=self.timeout)
+            if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                break
+            self._sleep(retry_delay(response, attempt, self.backoff_factor))
+        response.raise_for_status()
+        return response
+
+    def _get(self, endpoint: str, params: Dict) -> Dict:
+        if self.cache is None:
+            return self._request(endpoint, params).json()
+
+        state, entry = self.cache.get(endpoint, params)
+        if state == FRESH:
+            return json.loads(entry.body)
+        if state == STALE:
+            self._refresh_later(endpoint, params, entry)
+            return json.loads(entry.body)
+        return json.loads(self._fetch_and_store(endpoint, params, entry))
+
+    def _fetch_and_store(self, endpoint: str, params: Dict, entry: Optional[CachedResponse]) -> bytes:
+        """Fetch a response, revalidating the cached one by its ETag when there is one"""
+        headers = {'If-None-Match': entry.etag} if entry is not None and entry.etag else None
+        response = self._request(endpoint, params, headers)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(endpoint, params, entry)
+            return entry.body
+        self.cache.store(endpoint, params, response.content, response.headers.get('ETag'))
+        return response.content
+
+    def _refresh_later(self, endpoint: str, params: Dict, entry: CachedResponse):
+        """Refresh a stale response in the background, once per key"""
+        key = self.cache.make_key(endpoint, params)
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._refresh_pool is None:
+                self._refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="weatherapi-refresh")
+        self._refresh_pool.submit(self._refresh, key, endpoint, params, entry)
+
+    def _refresh(self, key: str, endpoint: str, params: Dict, entry: CachedResponse):
+        try:
+            self._fetch_and_store(endpoint, params, entry)
+        except Exception as e:
+            print(f"Warning: background refresh of {endpoint} failed: {str(e)}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+
+    def close(self):
+        """Wait for background cache refreshes to finish"""
+        with self._refresh_lock:
+            pool, self._refresh_pool = self._refresh_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def _current_request(self, lat: float, lon: float) -> Tuple[str, Dict]:
+        params = {
+            "key": self.api_key,
+            "q": f"{lat},{lon}",
+            "aqi": "no"
+        }
+        return "current.json", params
+
+    def _forecast_request(self, lat: float, lon: float) -> Tuple[str, Dict]:
+        params = {
+            "key": self.api_key,
+            "q": f"{lat},{lon}",
+            "days": 5,
+            "aqi": "no"
+        }
+        return "forecast.json", params
+
+    def get_current_weather(self, lat: float, lon: float) -> Dict:
+        """Get current weather data for a location"""
+        return self._get(*self._current_request(lat, lon))
+
+    def get_forecast(self, lat: float, lon: float) -> Dict:
+        """Get 5-day forecast data for a location, including a 'current' block"""
+        return self._get(*self._forecast_request(lat, lon))
+
+    def cache_status(self, lat: float, lon: float, merged: bool = True) -> Tuple[Optional[float], int]:
+        """
+        When a location was last fetched and what fetching it now costs
+
+        Args:
+            lat, lon: Location
+            merged: Whether current conditions come from the forecast call
+
+        Returns:
+            Tuple of the oldest fetched_at (epoch seconds) of the location's
+            cached responses, None if any is not cached, and the number of API
+            calls fetching the location would send. Stale responses count as
+            a call, since they are refreshed in the background.
+        """
+        pending = [self._forecast_request(lat, lon)]
+        if not merged:
+            pending.insert(0, self._current_request(lat, lon))
+        if self.cache is None:
+            return None, len(pending)
+
+        entries = [self.cache.peek(endpoint, params) for endpoint, params in pending]
+        calls = 0 if self.cache.offline else sum(state != FRESH for state, _ in entries)
+        if any(entry is None for _, entry in entries):
+            return None, calls
+        return min(entry.fetched_at for _, entry in entries), calls
+
+def create_session(pool_size: int = 16, retries: int = 3, backoff_factor: float = 0.5) -> requests.Session:
+    """
+    Create a requests session with connection keep-alive and connect retries
+
+    Only connection errors are retried here, since those requests never
+    reached the server. Error responses are retried by WeatherAPI._request,
+    where every attempt passes the rate limiter.
+
+    Args:
+        pool_size: Connections kept open per host; should match the worker count
+        retries: Retries for connection errors
+        backoff_factor: Exponential backoff base in seconds between retries
+
+    Returns:
+        Configured requests.Session
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=backoff_factor,
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+class PooledWeatherAPI(WeatherAPI):
+    """
+    WeatherAPI client for fetching many locations concurrently
+
+    Requests share one keep-alive session with retry and backoff, and at most
+    max_workers of them are in flight at any time.
+    """
+
+    def __init__(self, api_key: str, max_workers: int = 16, retries: int = 3,
+                 backoff_factor: float = 0.5, **kwargs):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        session = kwargs.pop('session', None) or create_session(max_workers, retries, backoff_factor)
+        super().__init__(api_key, session=session, retries=retries, backoff_factor=backoff_factor, **kwargs)
+        self.max_workers = max_workers
+
+    def map(self, fn: Callable, items: Iterable) -> List:
+        """Apply fn to every item with bounded concurrency, keeping input order"""
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="weatherapi") as pool:
+            return list(pool.map(fn, items))
+
+    def close(self):
+        super().close()
+        self.session.close()
+
+def schedule_locations(locations: pd.DataFrame, last_fetched: Optional[Dict[str, datetime]] = None,
+                       max_locations: Optional[int] = None) -> pd.DataFrame:
+    """
+    Order locations so the stalest data is fetched first
+
+    Args:
+        locations: DataFrame with a city column
+        last_fetched: Time each city was last fetched; missing cities count as never fetched
+        max_locations: Keep only this many of the stalest locations, e.g. to fit a quota
+
+    Returns:
+        Reordered (and possibly truncated) locations
+    """
+    last_fetched = last_fetched or {}
+    never = pd.Timestamp.min
+    fetched_at = locations['city'].map(lambda city: pd.Timestamp(last_fetched.get(city, never)))
+    order = fetched_at.reset_index(drop=True).sort_values(kind='stable').index
+    scheduled = locations.iloc[order]
+    if max_locations is not None:
+        scheduled = scheduled.head(max(0, max_locations))
+    return scheduled
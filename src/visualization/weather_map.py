@@ -4,11 +4,13 @@ import folium
 import plotly.express as px
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
+from itertools import chain
+from operator import itemgetter
 import sys
 import os
-import requests
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
 import json
 from pathlib import Path
 import seaborn as sns
@@ -16,36 +18,17 @@ import matplotlib.pyplot as plt
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from src.data_processing.weather_processor import WeatherDataProcessor
-
-# WeatherAPI.com configuration
-BASE_URL = "http://api.weatherapi.com/v1"
-
-class WeatherAPI:
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        
-    def get_current_weather(self, lat: float, lon: float) -> Dict:
-        """Get current weather data for a location"""
-        url = f"{BASE_URL}/current.json"
-        params = {
-            "key": self.api_key,
-            "q": f"{lat},{lon}",
-            "aqi": "no"
-        }
-        response = requests.get(url, params=params)
-        return response.json()
-    
-    def get_forecast(self, lat: float, lon: float) -> Dict:
-        """Get 5-day forecast data for a location"""
-        url = f"{BASE_URL}/forecast.json"
-        params = {
-            "key": self.api_key,
-            "q": f"{lat},{lon}",
-            "days": 5,
-            "aqi": "no"
-        }
-        response = requests.get(url, params=params)
-        return response.json()
+from src.data_processing.weather_index import IndexedWeatherData
+from src.data_processing.synthetic import CITIES, SAMPLE_START, generate_weather_data
+from src.visualization.weather_client import (
+    BASE_URL, WeatherAPI, PooledWeatherAPI, RateLimiter, schedule_locations
+)
+from src.visualization.response_cache import ResponseCache
+from src.visualization.downsampling import DEFAULT_VIEWPORT_WIDTH, downsample_series
+from src.visualization.station_layer import add_station_layer, render_popups
+from src.visualization.rendering import (
+    FigureBudget, apply_render_mode, budget_report, date_axis_values, grouped_series
+)
 
 def generate_sample_locations():
     """Generate locations around the world"""
@@ -70,56 +53,173 @@ def generate_sample_locations():
         ]
     })
 
-def fetch_weather_data(locations: pd.DataFrame, api: WeatherAPI) -> pd.DataFrame:
-    """Fetch real weather data for all locations"""
-    all_data = []
-    
-    for _, row in locations.iterrows():
-        try:
-            # Get current weather
-            current = api.get_current_weather(row['lat'], row['lon'])
-            
-            # Extract current weather data
-            current_data = {
-                'timestamp': datetime.fromtimestamp(current['current']['last_updated_epoch']),
-                'city': row['city'],
-                'lat': row['lat'],
-                'lon': row['lon'],
-                'temperature': current['current']['temp_c'],
-                'humidity': current['current']['humidity'],
-                'wind_speed': current['current']['wind_kph'] / 3.6,  # Convert to m/s
-                'precipitation': current['current']['precip_mm'],
-                'pressure': current['current']['pressure_mb']
-            }
-            all_data.append(current_data)
-            
-            # Get forecast
-            forecast = api.get_forecast(row['lat'], row['lon'])
+# Fields of a WeatherAPI hour or current block, in the column order of the parsed arrays
+FORECAST_FIELDS = ['time_epoch', 'temp_c', 'humidity', 'wind_kph', 'precip_mm', 'pressure_mb']
+WEATHER_COLUMNS = ['timestamp', 'city', 'lat', 'lon', 'temperature', 'humidity',
+                   'wind_speed', 'precipitation', 'pressure']
+
+_hour_fields = itemgetter(*FORECAST_FIELDS)
+_current_fields = itemgetter('last_updated_epoch', *FORECAST_FIELDS[1:])
+
+def parse_forecast_hours(forecast: Dict) -> np.ndarray:
+    """
+    Pull every forecast hour into one float64 array
+
+    Returns:
+        Array of shape (hours, len(FORECAST_FIELDS)) in FORECAST_FIELDS order
+    """
+    days = [day['hour'] for day in forecast['forecast']['forecastday']]
+    n = sum(map(len, days))
+    # itemgetter pulls all fields of an hour in one C-level call; fromiter fills
+    # a buffer preallocated from count without building intermediate lists
+    values = chain.from_iterable(map(_hour_fields, chain.from_iterable(days)))
+    return np.fromiter(values, dtype=np.float64, count=n * len(FORECAST_FIELDS)).reshape(n, len(FORECAST_FIELDS))
+
+def parse_current(current: Dict) -> np.ndarray:
+    """Parse a 'current' block into a single row in FORECAST_FIELDS order"""
+    return np.array([_current_fields(current)], dtype=np.float64)
+
+def to_weather_columns(row: Dict, values: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Convert parsed API values for one location into weather data columns
+
+    Timestamps stay as epoch seconds under 'time_epoch'; build_weather_frame
+    converts them once for all locations.
+    """
+    n = len(values)
+    return {
+        'time_epoch': values[:, 0].astype(np.int64),
+        'city': np.full(n, row['city'], dtype=object),
+        'lat': np.full(n, row['lat'], dtype=np.float64),
+        'lon': np.full(n, row['lon'], dtype=np.float64),
+        'temperature': values[:, 1],
+        'humidity': values[:, 2],
+        'wind_speed': values[:, 3] / 3.6,  # Convert to m/s
+        'precipitation': values[:, 4],
+        'pressure': values[:, 5]
+    }
+
+def local_timestamps(epochs: np.ndarray) -> np.ndarray:
+    """Vectorized datetime.fromtimestamp: epoch seconds to naive local datetime64 values"""
+    # Forecast hours repeat across locations, so convert each distinct instant only once
+    unique, inverse = np.unique(epochs, return_inverse=True)
+    local = np.array([datetime.fromtimestamp(epoch) for epoch in unique.tolist()], dtype='datetime64[us]')
+    return local[inverse]
+
+def build_weather_frame(results: List[Dict[str, np.ndarray]]) -> pd.DataFrame:
+    """Concatenate the columns of all locations into one weather DataFrame"""
+    results = [result for result in results if result]
+    if not results:
+        return pd.DataFrame()
+    
+    columns = {column: np.concatenate([result[column] for result in results])
+               for column in WEATHER_COLUMNS[1:]}
+    timestamps = local_timestamps(np.concatenate([result['time_epoch'] for result in results]))
+    return pd.DataFrame({'timestamp': timestamps, **columns})
+
+def fetch_location_data(row: Dict, api: WeatherAPI, merged: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Fetch current weather and forecast columns for a single location
+
+    In merged mode the current conditions come from the 'current' block of
+    the forecast response, so each location costs one API call instead of two.
+
+    Returns:
+        Columns from to_weather_columns with the current reading first, or an
+        empty dict if nothing could be fetched
+    """
+    blocks = []
+    
+    try:
+        # Get current weather
+        if not merged:
+            blocks.append(parse_current(api.get_current_weather(row['lat'], row['lon'])['current']))
+        
+        # Get forecast
+        forecast = api.get_forecast(row['lat'], row['lon'])
+        if merged:
+            blocks.append(parse_current(forecast['current']))
+        blocks.append(parse_forecast_hours(forecast))
             
-            # Process forecast data
-            for day in forecast['forecast']['forecastday']:
-                for hour in day['hour']:
-                    forecast_data = {
-                        'timestamp': datetime.fromtimestamp(hour['time_epoch']),
-                        'city': row['city'],
-                        'lat': row['lat'],
-                        'lon': row['lon'],
-                        'temperature': hour['temp_c'],
-                        'humidity': hour['humidity'],
-                        'wind_speed': hour['wind_kph'] / 3.6,  # Convert to m/s
-                        'precipitation': hour['precip_mm'],
-                        'pressure': hour['pressure_mb']
-                    }
-                    all_data.append(forecast_data)
-                
-        except Exception as e:
-            print(f"Error fetching data for {row['city']}: {str(e)}")
-            continue
-    
-    return pd.DataFrame(all_data)
+    except Exception as e:
+        print(f"Error fetching data for {row['city']}: {str(e)}")
+    
+    if not blocks:
+        return {}
+    return to_weather_columns(row, np.concatenate(blocks))
+
+def fetch_weather_data(locations: pd.DataFrame, api: WeatherAPI, merged: bool = True,
+                       last_fetched: Optional[Dict[str, datetime]] = None) -> pd.DataFrame:
+    """
+    Fetch real weather data for all locations
+
+    Args:
+        locations: DataFrame with city, lat and lon columns
+        api: Weather API client; a PooledWeatherAPI fetches concurrently
+        merged: Take current conditions from the forecast call (one call per location)
+        last_fetched: Time each city was last fetched; the stalest are fetched first.
+            Defaults to when the client's response cache last fetched each city.
+
+    Returns:
+        DataFrame with current and forecast rows for every fetched location
+    """
+    status = [api.cache_status(lat, lon, merged) for lat, lon in zip(locations['lat'], locations['lon'])]
+    if last_fetched is None:
+        last_fetched = {city: datetime.fromtimestamp(fetched_at)
+                        for city, (fetched_at, _) in zip(locations['city'], status) if fetched_at is not None}
+    
+    # Fetch the stalest locations first and, with a daily quota, only as many as it still covers.
+    # Locations the cache serves fresh cost no calls and are always kept.
+    calls = np.array([calls for _, calls in status], dtype=np.int64)
+    scheduled = schedule_locations(locations.assign(_position=np.arange(len(locations)), _calls=calls),
+                                   last_fetched)
+    if api.rate_limiter is not None and api.rate_limiter.daily_quota is not None:
+        calls = scheduled['_calls'].to_numpy()
+        covered = (calls == 0) | (np.cumsum(calls) <= api.rate_limiter.remaining_today())
+        if not covered.all():
+            print(f"Warning: daily quota covers only {covered.sum()} of {len(locations)} locations")
+        scheduled = scheduled[covered]
+    
+    rows = scheduled.drop(columns=['_position', '_calls']).to_dict('records')
+    fetch = lambda row: fetch_location_data(row, api, merged)
+    
+    # A pooled client fetches locations concurrently, a plain one in sequence
+    if isinstance(api, PooledWeatherAPI):
+        results = api.map(fetch, rows)
+    else:
+        results = [fetch(row) for row in rows]
+    
+    # Rows come back in the order of the input locations, whatever the fetch order
+    order = np.argsort(scheduled['_position'].to_numpy(), kind='stable')
+    return build_weather_frame([results[i] for i in order])
+
+POPUP_TEMPLATE = """
+        <div style="font-family: Arial, sans-serif; padding: 10px;">
+            <h3>{city}</h3>
+            <table style="width: 100%;">
+                <tr><td><b>Temperature:</b></td><td>{temperature:.1f}°C</td></tr>
+                <tr><td><b>Humidity:</b></td><td>{humidity:.1f}%</td></tr>
+                <tr><td><b>Wind Speed:</b></td><td>{wind_speed:.1f} m/s</td></tr>
+                <tr><td><b>Precipitation:</b></td><td>{precipitation:.1f} mm</td></tr>
+                <tr><td><b>Pressure:</b></td><td>{pressure:.1f} hPa</td></tr>
+                <tr><td><b>Weather Score:</b></td><td>{weather_score:.1f}</td></tr>
+            </table>
+        </div>
+        """
+
+def create_weather_map(weather_data: pd.DataFrame, mode: str = 'auto', data_path: Optional[str] = None):
+    """
+    Create an interactive map with weather information
+    
+    Args:
+        weather_data: Readings with lat, lon and a weather_score
+        mode: 'markers', 'cluster' or 'auto', see station_layer.add_station_layer
+        data_path: Write the stations to this gzipped JSON file, loaded by
+            the page on demand, instead of embedding them in the page. The
+            page fetches it relative to src/static/weather_map.html
+    """
+    map_path = 'src/static/weather_map.html'
 
-def create_weather_map(weather_data: pd.DataFrame):
-    """Create an interactive map with weather information"""
     # Create a base map centered on the mean coordinates
     center_lat = weather_data['lat'].mean()
     center_lon = weather_data['lon'].mean()
@@ -128,40 +228,37 @@ def create_weather_map(weather_data: pd.DataFrame):
     # Get the latest weather data for each city
     latest_data = weather_data.groupby('city').last().reset_index()
     
-    # Add markers for each city
-    for _, row in latest_data.iterrows():
-        # Create popup content
-        popup_content = f"""
-        <div style="font-family: Arial, sans-serif; padding: 10px;">
-            <h3>{row['city']}</h3>
-            <table style="width: 100%;">
-                <tr><td><b>Temperature:</b></td><td>{row['temperature']:.1f}°C</td></tr>
-                <tr><td><b>Humidity:</b></td><td>{row['humidity']:.1f}%</td></tr>
-                <tr><td><b>Wind Speed:</b></td><td>{row['wind_speed']:.1f} m/s</td></tr>
-                <tr><td><b>Precipitation:</b></td><td>{row['precipitation']:.1f} mm</td></tr>
-                <tr><td><b>Pressure:</b></td><td>{row['pressure']:.1f} hPa</td></tr>
-                <tr><td><b>Weather Score:</b></td><td>{row['weather_score']:.1f}</td></tr>
-            </table>
-        </div>
-        """
-        
-        # Color marker based on weather score
-        color = 'red' if row['weather_score'] > 10 else 'orange' if row['weather_score'] > 5 else 'green'
-        
-        folium.CircleMarker(
-            location=[row['lat'], row['lon']],
-            radius=10,
-            popup=folium.Popup(popup_content, max_width=300),
-            color=color,
-            fill=True,
-            fill_color=color
-        ).add_to(m)
+    # Color markers based on weather score
+    score = latest_data['weather_score'].to_numpy()
+    colors = np.select([score > 10, score > 5], ['red', 'orange'], default='green')
+    
+    add_station_layer(m, latest_data['lat'], latest_data['lon'], colors,
+                      render_popups(latest_data, POPUP_TEMPLATE), mode=mode, data_path=data_path,
+                      html_path=map_path)
     
     # Save the map
-    m.save('src/static/weather_map.html')
+    m.save(map_path)
 
-def create_time_series_plots(weather_data: pd.DataFrame):
-    """Create time series plots for weather metrics"""
+def create_time_series_plots(weather_data: pd.DataFrame, width: int = DEFAULT_VIEWPORT_WIDTH,
+                             render_mode: str = 'auto') -> FigureBudget:
+    """
+    Create time series plots for weather metrics
+    
+    Each city's readings are downsampled to what the plot width can show,
+    keeping the minimum and maximum of every pixel column so peaks survive.
+    With more cities than palette colors, cities sharing a color are drawn
+    as one trace per metric, broken between cities, since their lines are
+    indistinguishable anyway. Large figures switch to WebGL.
+    
+    Args:
+        weather_data: Preprocessed readings with a weather_score
+        width: Plot width in pixels the series are downsampled for
+        render_mode: 'auto', 'svg' or 'webgl', see apply_render_mode
+    
+    Returns:
+        Size and latency report of the written figure
+    """
+    started = time.perf_counter()
     fig = make_subplots(
         rows=3, cols=1,
         subplot_titles=(
@@ -172,50 +269,38 @@ def create_time_series_plots(weather_data: pd.DataFrame):
         vertical_spacing=0.1
     )
     
-    # Create a color map for cities
-    cities = weather_data['city'].unique()
-    colors = px.colors.qualitative.Set3[:len(cities)]
-    city_colors = dict(zip(cities, colors))
+    # Index once so each city is a slice instead of a scan over all rows
+    index = IndexedWeatherData(weather_data)
     
-    for city in cities:
-        city_data = weather_data[weather_data['city'] == city]
-        color = city_colors[city]
-        
-        # Temperature plot
-        fig.add_trace(
-            go.Scatter(
-                x=city_data['timestamp'],
-                y=city_data['temperature'],
-                name=f'{city} - Temp',
-                line=dict(color=color),
-                showlegend=True
-            ),
-            row=1, col=1
-        )
-        
-        # Wind speed plot
-        fig.add_trace(
-            go.Scatter(
-                x=city_data['timestamp'],
-                y=city_data['wind_speed'],
-                name=f'{city} - Wind',
-                line=dict(color=color),
-                showlegend=True
-            ),
-            row=2, col=1
-        )
+    # Create a color map for cities
+    colors = px.colors.qualitative.Set3
+    positions = {city: i for i, city in enumerate(index.stations)}
+    
+    # One legend group per color: a single city, or every city sharing it
+    groups = {}
+    for city, city_data in index.groups():
+        groups.setdefault(positions[city] % len(colors), []).append((city, city_data))
+    
+    metrics = [('temperature', 'Temp'), ('wind_speed', 'Wind'), ('weather_score', 'Score')]
+    for color_index, members in groups.items():
+        color = colors[color_index]
+        grouped = len(members) > 1
+        label = f"{members[0][0]} +{len(members) - 1} more" if grouped else members[0][0]
         
-        # Weather score plot
-        fig.add_trace(
-            go.Scatter(
-                x=city_data['timestamp'],
-                y=city_data['weather_score'],
-                name=f'{city} - Score',
-                line=dict(color=color),
-                showlegend=True
-            ),
-            row=3, col=1
-        )
+        for row, (column, suffix) in enumerate(metrics, 1):
+            x, y = grouped_series([downsample_series(city_data['timestamp'], city_data[column], width)
+                                   for _, city_data in members])
+            fig.add_trace(
+                go.Scatter(
+                    x=date_axis_values(x),
+                    y=y,
+                    name=f'{label} - {suffix}',
+                    legendgroup=label,
+                    line=dict(color=color),
+                    showlegend=True
+                ),
+                row=row, col=1
+            )
     
     # Update layout
     fig.update_layout(
@@ -231,52 +316,24 @@ def create_time_series_plots(weather_data: pd.DataFrame):
     )
     
     # Update axes labels
+    fig.update_xaxes(type='date')
     fig.update_xaxes(title_text="Time", row=3, col=1)
     fig.update_yaxes(title_text="Temperature (°C)", row=1, col=1)
     fig.update_yaxes(title_text="Wind Speed (m/s)", row=2, col=1)
     fig.update_yaxes(title_text="Weather Score", row=3, col=1)
+    apply_render_mode(fig, render_mode)
+    report = budget_report(fig, 'weather_trends.html', time.perf_counter() - started)
     
     # Save the plot
     fig.write_html('src/static/weather_trends.html')
+    print(f"Figure budget: {report}")
+    return report
 
 def generate_sample_weather_data():
-    """Generate sample weather data for various cities"""
-    cities = [
-        'New York', 'London', 'Tokyo', 'Sydney', 'Mumbai', 
-        'Cairo', 'Rio de Janeiro', 'Moscow', 'Beijing', 'Cape Town'
-    ]
-    
-    # Generate 24 hours of data for each city
-    data = []
-    base_time = datetime.now()
-    
-    for city in cities:
-        # Generate different temperature patterns for different regions
-        if city in ['Cairo', 'Mumbai']:
-            temp_base = 30
-        elif city in ['Moscow', 'London']:
-            temp_base = 5
-        else:
-            temp_base = 20
-            
-        for hour in range(24):
-            time = base_time + timedelta(hours=hour)
-            # Add some random variation to make it interesting
-            temp = temp_base + np.sin(hour/12 * np.pi) * 5 + np.random.normal(0, 1)
-            humidity = 60 + np.random.normal(0, 10)
-            wind_speed = 5 + np.random.normal(0, 2)
-            precipitation = max(0, np.random.normal(2, 3))
-            
-            data.append({
-                'city': city,
-                'timestamp': time,
-                'temperature': temp,
-                'humidity': humidity,
-                'wind_speed': wind_speed,
-                'precipitation': precipitation
-            })
-    
-    return pd.DataFrame(data)
+    """Generate 24 hours of sample weather data for various cities"""
+    # A fixed start keeps reruns identical, like weather_visualization's sample data
+    data = generate_weather_data(n_stations=len(CITIES), hours=24, start=SAMPLE_START)
+    return data[['city', 'timestamp', 'temperature', 'humidity', 'wind_speed', 'precipitation']].astype({'city': str})
 
 def create_temperature_heatmap(data):
     """Create a temperature heatmap across cities and time"""
@@ -409,12 +466,28 @@ def main():
         print("Warning: No WeatherAPI.com API key found. Please set your API key.")
         return
     
-    # Initialize API client
-    api = WeatherAPI(api_key)
+    # Responses are cached on disk so repeated runs barely touch the network
+    cache_path = os.getenv('WEATHERAPI_CACHE_PATH', 'data/weatherapi_cache.sqlite')
+    cache = ResponseCache(cache_path, offline=os.getenv('WEATHERAPI_OFFLINE', '') == '1') if cache_path else None
+    # Initialize API client; the rate limiter is shared by all fetch workers and
+    # keeps its token bucket and the daily quota count in the cache file, so both hold
+    # across runs and processes
+    daily_quota = os.getenv('WEATHERAPI_DAILY_QUOTA')
+    rate_limiter = RateLimiter(
+        requests_per_second=float(os.getenv('WEATHERAPI_RPS', '5')),
+        daily_quota=int(daily_quota) if daily_quota else None,
+        store=cache
+    )
+    api = PooledWeatherAPI(api_key, rate_limiter=rate_limiter, cache=cache)
     
     # Generate locations and fetch weather data
     locations = generate_sample_locations()
     weather_data = fetch_weather_data(locations, api)
+    api.close()
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Response cache: {stats['hit_rate']:.0%} hit rate, {stats['bytes_saved'] / 1e6:.1f} MB saved")
+        cache.close()
     
     if weather_data.empty:
         print("Error: No weather data was fetched. Please check your API key and internet connection.")
@@ -3,56 +3,22 @@ import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 import folium
-from datetime import datetime, timedelta
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.data_processing.synthetic import CITIES, SAMPLE_START, generate_weather_data
+from src.visualization.station_layer import MAP_MODES, add_station_layer, render_popups
+from src.visualization.render_pipeline import FigureSpec, format_report, parse_output, render_figures, with_outputs
 
 def generate_sample_weather_data():
-    """Generate sample weather data for various cities"""
-    cities = {
-        'New York': (40.7128, -74.0060),
-        'London': (51.5074, -0.1278),
-        'Tokyo': (35.6762, 139.6503),
-        'Sydney': (-33.8688, 151.2093),
-        'Mumbai': (19.0760, 72.8777),
-        'Cairo': (30.0444, 31.2357),
-        'Rio de Janeiro': (-22.9068, -43.1729),
-        'Moscow': (55.7558, 37.6173),
-        'Beijing': (39.9042, 116.4074),
-        'Cape Town': (-33.9249, 18.4241)
-    }
-    
-    # Generate 24 hours of data for each city
-    data = []
-    base_time = datetime.now()
-    
-    for city, (lat, lon) in cities.items():
-        # Generate different temperature patterns for different regions
-        if city in ['Cairo', 'Mumbai']:
-            temp_base = 30
-        elif city in ['Moscow', 'London']:
-            temp_base = 5
-        else:
-            temp_base = 20
-            
-        for hour in range(24):
-            time = base_time + timedelta(hours=hour)
-            # Add some random variation to make it interesting
-            temp = temp_base + np.sin(hour/12 * np.pi) * 5 + np.random.normal(0, 1)
-            humidity = 60 + np.random.normal(0, 10)
-            wind_speed = 5 + np.random.normal(0, 2)
-            precipitation = max(0, np.random.normal(2, 3))
-            
-            data.append({
-                'city': city,
-                'latitude': lat,
-                'longitude': lon,
-                'timestamp': time,
-                'temperature': temp,
-                'humidity': humidity,
-                'wind_speed': wind_speed,
-                'precipitation': precipitation
-            })
-    
-    return pd.DataFrame(data)
+    """Generate 24 hours of sample weather data for various cities"""
+    # A fixed start keeps reruns identical, so unchanged figures are skipped
+    data = generate_weather_data(n_stations=len(CITIES), hours=24, start=SAMPLE_START)
+    return data[['city', 'latitude', 'longitude', 'timestamp', 'temperature',
+                 'humidity', 'wind_speed', 'precipitation']].astype({'city': str})
 
 def create_temperature_heatmap(data, return_fig=False):
     """Create a temperature heatmap across cities and time"""
@@ -189,8 +155,26 @@ def create_pair_plot(data, return_fig=False):
     pair_plot.savefig('../static/pair_plot.png', dpi=300, bbox_inches='tight')
     plt.close()
 
-def create_weather_map(data, return_map=False):
-    """Create an interactive map with weather information"""
+POPUP_TEMPLATE = """
+        <div style="font-family: Arial, sans-serif;">
+            <h4>{city}</h4>
+            <p>Temperature: {temperature:.1f}°C</p>
+            <p>Humidity: {humidity:.1f}%</p>
+            <p>Wind Speed: {wind_speed:.1f} m/s</p>
+            <p>Precipitation: {precipitation:.1f} mm</p>
+        </div>
+        """
+
+def create_weather_map(data, return_map=False, mode='auto', data_path=None,
+                       html_path='../static/weather_map.html', popup_width=200):
+    """
+    Create an interactive map with weather information
+    
+    mode and data_path choose how stations are added, see
+    station_layer.add_station_layer; with data_path the stations are written
+    to a gzipped JSON file that the page loads on demand, relative to
+    html_path. The map is saved to html_path unless return_map is set.
+    """
     # Get the latest data for each city
     latest_data = data.groupby('city').last().reset_index()
     
@@ -198,32 +182,41 @@ def create_weather_map(data, return_map=False):
     m = folium.Map(location=[0, 0], zoom_start=2)
     
     # Add markers for each city
-    for _, row in latest_data.iterrows():
-        # Create popup content
-        popup_content = f"""
-        <div style="font-family: Arial, sans-serif;">
-            <h4>{row['city']}</h4>
-            <p>Temperature: {row['temperature']:.1f}°C</p>
-            <p>Humidity: {row['humidity']:.1f}%</p>
-            <p>Wind Speed: {row['wind_speed']:.1f} m/s</p>
-            <p>Precipitation: {row['precipitation']:.1f} mm</p>
-        </div>
-        """
-        
-        # Add marker
-        folium.CircleMarker(
-            location=[row['latitude'], row['longitude']],
-            radius=10,
-            popup=folium.Popup(popup_content, max_width=200),
-            color='red' if row['temperature'] > 25 else 'blue',
-            fill=True
-        ).add_to(m)
+    colors = np.where(latest_data['temperature'].to_numpy() > 25, 'red', 'blue')
+    add_station_layer(m, latest_data['latitude'], latest_data['longitude'], colors,
+                      render_popups(latest_data, POPUP_TEMPLATE), mode=mode, data_path=data_path,
+                      html_path=html_path, popup_width=popup_width)
     
     if return_map:
         return m
-    m.save('../static/weather_map.html')
+    m.save(html_path)
+
+MODULE = 'src.visualization.weather_visualization'
+METRICS = ('temperature', 'humidity', 'wind_speed', 'precipitation')
+
+# Static figures rendered by main(), with the columns each one reads
+FIGURES = [
+    FigureSpec('temperature_heatmap', f'{MODULE}.create_temperature_heatmap', ('city', 'timestamp', 'temperature')),
+    FigureSpec('weather_distributions', f'{MODULE}.create_weather_distributions', ('city',) + METRICS),
+    FigureSpec('correlation_matrix', f'{MODULE}.create_correlation_matrix', ('city',) + METRICS),
+    FigureSpec('time_series', f'{MODULE}.create_time_series_plot', ('city', 'timestamp') + METRICS),
+    FigureSpec('pair_plot', f'{MODULE}.create_pair_plot', ('city', 'timestamp') + METRICS),
+]
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the static weather figures")
+    parser.add_argument('--output-dir', default='../static')
+    parser.add_argument('--output', action='append', default=[], metavar='[FIGURE=]FORMAT[@DPI]',
+                        help="Files to write instead of a 300 dpi PNG, e.g. webp, preview or "
+                             "pair_plot=png@100; repeat for several")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes, default one per CPU")
+    parser.add_argument('--force', action='store_true', help="Render figures even if their data is unchanged")
+    parser.add_argument('--map-mode', choices=MAP_MODES, default='auto',
+                        help="One marker per station, or clustered markers created in the browser")
+    parser.add_argument('--map-data', action='store_true',
+                        help="Write the map's stations to weather_stations.json.gz, loaded on demand")
+    args = parser.parse_args(argv)
+    
     # Set the style for all plots
     sns.set_theme(style="whitegrid")
     
@@ -233,32 +226,25 @@ def main():
     
     # Create visualizations
     print("Creating visualizations...")
-    
-    print("1. Creating temperature heatmap...")
-    create_temperature_heatmap(weather_data)
-    
-    print("2. Creating weather distribution plots...")
-    create_weather_distributions(weather_data)
-    
-    print("3. Creating correlation matrix...")
-    create_correlation_matrix(weather_data)
-    
-    print("4. Creating time series plots...")
-    create_time_series_plot(weather_data)
-    
-    print("5. Creating pair plot...")
-    create_pair_plot(weather_data)
-    
-    print("6. Creating interactive weather map...")
-    create_weather_map(weather_data)
+    figures = with_outputs(FIGURES, [parse_output(choice) for choice in args.output])
+    start = time.perf_counter()
+    results = render_figures(weather_data, figures, args.output_dir, max_workers=args.workers, force=args.force)
+    print(format_report(results, time.perf_counter() - start))
+    
+    print("Creating interactive weather map...")
+    data_path = os.path.join(args.output_dir, 'weather_stations.json.gz') if args.map_data else None
+    map_path = os.path.join(args.output_dir, 'weather_map.html')
+    weather_map = create_weather_map(weather_data, return_map=True, mode=args.map_mode, data_path=data_path,
+                                     html_path=map_path)
+    weather_map.save(map_path)
     
     print("\nAll visualizations have been created!")
-    print("You can find the following files in the static directory:")
-    print("1. temperature_heatmap.png - Temperature variations across cities")
-    print("2. weather_distributions.png - Distribution of weather metrics")
-    print("3. correlation_matrix.png - Correlations between metrics")
-    print("4. time_series.png - Weather changes over time")
-    print("5. pair_plot.png - Relationships between metrics")
+    print(f"You can find the following files in {args.output_dir}:")
+    print("1. temperature_heatmap - Temperature variations across cities")
+    print("2. weather_distributions - Distribution of weather metrics")
+    print("3. correlation_matrix - Correlations between metrics")
+    print("4. time_series - Weather changes over time")
+    print("5. pair_plot - Relationships between metrics")
     print("6. weather_map.html - Interactive weather map")
 
 if __name__ == "__main__":
@@ -4,8 +4,16 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 
+from src.visualization.downsampling import DEFAULT_VIEWPORT_WIDTH, downsample_indices, target_points
+from src.visualization.rendering import apply_render_mode
+
 class WeatherVisualizer:
-    def __init__(self):
+    def __init__(self, viewport_width: int = DEFAULT_VIEWPORT_WIDTH, downsample_method: str = 'minmax',
+                 render_mode: str = 'auto'):
+        self.viewport_width = viewport_width
+        self.downsample_method = downsample_method
+        # 'auto' draws figures past rendering.WEBGL_THRESHOLD points with WebGL
+        self.render_mode = render_mode
         self.color_scheme = {
             'temperature': 'red',
             'humidity': 'blue',
@@ -14,13 +22,17 @@ class WeatherVisualizer:
             'pressure': 'orange'
         }
 
-    def create_time_series_plot(self, df: pd.DataFrame, variables: list = None):
+    def create_time_series_plot(self, df: pd.DataFrame, variables: list = None, width: int = None):
         """
         Create an interactive time series plot for weather variables
         
+        Each trace is downsampled to the points visible at the plot width,
+        keeping the extremes of every pixel column.
+        
         Args:
-            df: DataFrame with weather data
+            df: DataFrame with weather data sorted by timestamp
             variables: List of variables to plot
+            width: Plot width in pixels, defaults to the viewport width
         
         Returns:
             Plotly figure object
@@ -32,9 +44,14 @@ class WeatherVisualizer:
                            subplot_titles=variables,
                            shared_xaxes=True)
         
+        n_points = target_points(width or self.viewport_width)
+        timestamps = df['timestamp'].to_numpy()
+        
         for idx, var in enumerate(variables, 1):
+            values = df[var].to_numpy()
+            keep = downsample_indices(timestamps, values, n_points, self.downsample_method)
             fig.add_trace(
-                go.Scatter(x=df['timestamp'], y=df[var],
+                go.Scatter(x=timestamps[keep], y=values[keep],
                           name=var,
                           line=dict(color=self.color_scheme.get(var, 'gray'))),
                 row=idx, col=1
@@ -44,7 +61,7 @@ class WeatherVisualizer:
                          title_text="Weather Variables Time Series",
                          showlegend=False)
         
-        return fig
+        return apply_render_mode(fig, self.render_mode)
 
     def create_risk_heatmap(self, df: pd.DataFrame):
         """
@@ -133,7 +150,7 @@ class WeatherVisualizer:
         )
         
         fig.update_layout(height=800, title_text="Weather Risk Dashboard")
-        return fig
+        return apply_render_mode(fig, self.render_mode)
 
     def plot_model_performance(self, history):
         """
@@ -0,0 +1,236 @@
+"""
+Cached data access for the Streamlit dashboard
+
+Streamlit reruns the whole script on every widget change. The dataset is
+loaded once per DATA_TTL_S and shared by all sessions with st.cache_resource,
+since it is only ever read. Everything derived from it is memoized with
+st.cache_data keyed on the dataset version and the filter state, so a panel
+is only recomputed when its own inputs change.
+"""
+import os
+import sys
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import folium
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from src.data_processing.weather_index import IndexedWeatherData
+from src.visualization.downsampling import downsample_frame
+from src.visualization.rendering import FigureBudget, apply_render_mode, budget_report
+from src.visualization.station_layer import add_station_layer, render_popups
+from src.visualization.weather_visualization import generate_sample_weather_data
+
+# Seconds before the dataset is regenerated and every derived result with it
+DATA_TTL_S = int(os.getenv('DASHBOARD_DATA_TTL_S', '600'))
+
+# Filter states remembered per derived result
+MAX_FILTER_STATES = int(os.getenv('DASHBOARD_CACHE_ENTRIES', '32'))
+
+# Width in pixels that line charts are downsampled for; charts sit in half-width columns
+PLOT_WIDTH_PX = int(os.getenv('DASHBOARD_PLOT_WIDTH_PX', '800'))
+
+METRICS = ['temperature', 'humidity', 'wind_speed', 'precipitation']
+
+POPUP_TEMPLATE = """
+        <div style='font-family: Arial; width: 200px;'>
+            <h4 style='margin-bottom: 10px;'>{city}</h4>
+            <p><b>Temperature:</b> {temperature:.1f}°C</p>
+            <p><b>Humidity:</b> {humidity:.1f}%</p>
+            <p><b>Wind Speed:</b> {wind_speed:.1f} m/s</p>
+            <p><b>Precipitation:</b> {precipitation:.1f} mm</p>
+        </div>
+        """
+
+# Cache key for one filter state: (dataset version, cities, start, end)
+FilterKey = Tuple[str, Tuple[str, ...], datetime, datetime]
+
+
+class Dataset:
+    """The indexed readings plus a version that changes whenever they are reloaded"""
+
+    def __init__(self, index: IndexedWeatherData, version: str):
+        self.index = index
+        self.version = version
+        self.min_timestamp = index.data['timestamp'].min().to_pydatetime()
+        self.max_timestamp = index.data['timestamp'].max().to_pydatetime()
+
+
+@st.cache_resource(ttl=DATA_TTL_S, show_spinner="Loading weather data...")
+def load_dataset(source: str = 'sample') -> Dataset:
+    """
+    Load and index the readings of a source
+
+    Args:
+        source: Data source name; only 'sample' is available
+
+    Returns:
+        Dataset shared by every session until DATA_TTL_S expires
+    """
+    if source != 'sample':
+        raise ValueError(f"Unknown data source: {source}")
+
+    df = pd.DataFrame(generate_sample_weather_data())
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    loaded_at = datetime.now()
+    return Dataset(IndexedWeatherData(df), f"{source}@{loaded_at.isoformat()}")
+
+
+def filter_key(dataset: Dataset, cities, start: datetime, end: datetime) -> FilterKey:
+    """Canonical cache key for a filter state, independent of selection order"""
+    return dataset.version, tuple(sorted(cities)), start, end
+
+
+@st.cache_data(ttl=DATA_TTL_S, max_entries=MAX_FILTER_STATES)
+def filtered_frame(key: FilterKey, _dataset: Dataset) -> pd.DataFrame:
+    """Readings of the filter state; _dataset is not hashed, key identifies it"""
+    _, cities, start, end = key
+    return _dataset.index.query(cities, start, end)
+
+
+@st.cache_data(ttl=DATA_TTL_S, max_entries=MAX_FILTER_STATES)
+def summary_metrics(key: FilterKey, _dataset: Dataset) -> Dict[str, float]:
+    """Averages and total precipitation shown in the metric cards"""
+    df = filtered_frame(key, _dataset)
+    return {
+        'temperature': df['temperature'].mean(),
+        'humidity': df['humidity'].mean(),
+        'wind_speed': df['wind_speed'].mean(),
+        'precipitation': df['precipitation'].sum()
+    }
+
+
+@st.cache_data(ttl=DATA_TTL_S, max_entries=MAX_FILTER_STATES)
+def temperature_pivot(key: FilterKey, _dataset: Dataset) -> pd.DataFrame:
+    """Mean temperature by city and hour of day"""
+    df = filtered_frame(key, _dataset)
+    return df.groupby(['city', df['timestamp'].dt.hour.rename('hour')])['temperature'].mean().unstack('hour')
+
+
+@st.cache_data(ttl=DATA_TTL_S, max_entries=MAX_FILTER_STATES)
+def correlation_matrix(key: FilterKey, _dataset: Dataset) -> pd.DataFrame:
+    """Correlations between the weather metrics"""
+    return filtered_frame(key, _dataset)[METRICS].corr()
+
+
+@st.cache_data(ttl=DATA_TTL_S, max_entries=MAX_FILTER_STATES)
+def temperature_heatmap_figure(key: FilterKey, _dataset: Dataset):
+    pivot = temperature_pivot(key, _dataset)
+    fig = px.imshow(
+        pivot,
+        color_continuous_scale='RdYlBu_r',
+        title='Temperature Heatmap by Hour',
+        labels={'color': 'Temperature (°C)'},
+        x=pivot.columns.astype(str) + ':00',  # Add hour format
+        y=pivot.index
+    )
+    fig.update_layout(
+        height=400,
+        xaxis_title="Hour of Day",
+        yaxis_title="City"
+    )
+    return fig
+
+
+@st.cache_data(ttl=DATA_TTL_S, max_entries=MAX_FILTER_STATES)
+def distribution_figure(key: FilterKey, _dataset: Dataset):
+    fig = px.box(
+        filtered_frame(key, _dataset),
+        x='city',
+        y=METRICS,
+        facet_col='variable',
+        facet_col_wrap=2,
+        title='Distribution of Weather Metrics by City'
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+@st.cache_data(ttl=DATA_TTL_S, max_entries=MAX_FILTER_STATES)
+def correlation_figure(key: FilterKey, _dataset: Dataset):
+    corr = correlation_matrix(key, _dataset)
+    fig = px.imshow(
+        corr,
+        color_continuous_scale='RdBu',
+        title='Correlation Matrix',
+        text_auto='.2f'
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+@st.cache_data(ttl=DATA_TTL_S, max_entries=MAX_FILTER_STATES)
+def time_series_figure(key: FilterKey, _dataset: Dataset):
+    """Temperature per city, downsampled to PLOT_WIDTH_PX keeping each pixel's extremes"""
+    fig = px.line(
+        downsample_frame(filtered_frame(key, _dataset), 'timestamp', 'temperature', by='city',
+                         width=PLOT_WIDTH_PX),
+        x='timestamp',
+        y='temperature',
+        color='city',
+        title='Temperature Over Time'
+    )
+    fig.update_layout(height=400)
+    return apply_render_mode(fig)
+
+
+@st.cache_data(ttl=DATA_TTL_S, max_entries=MAX_FILTER_STATES)
+def scatter_matrix_figure(key: FilterKey, _dataset: Dataset):
+    """
+    The scatter matrix, the most expensive panel to build
+
+    Scatter matrices are drawn with WebGL already. With more cities than
+    palette colors, one trace per city only repeats colors, so all cities
+    go into a single trace colored per point, with the city in the hover.
+    """
+    df = filtered_frame(key, _dataset)
+    palette = px.colors.qualitative.Plotly
+    if df['city'].nunique() <= len(palette):
+        fig = px.scatter_matrix(
+            df,
+            dimensions=METRICS,
+            color='city',
+            title='Weather Metrics Relationships'
+        )
+    else:
+        codes, _ = pd.factorize(df['city'])
+        # Integer codes on a stepped scale, so each point carries a number, not a color string
+        steps = [[i / (len(palette) - 1), color] for i, color in enumerate(palette)]
+        fig = go.Figure(go.Splom(
+            dimensions=[dict(label=metric, values=df[metric]) for metric in METRICS],
+            marker=dict(color=codes % len(palette), colorscale=steps, cmin=0, cmax=len(palette) - 1),
+            text=df['city'],
+            hovertemplate='%{text}<br>%{xaxis.title.text}=%{x}<br>%{yaxis.title.text}=%{y}<extra></extra>'
+        ))
+        fig.update_layout(title='Weather Metrics Relationships')
+    fig.update_layout(height=800)
+    return fig
+
+
+@st.cache_data(ttl=DATA_TTL_S, max_entries=MAX_FILTER_STATES * 8)
+def figure_budget(name: str, key: FilterKey, _fig) -> FigureBudget:
+    """Size report of a panel's figure, measured once per filter state"""
+    return budget_report(_fig, name)
+
+
+@st.cache_data(ttl=DATA_TTL_S, max_entries=MAX_FILTER_STATES)
+def weather_map_html(key: FilterKey, _dataset: Dataset) -> Optional[str]:
+    """Rendered folium map of the latest reading per city, None when nothing is selected"""
+    _, cities, start, end = key
+    latest_data = _dataset.index.latest(cities, start, end).reset_index(drop=True)
+    if latest_data.empty:
+        return None
+
+    center_lat = latest_data['latitude'].mean()
+    center_lon = latest_data['longitude'].mean()
+    m = folium.Map(location=[center_lat, center_lon], zoom_start=2)
+
+    # The map is rendered into an iframe, so stations are always inlined
+    add_station_layer(m, latest_data['latitude'], latest_data['longitude'],
+                      ['red'] * len(latest_data), render_popups(latest_data, POPUP_TEMPLATE))
+
+    return m.get_root().render()
@@ -1,13 +1,12 @@
-import streamlit as st
+import time
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import folium
-from datetime import datetime, timedelta
-from streamlit_folium import folium_static
-from visualization.weather_visualization import generate_sample_weather_data
+import streamlit as st
+import streamlit.components.v1 as components
+from datetime import datetime
+import data_layer
+
+# Time-to-interactive of this rerun, from the first line to the last widget
+run_started = time.perf_counter()
 
 # Set page config
 st.set_page_config(
@@ -45,14 +44,10 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Generate data
-data = generate_sample_weather_data()
-df = pd.DataFrame(data)
-
-# Convert timestamps to datetime
-df['timestamp'] = pd.to_datetime(df['timestamp'])
-min_date = df['timestamp'].min().to_pydatetime()
-max_date = df['timestamp'].max().to_pydatetime()
+# Loaded and indexed once per TTL, shared by all sessions
+dataset = data_layer.load_dataset()
+min_date = dataset.min_timestamp
+max_date = dataset.max_timestamp
 
 # Sidebar
 with st.sidebar:
@@ -67,6 +62,9 @@ with st.sidebar:
         min_value=min_date.date(),
         max_value=max_date.date()
     )
+    # While a range is being picked only its first date is set
+    if len(date_range) == 1:
+        date_range = (date_range[0], date_range[0])
     
     # Convert dates to datetime for filtering
     start_date = datetime.combine(date_range[0], datetime.min.time())
@@ -76,33 +74,38 @@ with st.sidebar:
     st.subheader("🌍 Cities")
     selected_cities = st.multiselect(
         "Select Cities",
-        options=df['city'].unique(),
-        default=df['city'].unique()
+        options=dataset.index.stations,
+        default=dataset.index.stations
     )
     
-    # Apply filters
-    filtered_df = df[
-        (df['timestamp'].dt.date.between(date_range[0], date_range[1])) &
-        (df['city'].isin(selected_cities))
-    ]
+    # Every panel below is cached on this key, so unchanged filters cost nothing
+    key = data_layer.filter_key(dataset, selected_cities, start_date, end_date)
+
+# Size and latency of every figure on this rerun
+budgets = []
+
+def plot(name, build):
+    """Draw a panel's figure and record its budget; build time is 0 on a cache hit"""
+    start = time.perf_counter()
+    fig = build(key, dataset)
+    build_seconds = time.perf_counter() - start
+    st.plotly_chart(fig, use_container_width=True)
+    budgets.append(data_layer.figure_budget(name, key, fig)._replace(build_ms=build_seconds * 1000))
 
 # Main dashboard
 st.title("🌤️ Weather Analytics Dashboard")
 
 # Key metrics
+metrics = data_layer.summary_metrics(key, dataset)
 col1, col2, col3, col4 = st.columns(4)
 with col1:
-    avg_temp = filtered_df['temperature'].mean()
-    st.metric("Average Temperature", f"{avg_temp:.1f}°C")
+    st.metric("Average Temperature", f"{metrics['temperature']:.1f}°C")
 with col2:
-    avg_humidity = filtered_df['humidity'].mean()
-    st.metric("Average Humidity", f"{avg_humidity:.1f}%")
+    st.metric("Average Humidity", f"{metrics['humidity']:.1f}%")
 with col3:
-    avg_wind = filtered_df['wind_speed'].mean()
-    st.metric("Average Wind Speed", f"{avg_wind:.1f} m/s")
+    st.metric("Average Wind Speed", f"{metrics['wind_speed']:.1f} m/s")
 with col4:
-    total_precip = filtered_df['precipitation'].sum()
-    st.metric("Total Precipitation", f"{total_precip:.1f} mm")
+    st.metric("Total Precipitation", f"{metrics['precipitation']:.1f} mm")
 
 # Create tabs for different visualizations
 tab1, tab2, tab3 = st.tabs(["Overview", "Detailed Analysis", "Geographic View"])
@@ -113,39 +116,12 @@ with tab1:
     with col1:
         # Temperature heatmap
         st.subheader("Temperature Variation")
-        # Group by city and hour for better visualization
-        filtered_df['hour'] = filtered_df['timestamp'].dt.hour
-        temp_pivot = filtered_df.groupby(['city', 'hour'])['temperature'].mean().reset_index()
-        temp_pivot = temp_pivot.pivot(index='city', columns='hour', values='temperature')
-        
-        fig_heatmap = px.imshow(
-            temp_pivot,
-            color_continuous_scale='RdYlBu_r',
-            title='Temperature Heatmap by Hour',
-            labels={'color': 'Temperature (°C)'},
-            x=temp_pivot.columns.astype(str) + ':00',  # Add hour format
-            y=temp_pivot.index
-        )
-        fig_heatmap.update_layout(
-            height=400,
-            xaxis_title="Hour of Day",
-            yaxis_title="City"
-        )
-        st.plotly_chart(fig_heatmap, use_container_width=True)
+        plot('Temperature heatmap', data_layer.temperature_heatmap_figure)
     
     with col2:
         # Weather metrics distribution
         st.subheader("Weather Metrics Distribution")
-        fig_dist = px.box(
-            filtered_df,
-            x='city',
-            y=['temperature', 'humidity', 'wind_speed', 'precipitation'],
-            facet_col='variable',
-            facet_col_wrap=2,
-            title='Distribution of Weather Metrics by City'
-        )
-        fig_dist.update_layout(height=400)
-        st.plotly_chart(fig_dist, use_container_width=True)
+        plot('Distributions', data_layer.distribution_figure)
 
 with tab2:
     col1, col2 = st.columns(2)
@@ -153,71 +129,25 @@ with tab2:
     with col1:
         # Correlation matrix
         st.subheader("Correlation Analysis")
-        corr_matrix = filtered_df[['temperature', 'humidity', 'wind_speed', 'precipitation']].corr()
-        fig_corr = px.imshow(
-            corr_matrix,
-            color_continuous_scale='RdBu',
-            title='Correlation Matrix',
-            text=corr_matrix.round(2)
-        )
-        fig_corr.update_layout(height=400)
-        st.plotly_chart(fig_corr, use_container_width=True)
+        plot('Correlation', data_layer.correlation_figure)
     
     with col2:
         # Time series
         st.subheader("Time Series Analysis")
-        fig_time = px.line(
-            filtered_df,
-            x='timestamp',
-            y='temperature',
-            color='city',
-            title='Temperature Over Time'
-        )
-        fig_time.update_layout(height=400)
-        st.plotly_chart(fig_time, use_container_width=True)
+        plot('Time series', data_layer.time_series_figure)
     
     # Scatter matrix
     st.subheader("Relationship Analysis")
-    fig_scatter = px.scatter_matrix(
-        filtered_df,
-        dimensions=['temperature', 'humidity', 'wind_speed', 'precipitation'],
-        color='city',
-        title='Weather Metrics Relationships'
-    )
-    fig_scatter.update_layout(height=800)
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    plot('Scatter matrix', data_layer.scatter_matrix_figure)
 
 with tab3:
     # Interactive map
     st.subheader("Geographic Weather Distribution")
-    latest_data = filtered_df.sort_values('timestamp').groupby('city').last().reset_index()
-    
-    # Create map
-    center_lat = latest_data['latitude'].mean()
-    center_lon = latest_data['longitude'].mean()
-    m = folium.Map(location=[center_lat, center_lon], zoom_start=2)
-    
-    for _, row in latest_data.iterrows():
-        popup_content = f"""
-        <div style='font-family: Arial; width: 200px;'>
-            <h4 style='margin-bottom: 10px;'>{row['city']}</h4>
-            <p><b>Temperature:</b> {row['temperature']:.1f}°C</p>
-            <p><b>Humidity:</b> {row['humidity']:.1f}%</p>
-            <p><b>Wind Speed:</b> {row['wind_speed']:.1f} m/s</p>
-            <p><b>Precipitation:</b> {row['precipitation']:.1f} mm</p>
-        </div>
-        """
-        
-        folium.CircleMarker(
-            location=[row['latitude'], row['longitude']],
-            radius=10,
-            popup=folium.Popup(popup_content, max_width=300),
-            color='red',
-            fill=True,
-            fill_color='red'
-        ).add_to(m)
-    
-    folium_static(m)
+    map_html = data_layer.weather_map_html(key, dataset)
+    if map_html is None:
+        st.info("No readings for the selected cities and dates.")
+    else:
+        components.html(map_html, width=700, height=500)
 
 # Footer
 st.markdown("---")
@@ -229,3 +159,8 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
+
+run_seconds = time.perf_counter() - run_started
+st.caption(f"Rendered in {run_seconds * 1000:.0f} ms")
+with st.expander("Figure budgets"):
+    st.dataframe(pd.DataFrame([budget.as_dict() for budget in budgets]), hide_index=True)
@@ -2,12 +2,20 @@ import pandas as pd
 import sys
 import os
 
-# Add the src directory to the Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add the repository root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
 
-from visualization.weather_visualization import generate_sample_weather_data
+from src.visualization.weather_visualization import generate_sample_weather_data
+from src.data_processing.derived_features import compute_derived_features
 
-def export_data_for_tableau():
+def export_data_for_tableau(output_format='csv'):
+    """
+    Export sample weather data with calculated fields for Tableau
+    
+    Args:
+        output_format: 'csv' for weather_data_for_tableau.csv, or 'parquet' for a
+            dataset partitioned by city and month in weather_data_for_tableau/
+    """
     # Generate sample data
     data = generate_sample_weather_data()
     df = pd.DataFrame(data)
@@ -16,23 +24,37 @@ def export_data_for_tableau():
     df['timestamp'] = pd.to_datetime(df['timestamp'])
     
     # Add some additional calculated fields for Tableau
+    # hour, month, feels_like and weather_severity come from one pass over the measurements
+    features = compute_derived_features(df['temperature'], df['humidity'], df['wind_speed'],
+                                        df['precipitation'], timestamps=df['timestamp'],
+                                        feels_like=True, severity=True)
+    
     df['date'] = df['timestamp'].dt.date
-    df['hour'] = df['timestamp'].dt.hour
-    df['month'] = df['timestamp'].dt.month
+    df['hour'] = features['hour']
+    df['month'] = features['month']
     df['day_of_week'] = df['timestamp'].dt.day_name()
     
     # Calculate some aggregated metrics
-    df['feels_like'] = df['temperature'] - 0.5 * (1 - df['humidity']/100)
-    df['weather_severity'] = (
-        (df['temperature'] - df['temperature'].mean()) / df['temperature'].std() +
-        (df['wind_speed'] - df['wind_speed'].mean()) / df['wind_speed'].std() +
-        (df['precipitation'] - df['precipitation'].mean()) / df['precipitation'].std()
-    ) / 3
-    
-    # Export to CSV
-    output_path = os.path.join(os.path.dirname(__file__), 'weather_data_for_tableau.csv')
-    df.to_csv(output_path, index=False)
+    df['feels_like'] = features['feels_like']
+    df['weather_severity'] = features['weather_severity']
+    
+    if output_format == 'parquet':
+        from src.data_processing.storage import write_parquet_dataset
+        
+        output_path = os.path.join(os.path.dirname(__file__), 'weather_data_for_tableau')
+        # Replace the previous export instead of appending to it
+        write_parquet_dataset(df, output_path, mode='overwrite')
+    else:
+        # Export to CSV
+        output_path = os.path.join(os.path.dirname(__file__), 'weather_data_for_tableau.csv')
+        df.to_csv(output_path, index=False)
     print(f"Data exported to {output_path}")
 
 if __name__ == "__main__":
-    export_data_for_tableau()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Export weather data for Tableau")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    args = parser.parse_args()
+    
+    export_data_for_tableau(args.format)
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+import numpy as np
+from src.serving.batching import BatchQueueFull, MicroBatcher
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_concurrent_submits_share_one_call():
+    calls = []
+
+    async def predict(X):
+        calls.append(X.shape)
+        return X.sum(axis=1)
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=16, max_wait_ms=20)
+        rows = [np.full(5, i, dtype=float) for i in range(10)]
+        results = await asyncio.gather(*(batcher.submit(row) for row in rows))
+        await batcher.stop()
+        return results
+
+    results = run(scenario())
+
+    # Every caller gets the prediction for its own row
+    assert results == [5.0 * i for i in range(10)]
+    assert calls == [(10, 5)]
+
+def test_batches_are_capped_at_max_batch_size():
+    calls = []
+
+    async def predict(X):
+        calls.append(len(X))
+        return np.zeros(len(X))
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=4, max_wait_ms=20)
+        await asyncio.gather(*(batcher.submit(np.zeros(5)) for _ in range(10)))
+        await batcher.stop()
+
+    run(scenario())
+
+    assert max(calls) <= 4
+    assert sum(calls) == 10
+
+def test_predict_errors_reach_every_caller():
+    async def predict(X):
+        raise RuntimeError("model failure")
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=8, max_wait_ms=5)
+        results = await asyncio.gather(*(batcher.submit(np.zeros(5)) for _ in range(3)),
+                                       return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    results = run(scenario())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+def test_submits_beyond_max_queue_are_rejected():
+    async def predict(X):
+        await asyncio.sleep(0.05)
+        return np.zeros(len(X))
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=4, max_wait_ms=1, max_queue=2)
+        results = await asyncio.gather(*(batcher.submit(np.zeros(5)) for _ in range(10)),
+                                       return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    results = run(scenario())
+
+    # One batch slot of 4 rows plus 2 waiting rows
+    assert sum(isinstance(r, BatchQueueFull) for r in results) == 4
+    assert sum(isinstance(r, float) for r in results) == 6
+
+def test_batches_run_concurrently_up_to_max_in_flight():
+    running = []
+    peak = []
+
+    async def predict(X):
+        running.append(X)
+        peak.append(len(running))
+        await asyncio.sleep(0.02)
+        running.pop()
+        return np.zeros(len(X))
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=2, max_wait_ms=1, max_in_flight=3)
+        await asyncio.gather(*(batcher.submit(np.zeros(5)) for _ in range(12)))
+        await batcher.stop()
+
+    run(scenario())
+
+    assert max(peak) == 3
+
+def test_invalid_configuration():
+    async def predict(X):
+        return X
+
+    with pytest.raises(ValueError):
+        MicroBatcher(predict, max_batch_size=0)
+    with pytest.raises(ValueError):
+        MicroBatcher(predict, max_wait_ms=-1)
+    with pytest.raises(ValueError):
+        MicroBatcher(predict, max_in_flight=0)
+    with pytest.raises(ValueError):
+        MicroBatcher(predict, max_queue=-1)
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import sqlite3
+import time
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+from src import main
+from src.serving.cache import PredictionCache, SQLiteCacheBackend
+from src.serving.registry import ModelRegistry
+
+@pytest.fixture
+def features():
+    return np.array([20.04, 60.0, 15.0, 1.0, 1013.0])
+
+def test_quantized_keys(features):
+    cache = PredictionCache(precision=1)
+
+    assert cache.make_key(features, 'v1') == cache.make_key(features + 0.01, 'v1')
+    assert cache.make_key(features, 'v1') != cache.make_key(features + 0.5, 'v1')
+    assert cache.make_key(features, 'v1') != cache.make_key(features, 'v2')
+
+def test_hits_and_misses(features):
+    cache = PredictionCache()
+    key = cache.make_key(features, 'v1')
+
+    assert cache.get(key) is None
+    cache.set(key, 0.42)
+    assert cache.get(key) == 0.42
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+
+def test_lru_eviction():
+    cache = PredictionCache(max_entries=2)
+    cache.set('a', 0.1)
+    cache.set('b', 0.2)
+    cache.get('a')  # 'b' becomes least recently used
+    cache.set('c', 0.3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 0.1
+    assert cache.stats()['evictions'] == 1
+
+def test_ttl_expiry():
+    cache = PredictionCache(ttl=0.01)
+    cache.set('a', 0.1)
+    time.sleep(0.02)
+
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+def test_shared_backend_between_workers(tmp_path, features):
+    path = str(tmp_path / 'cache.sqlite')
+    worker_a = PredictionCache(backend=SQLiteCacheBackend(path))
+    worker_b = PredictionCache(backend=SQLiteCacheBackend(path))
+    key = worker_a.make_key(features, 'v1')
+
+    worker_a.set(key, 0.7)
+
+    assert worker_b.get(key) == 0.7
+    assert worker_b.stats()['shared_hits'] == 1
+
+def test_backend_failures_count_as_misses(tmp_path, features):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = PredictionCache(backend=SQLiteCacheBackend(path))
+    key = cache.make_key(features, 'v1')
+
+    # Another process holding the write lock makes writes fail with "database is locked"
+    writer = sqlite3.connect(path)
+    writer.execute("BEGIN IMMEDIATE")
+    cache.set(key, 0.7)
+    writer.rollback()
+    writer.close()
+
+    assert cache.get(key) == 0.7
+    cache.clear()
+    assert cache.get(key) is None
+
+    cache.backend.close()
+    assert asyncio.run(cache.get_many_async([key])) == [None]
+    assert cache.stats()['shared_errors'] == 2
+    assert cache.stats()['misses'] == 2
+
+def test_shared_hits_keep_their_remaining_ttl(tmp_path, features, monkeypatch):
+    path = str(tmp_path / 'cache.sqlite')
+    writer = PredictionCache(ttl=60, backend=SQLiteCacheBackend(path))
+    reader = PredictionCache(ttl=60, backend=SQLiteCacheBackend(path))
+    key = writer.make_key(features, 'v1')
+    writer.set(key, 0.7)
+
+    wall, monotonic = time.time(), time.monotonic()
+    monkeypatch.setattr(time, 'time', lambda: wall + 50)
+    monkeypatch.setattr(time, 'monotonic', lambda: monotonic + 50)
+    # A duplicated key is one shared lookup but counts for every caller
+    assert reader.get_many([key, key]) == [0.7, 0.7]
+    assert reader.stats()['shared_hits'] == 2
+    assert reader.stats()['hits'] == 2
+
+    monkeypatch.setattr(time, 'time', lambda: wall + 61)
+    monkeypatch.setattr(time, 'monotonic', lambda: monotonic + 61)
+    assert reader.get(key) is None
+    assert reader.stats()['expirations'] == 1
+
+def test_negative_precision_is_rejected(monkeypatch):
+    with pytest.raises(ValueError):
+        PredictionCache(precision=-1)
+
+    monkeypatch.setattr(main, 'PREDICTION_CACHE_PRECISION', -1)
+    with pytest.raises(ValueError):
+        main.create_cache()
+
+def test_service_serves_repeated_readings_from_cache(tmp_path, monkeypatch):
+    version_dir = tmp_path / 'v1'
+    os.makedirs(version_dir)
+    np.savez(version_dir / 'model.npz',
+             activations=np.array(['sigmoid']),
+             kernel_0=np.zeros((5, 1), dtype=np.float32),
+             bias_0=np.zeros(1, dtype=np.float32))
+    registry = ModelRegistry(str(tmp_path))
+    registry.reload()
+    monkeypatch.setattr(main, 'registry', registry)
+    monkeypatch.setattr(main, 'cache', PredictionCache())
+    reading = {
+        'timestamp': '2023-01-01T12:00:00',
+        'temperature': 25.0,
+        'humidity': 60.0,
+        'wind_speed': 15.0,
+        'precipitation': 1.0,
+        'pressure': 1013.0,
+        'location': {}
+    }
+    poll = dict(reading, temperature=25.01)
+
+    with TestClient(main.app) as client:
+        first = client.post('/predict', json=reading).json()
+        second = client.post('/predict', json=poll).json()
+        batch = client.post('/predict/batch', json=[reading, dict(reading, pressure=990.0)]).json()
+        stats = client.get('/cache/stats').json()
+
+    assert first['confidence'] == second['confidence'] == 0.5
+    assert [item['model_version'] for item in batch] == ['v1', 'v1']
+    assert stats['hits'] == 2
+    assert stats['misses'] == 2
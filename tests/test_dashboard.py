@@ -0,0 +1,55 @@
+import os
+import pytest
+
+st = pytest.importorskip('streamlit')
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'src', 'visualizations', 'streamlit', 'streamlit_app.py')
+
+@pytest.fixture
+def app():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    app = AppTest.from_file(APP_PATH, default_timeout=120)
+    app.run()
+    assert not app.exception
+    return app
+
+def test_metrics_follow_city_filter(app):
+    all_cities = app.metric[3].value
+    cities = list(app.multiselect[0].value)
+
+    app.multiselect[0].set_value(cities[:1]).run()
+
+    assert not app.exception
+    assert app.metric[3].value != all_cities
+
+def test_empty_selection_renders(app):
+    app.multiselect[0].set_value([]).run()
+
+    assert not app.exception
+    assert any('No readings' in info.value for info in app.info)
+
+def test_figure_budgets_are_reported(app):
+    budgets = app.dataframe[-1].value
+
+    assert list(budgets['name']) == ['Temperature heatmap', 'Distributions', 'Correlation',
+                                     'Time series', 'Scatter matrix']
+    assert (budgets['bytes'] > 0).all()
+
+def test_scatter_matrix_merges_cities_past_the_palette():
+    import sys
+    sys.path.insert(0, os.path.dirname(APP_PATH))
+    import data_layer
+    from src.data_processing.synthetic import generate_weather_data
+    from src.data_processing.weather_index import IndexedWeatherData
+
+    df = generate_weather_data(n_stations=25, hours=24).astype({'city': str})
+    dataset = data_layer.Dataset(IndexedWeatherData(df), 'test')
+    key = data_layer.filter_key(dataset, dataset.index.stations, dataset.min_timestamp, dataset.max_timestamp)
+
+    fig = data_layer.scatter_matrix_figure(key, dataset)
+
+    assert len(fig.data) == 1 and fig.data[0].type == 'splom'
+    assert len(fig.data[0].dimensions[0].values) == len(df)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_processing.derived_features import compute_derived_features, resolve_backend
+from src.data_processing.synthetic import generate_weather_data
+from src.data_processing.weather_processor import WeatherDataProcessor, weather_score
+
+BACKENDS = ['numpy', 'numexpr', 'numba']
+
+@pytest.fixture
+def data():
+    # More rows than one NumPy block so the block boundaries are covered
+    return generate_weather_data(n_stations=40, hours=500, seed=3)
+
+def available(backend):
+    if backend != 'numpy':
+        pytest.importorskip(backend)
+    return backend
+
+def columns(df):
+    return df['temperature'], df['humidity'], df['wind_speed'], df['precipitation']
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_weather_score_matches_pandas(data, backend):
+    features = compute_derived_features(*columns(data), timestamps=data['timestamp'],
+                                         backend=available(backend))
+
+    expected = weather_score(data['temperature'], data['wind_speed'], data['precipitation'], data['humidity'])
+    assert features['weather_score'].dtype == np.float32
+    np.testing.assert_allclose(features['weather_score'], expected, rtol=1e-5, atol=1e-5)
+    np.testing.assert_array_equal(features['hour'], data['timestamp'].dt.hour)
+    np.testing.assert_array_equal(features['month'], data['timestamp'].dt.month)
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_tableau_fields_match_pandas(data, backend):
+    features = compute_derived_features(*columns(data), feels_like=True, severity=True,
+                                        backend=available(backend))
+
+    feels_like = data['temperature'] - 0.5 * (1 - data['humidity'] / 100)
+    severity = (
+        (data['temperature'] - data['temperature'].mean()) / data['temperature'].std() +
+        (data['wind_speed'] - data['wind_speed'].mean()) / data['wind_speed'].std() +
+        (data['precipitation'] - data['precipitation'].mean()) / data['precipitation'].std()
+    ) / 3
+    np.testing.assert_allclose(features['feels_like'], feels_like, rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(features['weather_severity'], severity, rtol=1e-4, atol=1e-5)
+
+def test_timezone_aware_timestamps_keep_local_time():
+    timestamps = pd.Series(pd.date_range('2024-03-31 00:00', periods=6, freq='h', tz='Europe/Berlin'))
+
+    features = compute_derived_features(*[np.zeros(6)] * 4, timestamps=timestamps)
+
+    np.testing.assert_array_equal(features['hour'], timestamps.dt.hour)
+
+def test_empty_input():
+    features = compute_derived_features(*[np.empty(0)] * 4, feels_like=True, severity=True)
+
+    assert all(len(values) == 0 for values in features.values())
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        resolve_backend('cuda')
+
+def test_processor_uses_kernel(data):
+    processed = WeatherDataProcessor(derived_backend='numpy').preprocess_data(data)
+
+    expected = weather_score(processed['temperature'], processed['wind_speed'],
+                             processed['precipitation'], processed['humidity'])
+    np.testing.assert_allclose(processed['weather_score'], expected, rtol=1e-5, atol=1e-5)
+    assert (processed['hour'] == data['timestamp'].dt.hour).all()
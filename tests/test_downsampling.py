@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_processing.synthetic import generate_weather_data
+from src.visualization.downsampling import (
+    downsample_frame, downsample_indices, minmax_indices, target_points
+)
+from src.visualization.weather_viz import WeatherVisualizer
+
+@pytest.fixture
+def storm():
+    rng = np.random.default_rng(0)
+    y = rng.normal(15, 2, 50_000)
+    y[31_337] = 60.0
+    y[12_345] = -40.0
+    return pd.date_range('2023-01-01', periods=len(y), freq='min').to_numpy(), y
+
+@pytest.mark.parametrize('method', ['minmax', 'lttb'])
+def test_downsampling_keeps_extremes_and_endpoints(storm, method):
+    x, y = storm
+
+    keep = downsample_indices(x, y, 1000, method)
+
+    assert len(keep) <= 1000 + 2
+    assert np.all(np.diff(keep) > 0)
+    assert {0, len(y) - 1, 31_337, 12_345} <= set(keep.tolist())
+
+def test_minmax_keeps_every_bucket_extreme(storm):
+    _, y = storm
+    keep = minmax_indices(y, 200)
+
+    buckets = np.array_split(y, 100)
+    kept = y[keep]
+    for bucket in buckets:
+        assert bucket.max() in kept and bucket.min() in kept
+
+def test_short_traces_and_missing_values():
+    y = np.array([1.0, np.nan, 3.0])
+    assert downsample_indices(np.arange(3), y, 10).tolist() == [0, 1, 2]
+
+    with pytest.raises(ValueError):
+        downsample_indices(np.arange(1000), np.arange(1000.0), 50, method='average')
+
+@pytest.mark.parametrize('method', ['minmax', 'lttb'])
+def test_nan_gap_survives_downsampling(method):
+    y = np.sin(np.arange(10_000) / 300)
+    y[4_000:6_000] = np.nan
+
+    keep = downsample_indices(np.arange(10_000), y, 100, method)
+
+    missing = keep[np.isnan(y[keep])]
+    assert missing.tolist() == [4_000]
+    assert len(keep) <= 2 * 100 + 2
+    # Real values on both sides, so the line stops at the gap and resumes after it
+    assert keep[keep < 4_000].size and keep[keep >= 6_000].size
+
+def test_downsample_frame_bounds_each_trace():
+    df = generate_weather_data(n_stations=3, hours=24 * 90, seed=1)
+
+    result = downsample_frame(df, 'timestamp', ['temperature', 'wind_speed'], by='city', width=100)
+
+    per_trace = target_points(100) + 2
+    assert result.groupby('city', observed=True).size().max() <= 2 * per_trace
+    assert result.index.is_monotonic_increasing
+    for _, city in df.groupby('city', observed=True):
+        assert city['temperature'].idxmax() in result.index
+        assert city['wind_speed'].idxmin() in result.index
+
+def test_time_series_plot_is_downsampled():
+    df = generate_weather_data(n_stations=1, hours=24 * 365, seed=3)
+
+    fig = WeatherVisualizer(viewport_width=300).create_time_series_plot(df, ['temperature', 'humidity'])
+
+    for trace, column in zip(fig.data, ['temperature', 'humidity']):
+        assert len(trace.y) <= target_points(300) + 2
+        assert max(trace.y) == df[column].max()
@@ -0,0 +1,36 @@
+import asyncio
+import threading
+import pytest
+from src.serving.executor import InferenceExecutor, InferenceQueueFull
+
+def test_run_off_event_loop():
+    executor = InferenceExecutor(max_workers=2, max_queue=4)
+
+    async def scenario():
+        return await executor.run(lambda: threading.current_thread().name)
+
+    thread_name = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert thread_name.startswith('inference')
+    assert executor.pending == 0
+
+def test_rejects_when_queue_is_full():
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        assert executor.is_full()
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(release.wait)
+
+        release.set()
+        await asyncio.gather(*running)
+
+    asyncio.run(scenario())
+    executor.shutdown()
+
+    assert executor.pending == 0
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+from src.data_processing.feature_pipeline import FeaturePipeline
+
+COLUMNS = ['temperature', 'humidity', 'wind_speed', 'precipitation', 'pressure', 'hour']
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(42)
+    return np.column_stack([
+        rng.normal(20, 5, 500),
+        rng.normal(60, 10, 500),
+        rng.normal(15, 5, 500),
+        rng.exponential(1, 500),
+        rng.normal(1013, 5, 500),
+        rng.integers(0, 24, 500)
+    ])
+
+def test_matches_standard_scaler(features):
+    scaler = StandardScaler().fit(features)
+    pipeline = FeaturePipeline.from_scaler(scaler, COLUMNS)
+
+    X = pipeline.transform(features)
+
+    assert X.dtype == np.float32
+    np.testing.assert_allclose(X, scaler.transform(features), atol=1e-4)
+
+def test_constant_column_is_not_divided_by_zero(features):
+    features[:, 3] = 0.0
+    pipeline = FeaturePipeline.from_scaler(StandardScaler().fit(features), COLUMNS)
+
+    assert np.isfinite(pipeline.transform(features)).all()
+
+def test_save_and_load_round_trip(features, tmp_path):
+    pipeline = FeaturePipeline.from_scaler(StandardScaler().fit(features), COLUMNS)
+    path = tmp_path / 'features.npz'
+    pipeline.save(path)
+
+    loaded = FeaturePipeline.load(path)
+
+    assert loaded.columns == COLUMNS
+    np.testing.assert_array_equal(loaded.transform(features), pipeline.transform(features))
+
+def test_transform_frame_uses_saved_column_order(features):
+    pipeline = FeaturePipeline.from_scaler(StandardScaler().fit(features), COLUMNS)
+    df = pd.DataFrame(features, columns=COLUMNS)[COLUMNS[::-1]]
+
+    np.testing.assert_array_equal(pipeline.transform_frame(df), pipeline.transform(features))
+
+def test_rejects_wrong_feature_count(features):
+    pipeline = FeaturePipeline.from_scaler(StandardScaler().fit(features), COLUMNS)
+
+    with pytest.raises(ValueError):
+        pipeline.transform(features[:, :5])
+    with pytest.raises(ValueError):
+        FeaturePipeline.from_scaler(StandardScaler(), COLUMNS)
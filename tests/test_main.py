@@ -0,0 +1,100 @@
+import asyncio
+import subprocess
+import sys
+import time
+import httpx
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from src import main
+from src.serving.batching import MicroBatcher
+from src.serving.executor import InferenceExecutor
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+@pytest.fixture
+def reading():
+    return {
+        'timestamp': '2023-01-01T12:00:00',
+        'temperature': 25.0,
+        'humidity': 60.0,
+        'wind_speed': 15.0,
+        'precipitation': 1.0,
+        'pressure': 1013.0,
+        'location': {'lat': 40.7, 'lon': -74.0}
+    }
+
+def test_predict(client, reading):
+    response = client.post('/predict', json=reading)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['risk_level'] in ('Low', 'Medium', 'High')
+    assert 0 <= body['confidence'] <= 1
+
+def test_predict_batch(client, reading):
+    response = client.post('/predict/batch', json=[reading] * 5)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == 5
+    assert all(item['risk_level'] in ('Low', 'Medium', 'High') for item in body)
+
+def test_predict_batch_empty(client):
+    response = client.post('/predict/batch', json=[])
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+def test_predict_rejected_when_overloaded(reading, monkeypatch):
+    def slow_inference(features):
+        time.sleep(0.05)
+        return np.full(len(features), 0.5), None
+
+    # No queue beyond the running batch: one worker, one batch in flight
+    executor = InferenceExecutor(max_workers=1, max_queue=0)
+    monkeypatch.setattr(main, 'executor', executor)
+    monkeypatch.setattr(main, 'batcher', MicroBatcher(main.predict_batch_async, max_batch_size=4,
+                                                      max_wait_ms=1, max_in_flight=1, max_queue=0))
+    monkeypatch.setattr(main, 'run_inference', slow_inference)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            responses = await asyncio.gather(*(client.post('/predict', json={**reading, 'temperature': float(i)})
+                                               for i in range(40)))
+        await main.batcher.stop()
+        return responses
+
+    responses = asyncio.run(scenario())
+    executor.shutdown()
+
+    codes = [response.status_code for response in responses]
+    assert codes.count(200) >= 4
+    assert codes.count(503) > 0
+    assert set(codes) == {200, 503}
+
+def test_ready_after_warmup(client):
+    deadline = time.time() + 10
+    response = client.get('/ready')
+    while response.status_code == 503 and time.time() < deadline:
+        time.sleep(0.05)
+        response = client.get('/ready')
+
+    assert response.status_code == 200
+    assert response.json()['status'] == 'ready'
+
+def test_import_does_not_load_tensorflow():
+    code = "import sys, src.main; print('tensorflow' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == 'False'
+
+def test_import_does_not_load_pandas():
+    code = "import sys, src.main; print('pandas' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == 'False'
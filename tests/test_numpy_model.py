@@ -0,0 +1,102 @@
+import warnings
+import pytest
+import numpy as np
+from models.numpy_model import NumpyRiskModel, sigmoid
+
+@pytest.fixture
+def features():
+    np.random.seed(42)
+    n_samples = 256
+    return np.column_stack([
+        np.random.normal(20, 5, n_samples),
+        np.random.normal(60, 10, n_samples),
+        np.random.normal(15, 5, n_samples),
+        np.random.exponential(1, n_samples),
+        np.random.normal(1013, 5, n_samples)
+    ]).astype(np.float32) / 100
+
+@pytest.fixture
+def weights():
+    rng = np.random.default_rng(0)
+    return {
+        'activations': np.array(['relu', 'tanh', 'sigmoid']),
+        'kernel_0': rng.normal(size=(5, 8)).astype(np.float32),
+        'bias_0': rng.normal(size=8).astype(np.float32),
+        'kernel_1': rng.normal(size=(8, 4)).astype(np.float32),
+        'bias_1': rng.normal(size=4).astype(np.float32),
+        'kernel_2': rng.normal(size=(4, 1)).astype(np.float32),
+        'bias_2': rng.normal(size=1).astype(np.float32),
+    }
+
+def reference_predict(weights, X):
+    """Forward pass written out layer by layer in float64"""
+    hidden = np.maximum(X @ weights['kernel_0'] + weights['bias_0'], 0)
+    hidden = np.tanh(hidden @ weights['kernel_1'] + weights['bias_1'])
+    return 1 / (1 + np.exp(-(hidden @ weights['kernel_2'] + weights['bias_2'])))
+
+def test_load_parses_layers(weights, tmp_path):
+    path = tmp_path / 'model.npz'
+    np.savez(path, **weights)
+
+    numpy_model = NumpyRiskModel.load(path)
+
+    assert [activation for _, _, activation in numpy_model.layers] == ['relu', 'tanh', 'sigmoid']
+    assert [kernel.shape for kernel, _, _ in numpy_model.layers] == [(5, 8), (8, 4), (4, 1)]
+    assert numpy_model.input_dim == 5
+
+def test_predict_matches_reference(weights, features, tmp_path):
+    path = tmp_path / 'model.npz'
+    np.savez(path, **weights)
+    numpy_model = NumpyRiskModel.load(path)
+
+    expected = reference_predict(weights, features.astype(np.float64))
+
+    np.testing.assert_allclose(numpy_model.predict(features), expected, rtol=1e-5, atol=1e-6)
+    single = numpy_model.predict(features[0])
+    assert single.shape == (1, 1)
+    np.testing.assert_allclose(single, expected[:1], rtol=1e-5, atol=1e-6)
+
+def test_unsupported_activation():
+    with pytest.raises(ValueError):
+        NumpyRiskModel([(np.zeros((5, 1)), np.zeros(1), 'softplus')])
+
+def test_sigmoid_is_stable_for_large_logits():
+    x = np.array([-1000.0, -50.0, 0.0, 50.0, 1000.0], dtype=np.float32)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        result = sigmoid(x)
+
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, [0.0, 1.9287e-22, 0.5, 1.0, 1.0], rtol=1e-4)
+
+@pytest.fixture
+def keras_model():
+    tf = pytest.importorskip('tensorflow')
+    from models.model import create_weather_risk_model
+    tf.random.set_seed(42)
+    return create_weather_risk_model()
+
+@pytest.fixture
+def exported(keras_model, tmp_path):
+    from models.model import export_weights
+    path = tmp_path / 'model.npz'
+    export_weights(keras_model, path)
+    return NumpyRiskModel.load(path)
+
+def test_parity_with_keras(keras_model, exported, features):
+    expected = keras_model.predict(features, verbose=0)
+    actual = exported.predict(features)
+
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-6)
+
+def test_dropout_is_not_exported(exported):
+    assert [activation for _, _, activation in exported.layers] == ['relu', 'relu', 'relu', 'sigmoid']
+    assert exported.input_dim == 5
+
+def test_single_row_prediction(exported, features):
+    prediction = exported.predict(features[0])
+
+    assert prediction.shape == (1, 1)
+    assert 0 <= prediction[0][0] <= 1
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_processing.synthetic import generate_weather_data
+from src.data_processing.weather_processor import WeatherDataProcessor
+
+MEASUREMENTS = ['temperature', 'humidity', 'wind_speed', 'precipitation', 'pressure']
+
+@pytest.fixture
+def readings():
+    """Interleaved stations with gaps, including leading gaps and an outlier"""
+    df = generate_weather_data(n_stations=12, hours=60, seed=5).astype({'city': str})
+    df = df.sort_values(['timestamp', 'city'], kind='stable').reset_index(drop=True)
+    rng = np.random.default_rng(0)
+    for column in MEASUREMENTS:
+        df.loc[rng.choice(len(df), size=40, replace=False), column] = np.nan
+    df.loc[:11, 'humidity'] = np.nan
+    df.loc[30, 'wind_speed'] = 500.0
+    return df
+
+@pytest.fixture
+def processor():
+    return WeatherDataProcessor()
+
+def per_station(processor, df):
+    return pd.concat([processor.preprocess_data(group) for _, group in df.groupby('city')]).sort_index()
+
+@pytest.mark.parametrize('max_workers', [1, 3])
+def test_matches_per_station_preprocessing(processor, readings, max_workers):
+    result = processor.preprocess_parallel(readings, max_workers=max_workers)
+
+    pd.testing.assert_frame_equal(result, per_station(processor, readings)[result.columns])
+    assert result['wind_speed'].max() == 200
+
+def test_gaps_are_not_filled_across_stations(processor):
+    df = pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=4, freq='h').repeat(2),
+        'city': ['A', 'B'] * 4,
+        'temperature': [10.0, 30.0, np.nan, np.nan, 12.0, np.nan, np.nan, 34.0],
+        'humidity': 50.0, 'wind_speed': 5.0, 'precipitation': 0.0, 'pressure': 1010.0
+    })
+
+    result = processor.preprocess_parallel(df, max_workers=2)
+
+    assert result['temperature'].tolist() == [10.0, 30.0, 10.0, 30.0, 12.0, 30.0, 12.0, 34.0]
+
+def test_leaves_input_untouched_and_keeps_order(processor, readings):
+    original = readings.copy()
+    shuffled = readings.sample(frac=1, random_state=1)
+
+    result = processor.preprocess_parallel(shuffled, max_workers=2)
+
+    pd.testing.assert_frame_equal(readings, original)
+    assert result.index.equals(shuffled.index)
+
+def test_empty_frame(processor, readings):
+    result = processor.preprocess_parallel(readings.iloc[:0])
+
+    assert result.empty
+    assert 'weather_score' in result.columns
@@ -0,0 +1,185 @@
+import os
+import time
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+from src import main
+from src.data_processing.feature_pipeline import FeaturePipeline
+from src.serving.cache import PredictionCache
+from src.serving.registry import ModelRegistry, ModelLoadError
+
+def write_version(model_dir, version, bias):
+    """Write a one-layer sigmoid model whose output is fixed by its bias"""
+    version_dir = os.path.join(model_dir, version)
+    os.makedirs(version_dir)
+    np.savez(os.path.join(version_dir, 'model.npz'),
+             activations=np.array(['sigmoid']),
+             kernel_0=np.zeros((5, 1), dtype=np.float32),
+             bias_0=np.array([bias], dtype=np.float32))
+
+@pytest.fixture
+def model_dir(tmp_path):
+    write_version(str(tmp_path), 'v1', -5.0)
+    write_version(str(tmp_path), 'v2', 0.0)
+    write_version(str(tmp_path), 'v10', 5.0)
+    return str(tmp_path)
+
+def test_versions_are_sorted_naturally(model_dir):
+    registry = ModelRegistry(model_dir)
+
+    assert registry.versions() == ['v1', 'v2', 'v10']
+
+def test_reload_activates_newest_version(model_dir):
+    registry = ModelRegistry(model_dir)
+
+    loaded = registry.reload()
+
+    assert loaded.version == 'v10'
+    assert registry.active is loaded
+
+def test_reload_specific_version(model_dir):
+    registry = ModelRegistry(model_dir)
+    registry.reload()
+
+    registry.reload('v1')
+
+    assert registry.active.version == 'v1'
+    assert registry.active.model.predict(np.zeros((1, 5)))[0][0] < 0.01
+
+def test_failed_reload_keeps_active_version(model_dir):
+    registry = ModelRegistry(model_dir)
+    registry.reload('v2')
+    broken_dir = os.path.join(model_dir, 'v11')
+    os.makedirs(broken_dir)
+    with open(os.path.join(broken_dir, 'model.npz'), 'w') as f:
+        f.write('not a model')
+
+    with pytest.raises(ModelLoadError):
+        registry.reload()
+    with pytest.raises(ModelLoadError):
+        registry.reload('missing')
+
+    assert registry.active.version == 'v2'
+
+def test_reload_rejects_paths_outside_model_dir(tmp_path):
+    model_dir = str(tmp_path / 'models')
+    write_version(model_dir, 'v1', 0.0)
+    write_version(str(tmp_path), 'outside', 0.0)
+    registry = ModelRegistry(model_dir)
+
+    for version in ['../outside', str(tmp_path / 'outside'), '.', '..', '']:
+        with pytest.raises(ModelLoadError):
+            registry.reload(version)
+
+    assert registry.active is None
+
+def test_empty_registry(tmp_path):
+    registry = ModelRegistry(str(tmp_path / 'missing'))
+
+    assert registry.versions() == []
+    with pytest.raises(ModelLoadError):
+        registry.reload()
+
+def test_service_reports_model_version(model_dir, monkeypatch):
+    monkeypatch.setattr(main, 'registry', ModelRegistry(model_dir))
+    reading = {
+        'timestamp': '2023-01-01T12:00:00',
+        'temperature': 25.0,
+        'humidity': 60.0,
+        'wind_speed': 15.0,
+        'precipitation': 1.0,
+        'pressure': 1013.0,
+        'location': {}
+    }
+
+    with TestClient(main.app) as client:
+        # Let the startup warmup finish so it cannot swap versions mid-test
+        deadline = time.time() + 10
+        while client.get('/ready').status_code == 503 and time.time() < deadline:
+            time.sleep(0.05)
+
+        response = client.post('/models/reload', params={'version': 'v2'})
+        assert response.status_code == 200
+        assert client.post('/predict', json=reading).json()['model_version'] == 'v2'
+
+        response = client.post('/models/reload')
+        assert response.json()['active']['version'] == 'v10'
+        body = client.post('/predict/batch', json=[reading] * 3).json()
+        assert [item['model_version'] for item in body] == ['v10'] * 3
+        assert all(item['risk_level'] == 'High' for item in body)
+
+        assert client.post('/models/reload', params={'version': 'missing'}).status_code == 404
+        assert client.post('/models/reload', params={'version': '../v1'}).status_code == 404
+        assert client.get('/models').json()['active']['version'] == 'v10'
+
+def test_responses_report_the_version_that_scored_them(model_dir, monkeypatch):
+    registry = ModelRegistry(model_dir)
+    registry.reload('v1')
+    cache = PredictionCache()
+    monkeypatch.setattr(main, 'registry', registry)
+    monkeypatch.setattr(main, 'cache', cache)
+    monkeypatch.setattr(main, 'model_ready', True)
+    reading = {
+        'timestamp': '2023-01-01T12:00:00',
+        'temperature': 25.0,
+        'humidity': 60.0,
+        'wind_speed': 15.0,
+        'precipitation': 1.0,
+        'pressure': 1013.0,
+        'location': {}
+    }
+    get_many_async = cache.get_many_async
+
+    async def reload_during_lookup(keys):
+        values = await get_many_async(keys)
+        registry.reload('v10')
+        return values
+
+    with TestClient(main.app) as client:
+        client.post('/predict', json=reading)
+        monkeypatch.setattr(cache, 'get_many_async', reload_during_lookup)
+        single = client.post('/predict', json=reading).json()
+        registry.reload('v1')
+        batch = client.post('/predict/batch', json=[reading, dict(reading, pressure=990.0)]).json()
+
+    # The cached v1 score stays labelled v1, and the uncached row is scored by v1 too
+    assert (single['model_version'], single['risk_level']) == ('v1', 'Low')
+    assert [(item['model_version'], item['risk_level']) for item in batch] == [('v1', 'Low')] * 2
+
+def test_service_applies_feature_pipeline(tmp_path, monkeypatch):
+    # The model is only confident when scaled temperature and hour are both positive
+    version_dir = tmp_path / 'v1'
+    os.makedirs(version_dir)
+    np.savez(version_dir / 'model.npz',
+             activations=np.array(['sigmoid']),
+             kernel_0=np.array([[5.0], [5.0]], dtype=np.float32),
+             bias_0=np.array([-5.0], dtype=np.float32))
+    FeaturePipeline(['temperature', 'hour'], mean=[20.0, 6.0], scale=[5.0, 3.0]).save(version_dir / 'features.npz')
+    registry = ModelRegistry(str(tmp_path))
+    monkeypatch.setattr(main, 'registry', registry)
+    reading = {
+        'timestamp': '2023-01-01T09:00:00',
+        'temperature': 25.0,
+        'humidity': 60.0,
+        'wind_speed': 15.0,
+        'precipitation': 1.0,
+        'pressure': 1013.0,
+        'location': {}
+    }
+
+    with TestClient(main.app) as client:
+        response = client.post('/models/reload')
+        assert response.json()['active']['feature_columns'] == ['temperature', 'hour']
+        body = client.post('/predict/batch', json=[reading, dict(reading, timestamp='2023-01-01T03:00:00')]).json()
+
+    # (25 - 20) / 5 = 1 and (9 - 6) / 3 = 1 give sigmoid(5); hour 3 scales to -1, giving sigmoid(-5)
+    assert body[0]['confidence'] == pytest.approx(1 / (1 + np.exp(-5)), rel=1e-5)
+    assert body[1]['confidence'] == pytest.approx(1 / (1 + np.exp(5)), rel=1e-5)
+
+def test_unsupported_pipeline_column_fails_to_load(tmp_path):
+    write_version(str(tmp_path), 'v1', 0.0)
+    FeaturePipeline(['temperature', 'dew_point', 'humidity', 'wind_speed', 'pressure'],
+                    mean=np.zeros(5), scale=np.ones(5)).save(tmp_path / 'v1' / 'features.npz')
+
+    with pytest.raises(ModelLoadError):
+        ModelRegistry(str(tmp_path)).reload()
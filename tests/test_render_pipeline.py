@@ -0,0 +1,100 @@
+import json
+import os
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+from src.visualization.render_pipeline import (
+    MANIFEST_NAME, PREVIEW, FigureSpec, Output, input_hash, parse_output, render_figures, with_outputs
+)
+from src.visualization.weather_visualization import FIGURES, generate_sample_weather_data
+
+def temperature_bars(data, return_fig=False):
+    fig, ax = plt.subplots(figsize=(3, 2))
+    ax.bar(data['city'], data['temperature'])
+    return fig
+
+def wind_line(data, return_fig=False):
+    fig, ax = plt.subplots(figsize=(3, 2))
+    ax.plot(data['wind_speed'])
+    return fig
+
+rendering_setup = []
+
+def record_setup(data, return_fig=False):
+    rendering_setup.append((matplotlib.get_backend().lower(), plt.rcParams['axes.grid'],
+                            plt.rcParams['axes.facecolor']))
+    return plt.figure(figsize=(1, 1))
+
+SPECS = [
+    FigureSpec('temperature', f'{__name__}.temperature_bars', ('city', 'temperature')),
+    FigureSpec('wind', f'{__name__}.wind_line', ('wind_speed',), (Output('webp', 50), PREVIEW)),
+]
+
+@pytest.fixture
+def data():
+    return pd.DataFrame({'city': ['Oslo', 'Rome', 'Lima'], 'temperature': [2.0, 18.0, 21.0],
+                         'wind_speed': [5.0, 1.0, 3.0]})
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_renders_every_output(tmp_path, data, workers):
+    results = render_figures(data, SPECS, str(tmp_path), max_workers=workers)
+
+    assert [result.name for result in results] == ['temperature', 'wind']
+    assert not any(result.skipped for result in results)
+    assert sorted(os.listdir(tmp_path)) == sorted([MANIFEST_NAME, 'temperature.png', 'wind.webp', 'wind_preview.png'])
+    with open(tmp_path / 'wind.webp', 'rb') as f:
+        assert f.read(12)[8:] == b'WEBP'
+
+def test_skips_figures_with_unchanged_inputs(tmp_path, data):
+    render_figures(data, SPECS, str(tmp_path), max_workers=1)
+
+    data.loc[0, 'wind_speed'] = 9.0
+    results = render_figures(data, SPECS, str(tmp_path), max_workers=1)
+    assert [result.skipped for result in results] == [True, False]
+
+    os.remove(tmp_path / 'temperature.png')
+    results = render_figures(data, SPECS, str(tmp_path), max_workers=1)
+    assert [result.skipped for result in results] == [False, True]
+
+    results = render_figures(data, SPECS, str(tmp_path), max_workers=1, force=True)
+    assert not any(result.skipped for result in results)
+    with open(tmp_path / MANIFEST_NAME) as f:
+        assert set(json.load(f)['wind']) == {'hash', 'seconds'}
+
+def test_inline_rendering_uses_the_worker_setup(tmp_path, data):
+    rendering_setup.clear()
+    spec = FigureSpec('setup', f'{__name__}.record_setup', ('city',))
+
+    render_figures(data, [spec], str(tmp_path), max_workers=1, style='darkgrid')
+
+    assert rendering_setup == [('agg', True, '#EAEAF2')]
+    assert not plt.rcParams['axes.grid']
+
+def test_sample_data_is_reproducible():
+    first, second = generate_sample_weather_data(), generate_sample_weather_data()
+
+    # Figures reading timestamps are only skipped if reruns hash the same
+    assert all(input_hash(first, spec) == input_hash(second, spec) for spec in FIGURES)
+
+    from src.visualization import weather_map
+    pd.testing.assert_frame_equal(weather_map.generate_sample_weather_data(),
+                                  weather_map.generate_sample_weather_data())
+
+def test_output_choices():
+    assert parse_output('webp') == (None, Output('webp'))
+    assert parse_output('pair_plot=png@72') == ('pair_plot', Output('png', 72, '_72dpi'))
+    assert parse_output('preview') == (None, PREVIEW)
+
+    figures = with_outputs(SPECS, [parse_output('webp'), parse_output('wind=preview')])
+    assert figures[0].outputs == (Output('webp'),)
+    assert figures[1].outputs == (Output('webp'), PREVIEW)
+    assert with_outputs(SPECS, []) == SPECS
+
+    with pytest.raises(ValueError):
+        with_outputs(SPECS, [parse_output('radar=png')])
+
+def test_weather_figures_are_declared():
+    assert [spec.name for spec in FIGURES] == ['temperature_heatmap', 'weather_distributions',
+                                               'correlation_matrix', 'time_series', 'pair_plot']
@@ -0,0 +1,63 @@
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+from plotly.subplots import make_subplots
+from src.data_processing.synthetic import generate_weather_data
+from src.data_processing.weather_processor import WeatherDataProcessor
+from src.visualization import weather_map
+from src.visualization.rendering import (
+    WEBGL_THRESHOLD, apply_render_mode, budget_report, grouped_series
+)
+
+def line_figure(n_points):
+    fig = make_subplots(rows=2, cols=1)
+    fig.add_trace(go.Scatter(y=np.arange(n_points), name='a', line=dict(color='red')), row=1, col=1)
+    fig.add_trace(go.Scatter(y=np.arange(n_points), name='b', stackgroup='one'), row=2, col=1)
+    return fig
+
+def test_auto_mode_switches_above_threshold():
+    small = apply_render_mode(line_figure(100))
+    assert [trace.type for trace in small.data] == ['scatter', 'scatter']
+
+    large = apply_render_mode(line_figure(WEBGL_THRESHOLD))
+    # Stacked traces are not supported by WebGL and stay SVG
+    assert [trace.type for trace in large.data] == ['scattergl', 'scatter']
+    assert large.data[0].name == 'a' and large.data[0].line.color == 'red'
+    assert large.data[0].yaxis == 'y' and large.data[1].yaxis == 'y2'
+
+def test_forced_modes():
+    assert apply_render_mode(line_figure(10), 'webgl').data[0].type == 'scattergl'
+    assert apply_render_mode(line_figure(WEBGL_THRESHOLD), 'svg').data[0].type == 'scatter'
+    with pytest.raises(ValueError):
+        apply_render_mode(line_figure(10), 'canvas')
+
+def test_grouped_series_breaks_between_parts():
+    x, y = grouped_series([(np.arange(3), np.ones(3)), (np.arange(2), np.zeros(2))])
+
+    assert x.tolist() == [0, 1, 2, 2, 0, 1, 1]
+    assert np.isnan(y[3]) and np.isnan(y[6])
+    assert y.dtype == np.float32
+
+def test_budget_report():
+    fig = apply_render_mode(line_figure(WEBGL_THRESHOLD))
+
+    report = budget_report(fig, 'lines', build_seconds=0.25)
+
+    assert report.traces == 2 and report.points == 2 * WEBGL_THRESHOLD
+    assert report.webgl
+    assert report.bytes == len(fig.to_json().encode('utf-8'))
+    assert report.latency_ms >= 250
+    assert 'lines: 2 traces' in str(report)
+
+def test_time_series_page_groups_cities_sharing_a_color(tmp_path, monkeypatch):
+    df = WeatherDataProcessor().preprocess_data(generate_weather_data(n_stations=30, hours=48))
+    (tmp_path / 'src' / 'static').mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+
+    report = weather_map.create_time_series_plots(df)
+
+    # Twelve palette colors, three metrics each, instead of one trace per city and metric
+    assert report.traces == 12 * 3
+    # Every city's readings plus one break point, for each metric
+    assert report.points == 3 * (len(df) + 30)
+    assert (tmp_path / 'src' / 'static' / 'weather_trends.html').exists()
@@ -0,0 +1,146 @@
+import pytest
+import pandas as pd
+from src.visualization.response_cache import ResponseCache, OfflineCacheMiss, FRESH, STALE, EXPIRED
+from src.visualization.weather_client import WeatherAPI, PooledWeatherAPI, QuotaExceeded, RateLimiter
+from src.visualization.weather_map import fetch_weather_data
+from tests.weather_api_stub import StubWeatherServer
+
+@pytest.fixture
+def locations():
+    return pd.DataFrame({
+        'city': ['New York', 'London', 'Tokyo'],
+        'lat': [40.7128, 51.5074, 35.6762],
+        'lon': [-74.0060, -0.1278, 139.6503]
+    })
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / 'responses.sqlite'), stale_while_revalidate=600, clock=clock)
+    yield cache
+    cache.close()
+
+def test_make_key_rounds_coordinates(cache):
+    key = cache.make_key('forecast.json', {'key': 'secret', 'q': '51.50741,-0.12781', 'days': 5})
+    assert key == cache.make_key('forecast.json', {'key': 'other', 'q': '51.5074,-0.1278', 'days': 5})
+    assert key != cache.make_key('current.json', {'key': 'secret', 'q': '51.5074,-0.1278', 'days': 5})
+    assert 'secret' not in key
+
+def test_repeated_fetch_uses_cache(locations, cache):
+    with StubWeatherServer() as server:
+        api = PooledWeatherAPI('key', max_workers=3, base_url=server.base_url, cache=cache)
+        first = fetch_weather_data(locations, api)
+        second = fetch_weather_data(locations, api)
+        api.close()
+
+    assert len(server.requests) == len(locations)
+    pd.testing.assert_frame_equal(first, second)
+
+    stats = cache.stats()
+    assert stats['hits'] == len(locations)
+    assert stats['hit_rate'] == pytest.approx(0.5)
+    assert stats['bytes_saved'] > 0
+
+def test_stale_response_is_served_and_revalidated(cache, clock):
+    with StubWeatherServer() as server:
+        api = WeatherAPI('key', base_url=server.base_url, cache=cache)
+        fresh = api.get_forecast(51.5, -0.1)
+
+        clock.now += cache.ttl('forecast.json') + 1
+        params = {'key': 'key', 'q': '51.5,-0.1', 'days': 5, 'aqi': 'no'}
+        assert cache.get('forecast.json', params)[0] == STALE
+
+        stale = api.get_forecast(51.5, -0.1)
+        api.close()
+
+    assert stale == fresh
+    assert len(server.requests) == 2
+    assert server.not_modified == 1
+    assert cache.stats()['revalidations'] == 1
+    assert cache.get('forecast.json', params)[0] == FRESH
+
+def test_expired_response_is_revalidated_before_use(cache, clock):
+    with StubWeatherServer() as server:
+        api = WeatherAPI('key', base_url=server.base_url, cache=cache)
+        api.get_current_weather(40.7, -74.0)
+
+        clock.now += cache.ttl('current.json') + cache.stale_while_revalidate + 1
+        params = {'key': 'key', 'q': '40.7,-74.0', 'aqi': 'no'}
+        assert cache.get('current.json', params)[0] == EXPIRED
+
+        current = api.get_current_weather(40.7, -74.0)
+
+    assert current['current']['humidity'] == 60
+    assert server.not_modified == 1
+
+def test_offline_mode_serves_cached_fixtures(locations, tmp_path):
+    path = str(tmp_path / 'fixtures.sqlite')
+    with StubWeatherServer() as server:
+        online = ResponseCache(path)
+        expected = fetch_weather_data(locations, WeatherAPI('key', base_url=server.base_url, cache=online))
+        online.close()
+
+    offline = ResponseCache(path, offline=True)
+    api = WeatherAPI('key', base_url='http://127.0.0.1:9/v1', cache=offline)
+    pd.testing.assert_frame_equal(fetch_weather_data(locations, api), expected)
+
+    with pytest.raises(OfflineCacheMiss):
+        api.get_forecast(0.0, 0.0)
+    offline.close()
+
+def test_daily_quota_is_shared_through_the_cache_file(tmp_path):
+    path = str(tmp_path / 'responses.sqlite')
+    first_run = RateLimiter(requests_per_second=1000, daily_quota=3, store=ResponseCache(path))
+    first_run.acquire()
+    first_run.acquire()
+
+    second_run = RateLimiter(requests_per_second=1000, daily_quota=3, store=ResponseCache(path))
+    assert second_run.remaining_today() == 1
+    second_run.acquire()
+    with pytest.raises(QuotaExceeded):
+        first_run.acquire()
+    assert first_run.remaining_today() == 0
+
+def test_rate_limit_is_shared_through_the_cache_file(tmp_path, clock):
+    path = str(tmp_path / 'responses.sqlite')
+    waits = []
+    workers = [RateLimiter(requests_per_second=2, burst=2, clock=clock, sleep=waits.append,
+                           store=ResponseCache(path)) for _ in range(2)]
+
+    for worker in workers * 2:
+        worker.acquire()
+
+    # The second worker does not get a burst of its own
+    assert waits == [0.5, 1.0]
+    clock.now += 10
+    workers[1].acquire()
+    assert waits == [0.5, 1.0]
+
+def test_quota_only_counts_locations_that_need_a_fetch(locations, cache, clock):
+    with StubWeatherServer() as server:
+        limiter = RateLimiter(requests_per_second=1000, daily_quota=4, store=cache)
+        api = WeatherAPI('key', base_url=server.base_url, cache=cache, rate_limiter=limiter)
+        expire = cache.ttl('forecast.json') + cache.stale_while_revalidate + 1
+        fetch_weather_data(locations.iloc[[1]], api)
+        clock.now += expire
+        fetch_weather_data(locations.iloc[[0]], api)
+        clock.now += expire
+        fetch_weather_data(locations.iloc[[2]], api)
+
+        # London expired first, New York later, and Tokyo is fresh so it costs nothing
+        assert [api.cache_status(lat, lon)[1] for lat, lon in zip(locations['lat'], locations['lon'])] == [1, 1, 0]
+        df = fetch_weather_data(locations, api)
+        api.close()
+
+    assert len(server.requests) == 4
+    assert list(df['city'].unique()) == ['London', 'Tokyo']
@@ -0,0 +1,90 @@
+import gzip
+import json
+import folium
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_processing.synthetic import generate_weather_data
+from src.visualization.station_layer import (
+    CLUSTER_THRESHOLD, add_station_layer, marker_rows, render_popups
+)
+from src.visualization.weather_visualization import POPUP_TEMPLATE, create_weather_map
+
+@pytest.fixture
+def stations():
+    df = generate_weather_data(n_stations=40, hours=1, seed=4).astype({'city': str})
+    df.loc[0, 'city'] = 'Rock & Roll <City>'
+    return df
+
+def test_popups_match_per_row_formatting(stations):
+    popups = render_popups(stations, POPUP_TEMPLATE)
+
+    row = stations.iloc[5]
+    assert popups[5] == POPUP_TEMPLATE.format(**row.to_dict())
+    assert '<h4>Rock &amp; Roll &lt;City&gt;</h4>' in popups[0]
+
+def test_popups_support_any_format_spec():
+    df = pd.DataFrame({'name': ['a', 'b'], 'value': [1234.5, 0.25]})
+
+    assert list(render_popups(df, '{name}={value:,.2f} ({value:.0%})')) == ['a=1,234.50 (123450%)', 'b=0.25 (25%)']
+
+def layer_html(stations, **kwargs):
+    m = folium.Map(location=[0, 0], zoom_start=2)
+    popups = render_popups(stations, POPUP_TEMPLATE)
+    mode = add_station_layer(m, stations['latitude'], stations['longitude'], ['red'] * len(stations), popups, **kwargs)
+    return mode, m.get_root().render()
+
+def test_auto_mode_clusters_large_maps(stations):
+    mode, page = layer_html(stations)
+    assert mode == 'markers'
+    assert page.count('L.circleMarker(') == len(stations)
+
+    many = pd.concat([stations] * (CLUSTER_THRESHOLD // len(stations) + 1), ignore_index=True)
+    mode, page = layer_html(many)
+    assert mode == 'cluster'
+    assert 'L.markerClusterGroup' in page
+    assert page.count('L.circleMarker(') == 1
+
+    with pytest.raises(ValueError):
+        layer_html(stations, mode='heatmap')
+
+def test_lazy_mode_writes_compressed_station_file(stations, tmp_path):
+    path = tmp_path / 'stations.json.gz'
+
+    mode, page = layer_html(stations, data_path=str(path), data_url='data/stations.json.gz')
+
+    assert mode == 'lazy'
+    assert 'fetch("data/stations.json.gz")' in page
+    assert 'Rock &amp; Roll' not in page
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        rows = json.load(f)
+    assert rows == marker_rows(stations['latitude'], stations['longitude'], ['red'] * len(stations),
+                               render_popups(stations, POPUP_TEMPLATE))
+
+def test_lazy_data_url_is_relative_to_the_page(stations, tmp_path):
+    path = tmp_path / 'data' / 'stations.json.gz'
+
+    _, page = layer_html(stations, data_path=str(path), html_path=str(tmp_path / 'maps' / 'map.html'))
+    assert 'fetch("../data/stations.json.gz")' in page
+
+    _, page = layer_html(stations, data_path=str(path), html_path=str(tmp_path / 'data' / 'map.html'))
+    assert 'fetch("stations.json.gz")' in page
+
+    with pytest.raises(ValueError):
+        layer_html(stations, data_path=str(path))
+
+def test_popup_width(stations):
+    _, page = layer_html(stations, mode='markers', popup_width=200)
+    assert '"maxWidth": 200' in page and '"maxWidth": 300' not in page
+
+    _, page = layer_html(stations, mode='cluster', popup_width=200)
+    assert '{maxWidth: 200}' in page
+
+    page = create_weather_map(stations, return_map=True, mode='markers').get_root().render()
+    assert '"maxWidth": 200' in page
+
+def test_weather_map_colors_by_temperature(stations):
+    page = create_weather_map(stations, return_map=True, mode='cluster').get_root().render()
+
+    latest = stations.groupby('city').last()
+    assert page.count('"red"') == int(np.sum(latest['temperature'] > 25))
@@ -0,0 +1,88 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.data_processing.station_store import StationStore, MEASUREMENTS, HEADER_SIZE, RECORD_DTYPE
+from src.data_processing.weather_processor import WeatherDataProcessor
+from models.numpy_model import NumpyRiskModel
+
+@pytest.fixture
+def readings():
+    np.random.seed(42)
+    n_samples = 72
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start='2023-01-01', periods=n_samples, freq='h'),
+        'temperature': np.random.normal(20, 5, n_samples),
+        'humidity': np.random.normal(60, 10, n_samples),
+        'wind_speed': np.random.normal(15, 5, n_samples),
+        'precipitation': np.random.exponential(1, n_samples),
+        'pressure': np.random.normal(1013, 5, n_samples)
+    })
+
+@pytest.fixture
+def store(tmp_path, readings):
+    store = StationStore(str(tmp_path / 'stations'))
+    store.append('Rio de Janeiro', readings)
+    return store
+
+def test_read_full_history(store, readings):
+    history = store.read('Rio de Janeiro')
+
+    assert store.stations() == ['Rio de Janeiro']
+    assert len(history) == len(readings)
+    np.testing.assert_allclose(history.values, readings[MEASUREMENTS].to_numpy(), rtol=1e-6)
+    assert (history.timestamps == readings['timestamp'].to_numpy()).all()
+
+def test_range_read_is_a_view(store):
+    window = store.read('Rio de Janeiro', start='2023-01-02', end='2023-01-02 23:00')
+
+    assert len(window) == 24
+    assert window.timestamps[0] == np.datetime64('2023-01-02T00:00')
+    assert window.values.shape == (24, 5)
+    assert np.shares_memory(window.values, window.records)
+    assert not window.values.flags.writeable
+
+def test_append_extends_history(store, readings):
+    later = readings.assign(timestamp=readings['timestamp'] + pd.Timedelta(days=3))
+
+    store.append('Rio de Janeiro', later)
+
+    assert store.count('Rio de Janeiro') == 2 * len(readings)
+    assert len(store.read('Rio de Janeiro', start='2023-01-04')) == len(readings)
+
+def test_append_rejects_older_readings(store, readings):
+    with pytest.raises(ValueError):
+        store.append('Rio de Janeiro', readings)
+
+def test_partial_trailing_record_is_ignored(store, readings):
+    with open(store._path('Rio de Janeiro'), 'ab') as f:
+        f.write(b'\x01' * (RECORD_DTYPE.itemsize // 2))
+
+    assert len(store.read('Rio de Janeiro')) == len(readings)
+
+def test_truncated_header_is_repaired(store, readings):
+    path = store._path('Oslo')
+    with open(path, 'wb') as f:
+        f.write(b'WXST')
+
+    assert store.count('Oslo') == 0
+    assert len(store.read('Oslo')) == 0
+
+    store.append('Oslo', readings)
+    assert len(store.read('Oslo')) == len(readings)
+    assert store.read('Oslo').to_frame()['temperature'].iloc[0] == pytest.approx(readings['temperature'].iloc[0])
+
+def test_unknown_station(store):
+    with pytest.raises(KeyError):
+        store.read('Atlantis')
+
+def test_feeds_prepare_features_and_inference(store):
+    window = store.read('Rio de Janeiro', start='2023-01-02')
+    processor = WeatherDataProcessor()
+
+    X, feature_names = processor.prepare_features(window.feature_array(processor.feature_columns))
+    model = NumpyRiskModel([(np.zeros((5, 1), dtype=np.float32), np.zeros(1, dtype=np.float32), 'sigmoid')])
+    predictions = model.predict(window.feature_array(MEASUREMENTS))
+
+    assert X.shape == (len(window), len(feature_names))
+    assert (window.feature_array(['hour'])[:, 0] == np.arange(len(window)) % 24).all()
+    assert predictions.shape == (len(window), 1)
@@ -0,0 +1,92 @@
+import os
+import pytest
+import pandas as pd
+import numpy as np
+from src.data_processing.storage import write_parquet_dataset, read_parquet_dataset
+from src.data_processing.weather_processor import WeatherDataProcessor
+
+@pytest.fixture
+def weather_data():
+    np.random.seed(42)
+    timestamps = pd.date_range(start='2023-01-30', periods=96, freq='h')
+    frames = []
+    for city in ['London', 'Rio de Janeiro']:
+        frames.append(pd.DataFrame({
+            'timestamp': timestamps,
+            'city': city,
+            'temperature': np.random.normal(20, 5, len(timestamps)),
+            'humidity': np.random.normal(60, 10, len(timestamps)),
+            'wind_speed': np.random.normal(15, 5, len(timestamps)),
+            'precipitation': np.random.exponential(1, len(timestamps)),
+            'pressure': np.random.normal(1013, 5, len(timestamps))
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+@pytest.fixture
+def dataset(weather_data, tmp_path):
+    root = str(tmp_path / 'weather')
+    write_parquet_dataset(weather_data, root)
+    return root
+
+def test_partitioned_by_city_and_month(dataset):
+    partitions = sorted(
+        os.path.relpath(dirpath, dataset)
+        for dirpath, _, files in os.walk(dataset) if files
+    )
+
+    assert len(partitions) == 4
+    assert all(p.startswith('city=') and 'year_month=2023-0' in p for p in partitions)
+
+def test_round_trip(dataset, weather_data):
+    df = read_parquet_dataset(dataset)
+
+    assert len(df) == len(weather_data)
+    assert 'year_month' not in df.columns
+    expected = weather_data.sort_values(['city', 'timestamp']).reset_index(drop=True)
+    actual = df.sort_values(['city', 'timestamp']).reset_index(drop=True)
+    np.testing.assert_allclose(actual['temperature'], expected['temperature'])
+
+def test_column_projection(dataset):
+    df = read_parquet_dataset(dataset, columns=['timestamp', 'temperature'])
+
+    assert list(df.columns) == ['timestamp', 'temperature']
+
+def test_time_and_city_filters(dataset, weather_data):
+    df = read_parquet_dataset(dataset, start='2023-02-01', end='2023-02-01 23:00',
+                              cities=['Rio de Janeiro'])
+
+    assert len(df) == 24
+    assert (df['city'] == 'Rio de Janeiro').all()
+    assert df['timestamp'].min() == pd.Timestamp('2023-02-01')
+    assert df['timestamp'].max() == pd.Timestamp('2023-02-01 23:00')
+
+def test_append(dataset, weather_data):
+    write_parquet_dataset(weather_data.head(10), dataset)
+
+    assert len(read_parquet_dataset(dataset)) == len(weather_data) + 10
+
+def test_overwrite_replaces_dataset(dataset, weather_data):
+    write_parquet_dataset(weather_data.head(10), dataset, mode='overwrite')
+
+    assert len(read_parquet_dataset(dataset)) == 10
+    with pytest.raises(ValueError):
+        write_parquet_dataset(weather_data, dataset, mode='replace')
+
+def test_numeric_looking_cities_stay_strings(weather_data, tmp_path):
+    root = str(tmp_path / 'weather')
+    write_parquet_dataset(weather_data.replace({'city': {'London': '1000'}}), root)
+
+    df = read_parquet_dataset(root, cities=['1000'])
+
+    assert len(df) == len(weather_data) // 2
+    assert (df['city'] == '1000').all()
+
+def test_processor_loads_parquet(dataset, weather_data):
+    processor = WeatherDataProcessor()
+
+    df = processor.load_data(dataset)
+    projected = processor.load_parquet(dataset, columns=['city'], cities=['London'])
+
+    assert len(df) == len(weather_data)
+    assert set(projected.columns) == set(processor.required_columns + ['city'])
+    assert not processor.preprocess_data(projected).isnull().any().any()
@@ -0,0 +1,77 @@
+import pytest
+import pandas as pd
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from src.data_processing.streaming import StreamingWeatherProcessor
+from src.data_processing.synthetic import generate_weather_data
+from src.data_processing.weather_processor import WeatherDataProcessor
+
+MEASUREMENTS = ['temperature', 'humidity', 'wind_speed', 'precipitation', 'pressure']
+
+@pytest.fixture
+def feed():
+    """Interleaved readings of three stations with gaps and an outlier"""
+    df = generate_weather_data(n_stations=3, hours=50, seed=1).astype({'city': str})
+    df = df.sort_values(['timestamp', 'city'], kind='stable').reset_index(drop=True)
+    rng = np.random.default_rng(0)
+    for column in MEASUREMENTS:
+        gaps = rng.choice(np.arange(3, len(df)), size=10, replace=False)
+        df.loc[gaps, column] = np.nan
+    df.loc[20, 'temperature'] = 80.0
+    return df
+
+def test_batches_match_per_station_preprocessing(feed):
+    stream = StreamingWeatherProcessor()
+    streamed = pd.concat([stream.process_batch(feed.iloc[i:i + 16]) for i in range(0, len(feed), 16)])
+
+    processor = WeatherDataProcessor()
+    expected = pd.concat([processor.preprocess_data(group) for _, group in feed.groupby('city')]).sort_index()
+
+    pd.testing.assert_frame_equal(streamed, expected[streamed.columns])
+    assert streamed['temperature'].max() == 50
+
+def test_records_match_batches(feed):
+    by_record = StreamingWeatherProcessor()
+    records = pd.DataFrame([by_record.process_record(row) for row in feed.to_dict('records')])
+
+    by_batch = StreamingWeatherProcessor()
+    batches = pd.concat([by_batch.process_batch(feed.iloc[i:i + 25]) for i in range(0, len(feed), 25)])
+
+    pd.testing.assert_frame_equal(records, batches.reset_index(drop=True), check_dtype=False)
+    by_record.flush()
+    np.testing.assert_allclose(by_record.scaler.mean_, by_batch.scaler.mean_)
+    np.testing.assert_allclose(by_record.scaler.var_, by_batch.scaler.var_)
+
+def test_scaler_matches_full_fit(feed):
+    stream = StreamingWeatherProcessor()
+    processed = pd.concat([stream.process_batch(feed.iloc[i:i + 10]) for i in range(0, len(feed), 10)])
+
+    full = StandardScaler().fit(processed[stream.feature_columns])
+    np.testing.assert_allclose(stream.scaler.mean_, full.mean_)
+    np.testing.assert_allclose(stream.scaler.scale_, full.scale_)
+    np.testing.assert_allclose(stream.transform(processed), full.transform(processed[stream.feature_columns]))
+
+def test_gap_filled_from_last_known_value_of_same_station():
+    stream = StreamingWeatherProcessor()
+    reading = {'temperature': 10.0, 'humidity': 50.0, 'wind_speed': 3.0, 'precipitation': 0.0, 'pressure': 1000.0}
+    stream.process_record({'timestamp': '2024-01-01 00:00', 'city': 'Oslo', **reading})
+    stream.process_record({'timestamp': '2024-01-01 00:00', 'city': 'Lima', **reading, 'temperature': 25.0})
+
+    result = stream.process_record({'timestamp': '2024-01-01 01:00', 'city': 'Oslo', 'temperature': None,
+                                    'humidity': 55.0, 'wind_speed': 4.0, 'precipitation': 0.0,
+                                    'pressure': 1001.0})
+
+    assert result['temperature'] == 10.0
+    assert result['hour'] == 1
+    assert result['weather_score'] == pytest.approx(1.0 + 4.0 / 20 + 5.0 / 20)
+    assert stream.last_known('Oslo')['humidity'] == 55.0
+
+def test_unseen_measurement_falls_back_to_running_mean():
+    stream = StreamingWeatherProcessor()
+    for temperature in (10.0, 20.0):
+        stream.process_record({'timestamp': '2024-01-01', 'city': 'Oslo', 'temperature': temperature,
+                               'humidity': 50.0, 'wind_speed': 3.0, 'precipitation': 0.0, 'pressure': 1000.0})
+
+    result = stream.process_record({'timestamp': '2024-01-01', 'city': 'New', 'humidity': 50.0,
+                                    'wind_speed': 3.0, 'precipitation': 0.0, 'pressure': 1000.0})
+    assert result['temperature'] == pytest.approx(15.0)
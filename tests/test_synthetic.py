@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_processing.synthetic import COLUMNS, generate_weather_data, iter_weather_chunks, station_table
+
+def test_shape_and_order():
+    df = generate_weather_data(n_stations=25, hours=48)
+
+    assert list(df.columns) == COLUMNS
+    assert len(df) == 25 * 48
+    assert df['city'].nunique() == 25
+    assert list(df['city'].iloc[:48].unique()) == ['New York']
+    assert (df.groupby('city', observed=True)['timestamp'].diff().dropna() == pd.Timedelta(hours=1)).all()
+
+def test_seeded_output_is_reproducible():
+    pd.testing.assert_frame_equal(generate_weather_data(12, 30, seed=7), generate_weather_data(12, 30, seed=7))
+    assert not generate_weather_data(12, 30, seed=7)['temperature'].equals(
+        generate_weather_data(12, 30, seed=8)['temperature'])
+
+def test_chunks_are_bounded_and_complete():
+    chunks = list(iter_weather_chunks(n_stations=7, hours=100, chunk_rows=64))
+
+    assert all(len(chunk) <= 64 for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == 700
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True),
+                                  generate_weather_data(n_stations=7, hours=100, chunk_rows=64))
+
+def test_regional_temperature_patterns():
+    df = generate_weather_data(n_stations=10, hours=24 * 30, extreme_fraction=0)
+    means = df.groupby('city', observed=True)['temperature'].mean()
+
+    assert means['Cairo'] == pytest.approx(30, abs=0.5)
+    assert means['Moscow'] == pytest.approx(5, abs=0.5)
+    assert means['Tokyo'] == pytest.approx(20, abs=0.5)
+
+def test_extreme_events():
+    calm = generate_weather_data(n_stations=10, hours=100, extreme_fraction=0)
+    stormy = generate_weather_data(n_stations=10, hours=100, extreme_fraction=0.05)
+
+    assert (calm['wind_speed'] < 20).all()
+    assert (stormy['wind_speed'] >= 20).sum() == 50
+
+def test_generated_stations_use_latitude_bands():
+    stations = station_table(500)
+
+    assert stations['city'].is_unique
+    generated = stations.iloc[10:]
+    assert (generated.loc[generated['latitude'].abs() >= 50, 'temp_base'] == 5).all()
+    assert (generated.loc[generated['latitude'].abs() <= 30, 'temp_base'] == 30).all()
@@ -0,0 +1,195 @@
+import threading
+import pytest
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from src.visualization.weather_client import (
+    WeatherAPI, PooledWeatherAPI, QuotaExceeded, RateLimiter, schedule_locations
+)
+import time
+from src.visualization.weather_map import fetch_weather_data, parse_forecast_hours, parse_current, to_weather_columns, build_weather_frame
+from tests.weather_api_stub import StubWeatherServer, forecast_payload
+
+@pytest.fixture
+def locations():
+    return pd.DataFrame({
+        'city': ['New York', 'London', 'Tokyo', 'Sydney'],
+        'lat': [40.7128, 51.5074, 35.6762, -33.8688],
+        'lon': [-74.0060, -0.1278, 139.6503, 151.2093]
+    })
+
+def test_sequential_and_pooled_fetch_match(locations):
+    with StubWeatherServer() as server:
+        sequential = fetch_weather_data(locations, WeatherAPI('key', base_url=server.base_url))
+        pooled_api = PooledWeatherAPI('key', max_workers=4, base_url=server.base_url)
+        pooled = fetch_weather_data(locations, pooled_api)
+        pooled_api.close()
+
+    # One current reading plus 5 days x 24 forecast hours per location
+    assert len(sequential) == len(locations) * (1 + 5 * 24)
+    pd.testing.assert_frame_equal(sequential, pooled)
+    assert list(pooled['city'].unique()) == list(locations['city'])
+
+def test_bounded_concurrency():
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work(item):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        threading.Event().wait(0.01)
+        with lock:
+            in_flight -= 1
+        return item * 2
+
+    api = PooledWeatherAPI('key', max_workers=3)
+    results = api.map(work, range(12))
+    api.close()
+
+    assert results == [i * 2 for i in range(12)]
+    assert peak <= 3
+
+def test_retries_transient_errors():
+    with StubWeatherServer(fail_first=2) as server:
+        api = PooledWeatherAPI('key', max_workers=2, backoff_factor=0, base_url=server.base_url)
+        current = api.get_current_weather(51.5, -0.1)
+        api.close()
+
+    assert current['current']['humidity'] == 60
+    assert len(server.requests) == 3
+
+def test_every_retry_passes_the_rate_limiter():
+    waits = []
+    with StubWeatherServer(fail_first=2, fail_status=429, retry_after='7') as server:
+        limiter = RateLimiter(requests_per_second=1000, daily_quota=10)
+        api = PooledWeatherAPI('key', max_workers=2, base_url=server.base_url,
+                               rate_limiter=limiter, sleep=waits.append)
+        api.get_current_weather(51.5, -0.1)
+        api.close()
+
+    # Three HTTP requests, three quota units, and the server's Retry-After between them
+    assert len(server.requests) == 3
+    assert limiter.remaining_today() == 7
+    assert waits == [7.0, 7.0]
+
+def test_retries_stop_when_the_quota_is_used_up():
+    with StubWeatherServer(fail_first=5) as server:
+        api = PooledWeatherAPI('key', max_workers=2, backoff_factor=0, base_url=server.base_url,
+                               rate_limiter=RateLimiter(requests_per_second=1000, daily_quota=2))
+        with pytest.raises(QuotaExceeded):
+            api.get_current_weather(51.5, -0.1)
+        api.close()
+
+    assert len(server.requests) == 2
+
+def test_timeout_is_enforced():
+    with StubWeatherServer(latency=0.5) as server:
+        api = PooledWeatherAPI('key', retries=0, timeout=0.05, base_url=server.base_url)
+        with pytest.raises(Exception):
+            api.get_forecast(51.5, -0.1)
+        api.close()
+
+def test_failed_location_is_skipped(locations):
+    with StubWeatherServer(fail_first=1) as server:
+        api = WeatherAPI('key', base_url=server.base_url)
+        df = fetch_weather_data(locations, api)
+
+    assert set(df['city']) == {'London', 'Tokyo', 'Sydney'}
+
+def test_merged_fetch_halves_calls(locations):
+    with StubWeatherServer() as server:
+        separate = fetch_weather_data(locations, WeatherAPI('key', base_url=server.base_url), merged=False)
+        separate_calls = len(server.requests)
+        merged = fetch_weather_data(locations, WeatherAPI('key', base_url=server.base_url))
+        merged_calls = len(server.requests) - separate_calls
+
+    assert separate_calls == 2 * len(locations)
+    assert merged_calls == len(locations)
+    pd.testing.assert_frame_equal(separate, merged)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def test_rate_limiter_paces_requests():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_second=2, burst=2, clock=clock, sleep=clock.sleep)
+
+    for _ in range(6):
+        limiter.acquire()
+
+    # The burst goes out at once, the remaining 4 requests at 2 per second
+    assert clock.now == pytest.approx(2.0)
+
+def test_rate_limiter_daily_quota():
+    limiter = RateLimiter(requests_per_second=1000, daily_quota=3)
+    for _ in range(3):
+        limiter.acquire()
+
+    assert limiter.remaining_today() == 0
+    with pytest.raises(QuotaExceeded):
+        limiter.acquire()
+
+def test_schedule_locations_prefers_stale(locations):
+    last_fetched = {
+        'New York': datetime(2024, 1, 1, 12),
+        'London': datetime(2024, 1, 1, 6),
+        'Sydney': datetime(2024, 1, 1, 9)
+    }
+    scheduled = schedule_locations(locations, last_fetched)
+    assert list(scheduled['city']) == ['Tokyo', 'London', 'Sydney', 'New York']
+    assert list(schedule_locations(locations, last_fetched, max_locations=2)['city']) == ['Tokyo', 'London']
+
+def test_quota_limits_fetched_locations(locations):
+    with StubWeatherServer() as server:
+        api = PooledWeatherAPI('key', max_workers=4, base_url=server.base_url,
+                               rate_limiter=RateLimiter(requests_per_second=1000, daily_quota=2))
+        df = fetch_weather_data(locations, api, last_fetched={'New York': datetime(2024, 1, 1)})
+        api.close()
+
+    assert len(server.requests) == 2
+    assert list(df['city'].unique()) == ['London', 'Tokyo']
+
+def legacy_rows(row, forecast):
+    """Per-hour dict loop the columnar parser replaced"""
+    records = []
+    for block in [dict(forecast['current'], time_epoch=forecast['current']['last_updated_epoch'])] + \
+            [hour for day in forecast['forecast']['forecastday'] for hour in day['hour']]:
+        records.append({
+            'timestamp': datetime.fromtimestamp(block['time_epoch']),
+            'city': row['city'],
+            'lat': row['lat'],
+            'lon': row['lon'],
+            'temperature': block['temp_c'],
+            'humidity': block['humidity'],
+            'wind_speed': block['wind_kph'] / 3.6,
+            'precipitation': block['precip_mm'],
+            'pressure': block['pressure_mb']
+        })
+    return pd.DataFrame(records)
+
+@pytest.mark.parametrize('tz', ['UTC', 'America/New_York'])
+def test_columnar_parser_matches_row_loop(monkeypatch, tz):
+    monkeypatch.setenv('TZ', tz)
+    time.tzset()
+    try:
+        row = {'city': 'London', 'lat': 51.5074, 'lon': -0.1278}
+        forecast = forecast_payload(row['lat'], row['lon'], days=5)
+        values = np.concatenate([parse_current(forecast['current']), parse_forecast_hours(forecast)])
+        parsed = build_weather_frame([to_weather_columns(row, values)])
+        expected = legacy_rows(row, forecast)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    assert len(parsed) == 1 + 5 * 24
+    pd.testing.assert_frame_equal(parsed, expected, check_dtype=False)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_processing.synthetic import generate_weather_data
+from src.data_processing.weather_index import IndexedWeatherData
+
+@pytest.fixture
+def readings():
+    df = generate_weather_data(n_stations=8, hours=72, seed=2).astype({'city': str})
+    # Shuffle so the index has to sort by city and time itself
+    return df.sample(frac=1, random_state=0)
+
+def scan(df, cities, start, end):
+    mask = df['city'].isin(cities) & df['timestamp'].between(start, end)
+    return df[mask].sort_values(['city', 'timestamp'])
+
+def test_query_matches_boolean_scan(readings):
+    index = IndexedWeatherData(readings)
+    cities = ['Tokyo', 'London', 'Cairo']
+    start, end = pd.Timestamp('2023-01-01 10:00'), pd.Timestamp('2023-01-02 09:59:59')
+
+    result = index.query(cities, start, end)
+
+    expected = scan(readings, cities, start, end)
+    assert len(result) == 3 * 24
+    pd.testing.assert_frame_equal(result.sort_values(['city', 'timestamp']), expected)
+
+def test_station_slice_is_sorted_by_time(readings):
+    index = IndexedWeatherData(readings)
+
+    tokyo = index.station('Tokyo', start='2023-01-02')
+
+    assert tokyo['city'].eq('Tokyo').all()
+    assert tokyo['timestamp'].is_monotonic_increasing
+    assert tokyo['timestamp'].iloc[0] == pd.Timestamp('2023-01-02')
+    assert len(tokyo) == 48
+
+def test_stations_keep_first_appearance_order(readings):
+    index = IndexedWeatherData(readings)
+
+    assert index.stations == list(readings['city'].unique())
+    assert [city for city, _ in index.groups()] == index.stations
+
+def test_unknown_station_and_empty_window(readings):
+    index = IndexedWeatherData(readings)
+
+    assert index.station('Atlantis').empty
+    assert index.query(['Tokyo'], start='2030-01-01').empty
+    assert index.query([]).empty
+
+def test_latest_matches_groupby_last(readings):
+    index = IndexedWeatherData(readings)
+    end = pd.Timestamp('2023-01-02 12:30')
+
+    latest = index.latest(end=end).set_index('city')
+
+    expected = readings[readings['timestamp'] <= end].sort_values('timestamp').groupby('city').last()
+    pd.testing.assert_frame_equal(latest.loc[expected.index], expected)
+
+def test_timezone_aware_timestamps(readings):
+    readings = readings.assign(timestamp=readings['timestamp'].dt.tz_localize('UTC'))
+    index = IndexedWeatherData(readings)
+
+    # Naive bounds are taken to be in the data's time zone
+    result = index.query(['Tokyo'], start='2023-01-01 06:00', end='2023-01-01 08:00')
+
+    assert result['timestamp'].dt.hour.tolist() == [6, 7, 8]
+
+def test_rows_without_station_are_never_returned(readings):
+    readings = readings.copy()
+    readings.iloc[:5, readings.columns.get_loc('city')] = None
+    index = IndexedWeatherData(readings)
+
+    assert len(index) == len(readings)
+    assert len(index.query()) == len(readings) - 5
@@ -1,3 +1,4 @@
+import tracemalloc
 import pytest
 import pandas as pd
 import numpy as np
@@ -53,6 +54,24 @@ def test_prepare_features(processor, sample_data):
     assert np.abs(X.mean()) < 1e-10  # Close to 0
     assert np.abs(X.std() - 1) < 1e-10  # Close to 1
 
+def test_prepare_features_reuses_saved_pipeline(processor, sample_data, tmp_path):
+    processed_df = processor.preprocess_data(sample_data)
+    X, _ = processor.prepare_features(processed_df)
+    path = tmp_path / 'features.npz'
+    processor.pipeline.save(path)
+    
+    serving = WeatherDataProcessor()
+    serving.load_feature_pipeline(path)
+    X_serving, feature_names = serving.prepare_features(processed_df.iloc[:10], fit=False)
+    
+    # The statistics of the full training set are applied, not refit on the subset
+    assert feature_names == processor.feature_columns
+    np.testing.assert_allclose(X_serving, X[:10], atol=1e-4)
+
+def test_prepare_features_without_fit_requires_pipeline(processor, sample_data):
+    with pytest.raises(ValueError):
+        processor.prepare_features(processor.preprocess_data(sample_data), fit=False)
+
 def test_handle_missing_values(processor):
     # Create data with missing values
     data = pd.DataFrame({
@@ -103,3 +122,110 @@ def test_add_derived_features(processor, sample_data):
     assert processed_data['hour'].between(0, 23).all()
     assert processed_data['month'].between(1, 12).all()
     assert processed_data['weather_score'].notna().all()
+
+@pytest.fixture
+def csv_with_gaps(sample_data, tmp_path):
+    sample_data['city'] = np.where(np.arange(len(sample_data)) % 2, 'London', 'Tokyo')
+    # Leading gap longer than a chunk, plus gaps that straddle chunk boundaries
+    sample_data.loc[:14, 'humidity'] = np.nan
+    sample_data.loc[28:33, 'temperature'] = np.nan
+    sample_data.loc[59:61, 'pressure'] = np.nan
+    sample_data.loc[95:, 'wind_speed'] = np.nan
+    path = tmp_path / 'weather.csv'
+    sample_data.to_csv(path, index=False)
+    return path
+
+def test_load_data_chunks_dtypes(processor, csv_with_gaps):
+    chunks = list(processor.load_data_chunks(csv_with_gaps, chunksize=30))
+
+    assert [len(chunk) for chunk in chunks] == [30, 30, 30, 10]
+    chunk = chunks[0]
+    assert all(chunk[col].dtype == np.float32 for col in processor.measurement_columns)
+    assert pd.api.types.is_datetime64_any_dtype(chunk['timestamp'])
+    assert isinstance(chunk['city'].dtype, pd.CategoricalDtype)
+
+def test_load_data_chunks_validates_header(processor, sample_data, tmp_path):
+    path = tmp_path / 'weather.csv'
+    sample_data.drop(columns=['pressure']).to_csv(path, index=False)
+
+    with pytest.raises(Exception, match='Missing required columns'):
+        processor.load_data_chunks(path)
+
+def test_preprocess_chunks_matches_in_memory(processor, csv_with_gaps):
+    expected = processor.preprocess_data(processor.load_data(csv_with_gaps))
+
+    chunks = processor.preprocess_chunks(processor.load_data_chunks(csv_with_gaps, chunksize=10))
+    actual = pd.concat(list(chunks))
+
+    assert len(actual) == len(expected)
+    assert not actual[processor.measurement_columns].isnull().any().any()
+    for column in processor.measurement_columns + ['weather_score']:
+        np.testing.assert_allclose(actual[column].to_numpy(), expected[column].to_numpy(), rtol=1e-5)
+    assert (actual['hour'].to_numpy() == expected['hour'].to_numpy()).all()
+
+def test_preprocess_chunks_caps_held_back_rows(processor):
+    df = pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=40, freq='h'),
+        'temperature': np.linspace(10, 20, 40),
+        'humidity': 60.0,
+        'wind_speed': 10.0,
+        'precipitation': np.nan,
+        'pressure': 1013.0
+    })
+    df.loc[25:, 'precipitation'] = 1.5
+
+    chunks = [df.iloc[start:start + 10] for start in range(0, 40, 10)]
+    processed = list(processor.preprocess_chunks(chunks, max_pending_rows=20))
+    result = pd.concat(processed)
+
+    # Nothing is held past 20 rows; that part of the gap stays NaN, the rest is back filled
+    assert [len(chunk) for chunk in processed] == [20, 10, 10]
+    assert result['precipitation'].iloc[:20].isna().all()
+    assert (result['precipitation'].iloc[20:] == 1.5).all()
+
+def test_preprocess_data_leaves_input_untouched(processor, sample_data):
+    sample_data['timestamp'] = sample_data['timestamp'].astype(str)
+    original = sample_data.copy()
+
+    processed = processor.preprocess_data(sample_data)
+
+    assert processed is not sample_data
+    pd.testing.assert_frame_equal(sample_data, original)
+
+def test_preprocess_data_inplace(processor, sample_data):
+    expected = processor.preprocess_data(sample_data)
+
+    processed = processor.preprocess_data(sample_data, inplace=True)
+
+    assert processed is sample_data
+    assert 'weather_score' in sample_data.columns
+    pd.testing.assert_frame_equal(processed, expected)
+
+def peak_allocation(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_preprocess_data_peak_memory(processor):
+    rng = np.random.default_rng(42)
+    n_samples = 200_000
+    df = pd.DataFrame({
+        'timestamp': pd.date_range(start='2023-01-01', periods=n_samples, freq='min'),
+        'temperature': rng.normal(20, 5, n_samples),
+        'humidity': rng.normal(60, 10, n_samples),
+        'wind_speed': rng.normal(15, 5, n_samples),
+        'precipitation': rng.exponential(1, n_samples),
+        'pressure': rng.normal(1013, 5, n_samples)
+    })
+    df.loc[::100, 'humidity'] = np.nan
+    input_size = df.memory_usage(deep=True).sum()
+
+    copy_peak = peak_allocation(lambda: processor.preprocess_data(df))
+    inplace_peak = peak_allocation(lambda: processor.preprocess_data(df, inplace=True))
+
+    # One copy of the input plus the derived columns and per-column temporaries
+    assert copy_peak < 2.5 * input_size
+    assert inplace_peak < 1.5 * input_size
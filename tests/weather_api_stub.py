@@ -0,0 +1,148 @@
+"""
+Local stand-in for api.weatherapi.com
+
+Serves /v1/current.json and /v1/forecast.json with deterministic payloads
+derived from the requested coordinates, so clients can be tested and
+benchmarked without network access or an API key. Responses carry an ETag
+and If-None-Match requests for an unchanged body get 304 Not Modified.
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BASE_EPOCH = 1_700_000_000
+
+def current_block(lat: float, lon: float) -> dict:
+    return {
+        'last_updated_epoch': BASE_EPOCH,
+        'temp_c': round(20 + lat / 10, 1),
+        'humidity': 60,
+        'wind_kph': 18.0,
+        'precip_mm': 0.5,
+        'pressure_mb': 1013.0
+    }
+
+def forecast_payload(lat: float, lon: float, days: int) -> dict:
+    forecast_days = []
+    for day in range(days):
+        hours = []
+        for hour in range(24):
+            offset = day * 24 + hour
+            hours.append({
+                'time_epoch': BASE_EPOCH + offset * 3600,
+                'temp_c': round(20 + lat / 10 + (hour % 12) / 4, 1),
+                'humidity': 50 + hour,
+                'wind_kph': 10.0 + hour,
+                'precip_mm': 0.1 * (hour % 5),
+                'pressure_mb': 1000.0 + hour
+            })
+        forecast_days.append({'hour': hours})
+    return {
+        'location': {'lat': lat, 'lon': lon},
+        'current': current_block(lat, lon),
+        'forecast': {'forecastday': forecast_days}
+    }
+
+class StubWeatherServer:
+    """
+    Threaded HTTP server answering like WeatherAPI.com
+
+    Args:
+        latency: Seconds each response is delayed, to mimic network round trips
+        fail_first: Number of initial requests answered with fail_status, to exercise retries
+        fail_status: Status of the failing responses, e.g. 503 or 429
+        retry_after: Retry-After header sent with the failing responses, if any
+    """
+
+    def __init__(self, latency: float = 0.0, fail_first: int = 0, fail_status: int = 503,
+                 retry_after: str = None):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self.requests = []
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                with stub._lock:
+                    stub.requests.append((url.path, query))
+                    failing = stub.fail_first > 0
+                    if failing:
+                        stub.fail_first -= 1
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if failing:
+                    self._send(stub.fail_status, {'error': {'message': 'Service unavailable'}})
+                    return
+
+                lat, lon = (float(value) for value in query.get('q', '0,0').split(','))
+                if url.path.endswith('/current.json'):
+                    self._send(200, {'location': {'lat': lat, 'lon': lon},
+                                     'current': current_block(lat, lon)})
+                elif url.path.endswith('/forecast.json'):
+                    self._send(200, forecast_payload(lat, lon, int(query.get('days', 1))))
+                else:
+                    self._send(404, {'error': {'message': 'Not found'}})
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    with stub._lock:
+                        stub.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                self.send_response(status)
+                if status != 200 and stub.retry_after is not None:
+                    self.send_header('Retry-After', stub.retry_after)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self) -> 'StubWeatherServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()